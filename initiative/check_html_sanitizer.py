@@ -0,0 +1,81 @@
+import json
+import argparse
+import os
+import sys
+import time
+
+from html_sanitizer import _strip_anchors_with_soup, strip_anchors
+
+def _iter_5e_descriptions(input_json_path):
+    """Yields every description the 5e converter sanitizes, prepared the same way it does."""
+    with open(input_json_path, 'r', encoding='utf-8') as f:
+        monster_dump_data = json.load(f)
+    for monster in monster_dump_data:
+        for key in ('special_abilities', 'actions', 'legendary_actions'):
+            for item in monster.get(key) or []:
+                yield item.get('desc', 'No description.').replace('\\n', '<br>')
+
+def _iter_strings(value):
+    """Yields every string nested anywhere in a loaded JSON document."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for nested in value.values():
+            yield from _iter_strings(nested)
+    elif isinstance(value, list):
+        for nested in value:
+            yield from _iter_strings(nested)
+
+def _iter_pf2e_descriptions(input_directory_path):
+    """Yields every HTML-looking string in a directory of Foundry JSON documents."""
+    for root, _, files in os.walk(input_directory_path):
+        for filename in files:
+            if not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(root, filename), 'r', encoding='utf-8') as f:
+                    document = json.load(f)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            for value in _iter_strings(document):
+                if '<' in value or '&' in value:
+                    yield value.replace('\n', '<br>')
+
+def check_equivalence(label, descriptions, max_reported=10):
+    """
+    Compares strip_anchors with the BeautifulSoup reference on every description,
+    prints mismatches and timings, and returns the number of mismatches.
+    """
+    descriptions = list(descriptions)
+
+    start = time.perf_counter()
+    fast_results = [strip_anchors(desc) for desc in descriptions]
+    fast_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    soup_results = [_strip_anchors_with_soup(desc) for desc in descriptions]
+    soup_seconds = time.perf_counter() - start
+
+    mismatches = 0
+    for desc, fast, soup in zip(descriptions, fast_results, soup_results):
+        if fast != soup:
+            mismatches += 1
+            if mismatches <= max_reported:
+                print(f"Mismatch in {label}:\n  input:         {desc!r}\n  strip_anchors: {fast!r}\n  BeautifulSoup: {soup!r}")
+
+    speedup = soup_seconds / fast_seconds if fast_seconds else 0
+    print(f"{label}: {len(descriptions)} descriptions, {mismatches} mismatches; "
+          f"strip_anchors {fast_seconds:.3f}s vs BeautifulSoup {soup_seconds:.3f}s ({speedup:.1f}x)")
+    return mismatches
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that html_sanitizer.strip_anchors matches the BeautifulSoup output it replaces.")
+    parser.add_argument("--dnd5e-input", type=str, default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "dnd_5e_base.json"), help="5e monster dump to check.")
+    parser.add_argument("--pf2e-input", type=str, help="Directory of PF2e Foundry JSON files to check (optional).")
+
+    args = parser.parse_args()
+
+    total_mismatches = check_equivalence(args.dnd5e_input, _iter_5e_descriptions(args.dnd5e_input))
+    if args.pf2e_input:
+        total_mismatches += check_equivalence(args.pf2e_input, _iter_pf2e_descriptions(args.pf2e_input))
+    sys.exit(1 if total_mismatches else 0)
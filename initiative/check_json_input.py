@@ -0,0 +1,78 @@
+import argparse
+import io
+import json
+import os
+import sys
+
+from converter_input import iter_json_array
+
+# Top-level values whose every prefix but the last is either invalid JSON or a different value
+SPLIT_VALUES = ('-2.5', '1.5e3', '-0.25E-7', '12345', '0', 'true', 'false', 'null', '"a\\"b"', '{"a": [1, 2.5]}', '[]')
+MALFORMED_DOCUMENTS = ('[1.5x]', '[1 2]', '[-]', '[1.5e]', '[tru]', '{"a": 1}', '[1,')
+
+def _decode_all(document, chunk_size):
+    return list(iter_json_array(io.StringIO(document), chunk_size=chunk_size))
+
+def check_split_values(max_reported=10):
+    """
+    Reads small arrays of each of SPLIT_VALUES with every chunk size up to the document's
+    length, so each value is cut at every position, and compares with json.loads.
+    Returns the number of mismatches.
+    """
+    mismatches = 0
+    cases = 0
+    for value in SPLIT_VALUES:
+        for padding in ('', ' ', '\n  '):
+            document = f"[{padding}{value},{padding}{value}{padding}]"
+            expected = json.loads(document)
+            for chunk_size in range(1, len(document) + 1):
+                cases += 1
+                try:
+                    result = _decode_all(document, chunk_size)
+                except json.JSONDecodeError as e:
+                    result = f"JSONDecodeError: {e.msg}"
+                if result != expected:
+                    mismatches += 1
+                    if mismatches <= max_reported:
+                        print(f"Mismatch for {document!r} with chunk_size {chunk_size}: {result!r}, expected {expected!r}")
+    print(f"Split values: {cases} cases, {mismatches} mismatches")
+    return mismatches
+
+def check_malformed(max_reported=10):
+    """Checks that each of MALFORMED_DOCUMENTS is rejected at every chunk size. Returns the number accepted."""
+    accepted = 0
+    for document in MALFORMED_DOCUMENTS:
+        for chunk_size in range(1, len(document) + 1):
+            try:
+                result = _decode_all(document, chunk_size)
+            except json.JSONDecodeError:
+                continue
+            accepted += 1
+            if accepted <= max_reported:
+                print(f"Accepted malformed {document!r} with chunk_size {chunk_size}: {result!r}")
+    print(f"Malformed documents: {len(MALFORMED_DOCUMENTS)} documents, {accepted} accepted")
+    return accepted
+
+def check_dump(input_json_path, chunk_sizes):
+    """Reads a monster dump at each chunk size and compares with json.load. Returns the number of mismatches."""
+    with open(input_json_path, 'r', encoding='utf-8') as f:
+        expected = json.load(f)
+    mismatches = 0
+    for chunk_size in chunk_sizes:
+        with open(input_json_path, 'r', encoding='utf-8') as f:
+            if list(iter_json_array(f, chunk_size=chunk_size)) != expected:
+                mismatches += 1
+                print(f"Mismatch reading {input_json_path} with chunk_size {chunk_size}")
+    print(f"{input_json_path}: {len(expected)} monsters at {len(chunk_sizes)} chunk sizes, {mismatches} mismatches")
+    return mismatches
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that converter_input.iter_json_array matches json.load wherever the chunks are cut.")
+    parser.add_argument("--dnd5e-input", type=str, default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "dnd_5e_base.json"), help="5e monster dump to check.")
+    parser.add_argument("--chunk-size", type=int, action="append", help="Chunk size to read the dump with (repeatable; default: 7, 64, 4096).")
+
+    args = parser.parse_args()
+
+    failures = check_split_values() + check_malformed()
+    failures += check_dump(args.dnd5e_input, args.chunk_size or [7, 64, 4096])
+    sys.exit(1 if failures else 0)
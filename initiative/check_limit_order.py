@@ -0,0 +1,74 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+
+import pf2e_converter
+from converter_corpus import write_pf2e_corpus
+
+@contextlib.contextmanager
+def _counting_statblock_builds():
+    """Counts the calls to pf2e_converter.build_statblock made in this process while active."""
+    calls = [0]
+    build_statblock = pf2e_converter.build_statblock
+    def counted(npc):
+        calls[0] += 1
+        return build_statblock(npc)
+    pf2e_converter.build_statblock = counted
+    try:
+        yield calls
+    finally:
+        pf2e_converter.build_statblock = build_statblock
+
+def _convert(input_dir, output_path, **options):
+    """Runs a serial conversion quietly; returns (exported records, stat blocks built)."""
+    with _counting_statblock_builds() as calls, contextlib.redirect_stdout(io.StringIO()):
+        pf2e_converter.convert_monster_data(input_dir, output_path, jobs=1, **options)
+    with open(output_path, 'r', encoding='utf-8') as f:
+        return json.load(f), calls[0]
+
+def check_limit_order(input_dir, work_dir, limit):
+    """
+    Converts input_dir with --limit-order name, without a cache and through a cold and then
+    a warm render cache, and checks that each export is the first limit monsters of the
+    full export and that stat blocks were built for those monsters only. Returns the
+    number of problems found.
+    """
+    full, _ = _convert(input_dir, os.path.join(work_dir, 'full.json'))
+    expected = full[:limit]
+    cache_path = os.path.join(work_dir, 'limited.cache.sqlite')
+    runs = (
+        ('no cache', {}, len(expected)),
+        ('cold cache', {'cache_path': cache_path}, len(expected)),
+        ('warm cache', {'cache_path': cache_path}, 0),
+    )
+    problems = 0
+    for label, options, expected_builds in runs:
+        records, builds = _convert(input_dir, os.path.join(work_dir, 'limited.json'), limit=limit, limit_order='name', **options)
+        if records != expected:
+            problems += 1
+            print(f"{label}: the export isn't the first {limit} monsters by name")
+        if builds != expected_builds:
+            problems += 1
+            print(f"{label}: built {builds} stat blocks for {len(records)} exported monsters, expected {expected_builds}")
+        print(f"{label}: {len(records)} of {len(full)} monsters exported, {builds} stat blocks built")
+    return problems
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that --limit-order name builds stat blocks only for the monsters it keeps.")
+    parser.add_argument("--pf2e-input", type=str, help="Directory of PF2e Foundry JSON files to check (default: a generated tree).")
+    parser.add_argument("--npcs", type=int, default=200, help="NPCs in the generated tree (default: 200).")
+    parser.add_argument("--limit", type=int, default=10, help="Monsters to keep (default: 10).")
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_dir = args.pf2e_input
+        if not input_dir:
+            input_dir = os.path.join(work_dir, 'pf2e')
+            write_pf2e_corpus(input_dir, args.npcs)
+        failures = check_limit_order(input_dir, work_dir, args.limit)
+    sys.exit(1 if failures else 0)
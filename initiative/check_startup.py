@@ -0,0 +1,64 @@
+import argparse
+import compileall
+import os
+import re
+import subprocess
+import sys
+
+from convert import CONVERTERS
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Modules only some runs need; importing any of them to print --help means an eager import crept back in
+LAZY_MODULES = ('bs4', 'concurrent.futures', 'multiprocessing', 'zipfile', 'gzip', 'tempfile', 'inspect', 'ctypes', 'tracemalloc', 'sqlite3')
+
+# -X importtime lines look like "import time:       123 |       4567 | module.name"
+_IMPORTTIME_LINE = re.compile(r'import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)')
+
+def _importtime(arguments):
+    """Runs python -X importtime with arguments and returns {module: cumulative microseconds}."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', *arguments], cwd=HERE, capture_output=True, text=True, check=True)
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2))
+    return cumulative
+
+def measure_startup(converter):
+    """
+    Returns (microseconds to import the converter module in a fresh interpreter,
+    set of modules imported by `convert.py <converter> --help`).
+    """
+    # importlib.import_module bypasses the importtime hook, so time a plain import of the module
+    module = CONVERTERS[converter]
+    import_us = _importtime(['-c', f'import {module}']).get(module, 0)
+    imported = set(_importtime([os.path.join(HERE, 'convert.py'), converter, '--help']))
+    return import_us, imported
+
+def check_converter(converter, budget_ms, runs):
+    """Prints the best of runs import times for one converter and returns the number of problems found."""
+    best_us, imported = min(measure_startup(converter) for _ in range(runs))
+    problems = 0
+    eager = sorted(name for name in imported if name in LAZY_MODULES)
+    if eager:
+        problems += 1
+        print(f"{converter}: imported at startup but should be lazy: {', '.join(eager)}")
+    if best_us / 1000 > budget_ms:
+        problems += 1
+        print(f"{converter}: import took {best_us / 1000:.1f}ms, over the {budget_ms:.0f}ms budget")
+    print(f"{converter}: {best_us / 1000:.1f}ms to import (best of {runs}), {len(imported)} modules")
+    return problems
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that `convert.py <converter> --help` starts quickly and without optional modules.")
+    parser.add_argument("--budget-ms", type=float, default=45, help="Largest acceptable import time of a converter module, in milliseconds (default: 45).")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per converter; the fastest counts (default: 5).")
+
+    args = parser.parse_args()
+
+    # Time imports from bytecode, as installed runs do, not the first compile
+    compileall.compile_dir(HERE, quiet=1)
+
+    failures = sum(check_converter(converter, args.budget_ms, args.runs) for converter in CONVERTERS)
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,23 @@
+import argparse
+import importlib
+
+# Subcommand -> converter module. Only the chosen converter is imported, and the converters
+# import what only some runs need (process pools, zip and gzip support, ...) on first use.
+CONVERTERS = {
+    '5e': 'dnd_5e_converter',
+    'pf2e': 'pf2e_converter',
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert monster data to Initiative Tracker format.",
+                                     epilog="Run '%(prog)s <converter> --help' for the options of a converter.")
+    parser.add_argument("converter", choices=CONVERTERS, help="5e: a D&D 5e monster dump; pf2e: a directory (or zip) of PF2e Foundry documents and packs.")
+    parser.add_argument("arguments", nargs=argparse.REMAINDER, help="Arguments for the converter.")
+
+    args = parser.parse_args(argv)
+
+    converter = importlib.import_module(CONVERTERS[args.converter])
+    converter.main(args.arguments, prog=f"{parser.prog} {args.converter}")
+
+if __name__ == "__main__":
+    main()
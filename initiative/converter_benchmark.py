@@ -0,0 +1,405 @@
+import json
+import argparse
+import contextlib
+import datetime
+import importlib
+import importlib.util
+import io
+import multiprocessing
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError: # Not available on Windows; peak memory is then left out
+    resource = None
+
+import dnd_5e_converter
+import pf2e_converter
+from converter_corpus import write_dnd_5e_corpus, write_pf2e_corpus
+from converter_input import iter_json_array
+from converter_output import ExternalSorter, open_export_writer
+from foundry_enrichers import replace_enrichers
+from statblock_renderer import render_statblock
+
+def _default_job_counts():
+    """1, 2, 4, ... up to the CPU count (always including the CPU count itself)."""
+    cpu_count = os.cpu_count() or 1
+    counts = []
+    jobs = 1
+    while jobs < cpu_count:
+        counts.append(jobs)
+        jobs *= 2
+    counts.append(cpu_count)
+    return counts
+
+def _time_run(convert, *args, **kwargs):
+    """Runs one conversion with its console output swallowed and returns the elapsed seconds."""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        convert(*args, **kwargs)
+    return time.perf_counter() - start
+
+def _count_entries(output_json_path):
+    with open(output_json_path, 'r', encoding='utf-8') as f:
+        return len(json.load(f))
+
+def _print_scaling_table(title, rows):
+    print(f"\n{title}")
+    print(f"{'jobs':>6} {'seconds':>10} {'monsters/s':>12} {'speedup':>9}")
+    baseline = rows[0][1] if rows else None
+    for jobs, seconds, count in rows:
+        speedup = baseline / seconds if seconds else 0
+        print(f"{jobs:>6} {seconds:>10.2f} {count / seconds if seconds else 0:>12.1f} {speedup:>8.2f}x")
+
+def benchmark_jobs_scaling(dnd_5e_input, pf2e_input_dir=None, job_counts=None, repeat=1):
+    """
+    Times both converters at each worker count and prints throughput and speedup
+    relative to the single-process run.
+    """
+    job_counts = job_counts or _default_job_counts()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = os.path.join(tmp_dir, 'out.json')
+
+        rows = []
+        for jobs in job_counts:
+            seconds = min(_time_run(dnd_5e_converter.convert_monster_data, dnd_5e_input, output_path, jobs=jobs) for _ in range(repeat))
+            rows.append((jobs, seconds, _count_entries(output_path)))
+        _print_scaling_table(f"dnd_5e_converter: {dnd_5e_input}", rows)
+
+        if pf2e_input_dir:
+            rows = []
+            for jobs in job_counts:
+                seconds = min(_time_run(pf2e_converter.convert_monster_data, pf2e_input_dir, output_path, jobs=jobs) for _ in range(repeat))
+                rows.append((jobs, seconds, _count_entries(output_path)))
+            _print_scaling_table(f"pf2e_converter: {pf2e_input_dir}", rows)
+
+def _replace_enrichers_multipass(description_value):
+    """The seven sequential re.sub passes replace_enrichers replaced, kept as the baseline."""
+    cleaned_desc = re.sub(r'@UUID\[[^\]]+\]\{([^}]+)\}', r'\1', description_value)
+    cleaned_desc = re.sub(r'@UUID\[(?:[^\]]*[/\.])?([^\].]+?)\]', r'\1', cleaned_desc)
+    cleaned_desc = re.sub(r'@Check\[([^\]]+)\]', lambda m: f"Check ({m.group(1).replace('|', ' ').title()})", cleaned_desc)
+    cleaned_desc = re.sub(r'@Damage\[([^\]]+)\]', lambda m: f"{m.group(1).replace('[', ' ').replace(']', ' ')} damage", cleaned_desc)
+    cleaned_desc = re.sub(r'@Localize\[[^\]]+\]', '', cleaned_desc)
+    cleaned_desc = re.sub(r'\[\[/r ([^\]]+)\]\]', r'(\1)', cleaned_desc)
+    cleaned_desc = re.sub(r'\[\[/br (.*?)\]\]', r'(\1)', cleaned_desc)
+    return cleaned_desc
+
+def _long_spell_description(paragraphs):
+    """
+    A spell text in the style of the PF2e system's longer spells: an opening paragraph
+    with saves, damage and condition links, then heightened entries that are mostly prose.
+    """
+    opening = ("<p>A roaring blast of fire detonates at a spot you designate, dealing @Damage[(6d6)[fire]] damage to "
+               "each creature in a @Template[type:burst|distance:20]. Each creature must attempt a @Check[type:reflex|dc:25|basic:true] "
+               "save; on a critical failure it is also @UUID[Compendium.pf2e.conditionitems.Item.Prone]{Prone}.</p>\n")
+    heightened = ("<hr /><p><strong>Heightened (+1)</strong> The damage increases by 2d6, and creatures that fail their save "
+                  "take an additional amount of persistent fire damage equal to the spell's rank. Plain prose without any "
+                  "enrichers makes up the bulk of most spell descriptions, including the flavour text, the area and the "
+                  "clarifications on how the effect interacts with cover, concealment and other spells.</p>\n")
+    return opening + heightened * (paragraphs - 1) if paragraphs > 1 else opening
+
+def benchmark_enrichers(paragraph_counts=(1, 4, 16), iterations=5000):
+    """Times the single-pass enricher engine against the old multi-pass chain on long spell texts."""
+    print(f"\nEnricher replacement, {iterations} descriptions per size")
+    print(f"{'chars':>8} {'multipass us':>13} {'single us':>10} {'speedup':>9}")
+    for paragraphs in paragraph_counts:
+        description = _long_spell_description(paragraphs)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            _replace_enrichers_multipass(description)
+        multipass_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(iterations):
+            replace_enrichers(description)
+        single_seconds = time.perf_counter() - start
+        print(f"{len(description):>8} {multipass_seconds / iterations * 1e6:>13.1f} {single_seconds / iterations * 1e6:>10.1f} "
+              f"{multipass_seconds / single_seconds:>8.2f}x")
+
+def _load_npc_documents(pf2e_input_dir):
+    """Loads every convertible NPC document under a PF2e input directory."""
+    documents = []
+    for filepath in pf2e_converter._iter_monster_files(pf2e_input_dir):
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                document = json.load(f)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            continue
+        if isinstance(document, dict) and document.get('type') == 'npc' and document.get('name'):
+            documents.append(document)
+    return documents
+
+def _load_baseline_converter(baseline_dir, module_name):
+    """
+    Imports a converter module from another checkout (e.g. one made with git worktree)
+    under a private name. Its helper modules resolve to the ones already imported here.
+    """
+    sys.path.append(baseline_dir)
+    try:
+        spec = importlib.util.spec_from_file_location(f"baseline_{module_name}", os.path.join(baseline_dir, f"{module_name}.py"))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(baseline_dir)
+    return module
+
+def _time_per_thousand(format_notes, monsters, min_monsters):
+    """Renders the monsters (repeatedly, at least min_monsters in total) and returns ms per 1,000."""
+    rounds = max(1, -(-min_monsters // len(monsters)))
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for monster in monsters:
+            format_notes(monster)
+    return (time.perf_counter() - start) / (rounds * len(monsters)) * 1e6
+
+def benchmark_render(dnd_5e_input, pf2e_input_dir=None, baseline_dir=None, min_monsters=5000, repeat=3):
+    """
+    Times format_monster_notes per 1,000 monsters for each converter. With baseline_dir,
+    the same inputs are also rendered by the converters in that directory for comparison.
+    """
+    suites = []
+    with open(dnd_5e_input, 'r', encoding='utf-8') as f:
+        suites.append(('dnd_5e_converter', dnd_5e_converter, [m for m in json.load(f) if m.get('name')]))
+    if pf2e_input_dir:
+        suites.append(('pf2e_converter', pf2e_converter, _load_npc_documents(pf2e_input_dir)))
+
+    print(f"\nStat block rendering (format_monster_notes), ms per 1,000 monsters, best of {repeat}")
+    print(f"{'converter':<18} {'monsters':>9} {'current':>9} {'baseline':>9} {'speedup':>9}")
+    for module_name, module, monsters in suites:
+        if not monsters:
+            continue
+        current = min(_time_per_thousand(module.format_monster_notes, monsters, min_monsters) for _ in range(repeat))
+        if baseline_dir:
+            baseline_module = _load_baseline_converter(baseline_dir, module_name)
+            baseline = min(_time_per_thousand(baseline_module.format_monster_notes, monsters, min_monsters) for _ in range(repeat))
+            print(f"{module_name:<18} {len(monsters):>9} {current:>9.1f} {baseline:>9.1f} {baseline / current:>8.2f}x")
+        else:
+            print(f"{module_name:<18} {len(monsters):>9} {current:>9.1f} {'-':>9} {'-':>9}")
+
+def _maxrss_mb(who):
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return round(resource.getrusage(who).ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def _peak_rss_mb():
+    """Peak resident memory of this process in MB, or None where it can't be measured."""
+    # Linux keeps ru_maxrss across exec, so a spawned child would report its parent's peak
+    # if it was higher; the address space's own high-water mark doesn't have that problem
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return _maxrss_mb(resource.RUSAGE_SELF) if resource else None
+
+def _measure_conversion_in_child(module_name, args, kwargs):
+    """Runs in a fresh process: one full conversion, returning its seconds and peak memory."""
+    module = importlib.import_module(module_name)
+    result = {"seconds": round(_time_run(module.convert_monster_data, *args, **kwargs), 3), "peak_rss_mb": _peak_rss_mb()}
+    if resource and kwargs.get('jobs', 1) != 1:
+        # Largest worker of the process pool
+        result["peak_worker_rss_mb"] = _maxrss_mb(resource.RUSAGE_CHILDREN)
+    return result
+
+def _measure_conversion(module_name, *args, **kwargs):
+    """Times a full conversion in a new interpreter, so its peak memory isn't shared with earlier runs."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(_measure_conversion_in_child, module_name, args, kwargs).result()
+
+def _dnd_5e_stage_times(input_path, output_path):
+    """
+    Converts a 5e dump serially, the way convert_monster_data does, timing each stage:
+    incremental parsing, building the stat block, rendering the notes, and writing.
+    """
+    stages = dict.fromkeys(('parse', 'convert', 'render', 'write'), 0.0)
+    clock = time.perf_counter
+    end = object()
+    with open(input_path, 'r', encoding='utf-8') as f, contextlib.redirect_stdout(io.StringIO()):
+        writer = open_export_writer(output_path)
+        entries = iter_json_array(f)
+        while True:
+            start = clock()
+            monster = next(entries, end)
+            parsed = clock()
+            stages['parse'] += parsed - start
+            if monster is end:
+                break
+            converted_monster = dnd_5e_converter._convert_single_monster(monster, structured=True)
+            converted = clock()
+            stages['convert'] += converted - parsed
+            if not converted_monster:
+                continue
+            converted_monster["notes"] = render_statblock(converted_monster.pop("statblock"))
+            rendered = clock()
+            stages['render'] += rendered - converted
+            writer.write(converted_monster)
+            stages['write'] += clock() - rendered
+        start = clock()
+        writer.close()
+        stages['write'] += clock() - start
+    return stages
+
+def _pf2e_stage_times(input_dir, output_path):
+    """
+    Converts a PF2e tree serially, the way convert_monster_data does without a cache,
+    timing each stage: walking the tree, reading, parsing, building the stat block,
+    rendering the notes, and sorting plus writing the output.
+    """
+    stages = dict.fromkeys(('scan', 'read', 'parse', 'convert', 'render', 'sort+write'), 0.0)
+    clock = time.perf_counter
+    start = clock()
+    monster_files = list(pf2e_converter._iter_monster_files(input_dir))
+    stages['scan'] = clock() - start
+    sorter = ExternalSorter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for filepath in monster_files:
+            start = clock()
+            raw_bytes = pf2e_converter._read_monster_file(filepath)
+            read = clock()
+            stages['read'] += read - start
+            if raw_bytes is None:
+                continue
+            try:
+                monster_data = json.loads(raw_bytes.decode('utf-8'))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            parsed = clock()
+            stages['parse'] += parsed - read
+            try:
+                converted_monster = pf2e_converter._convert_monster_document(monster_data, filepath)
+            except Exception:
+                continue
+            converted = clock()
+            stages['convert'] += converted - parsed
+            if not converted_monster:
+                continue
+            converted_monster = pf2e_converter._with_rendered_notes(converted_monster)
+            rendered = clock()
+            stages['render'] += rendered - converted
+            sorter.add(converted_monster)
+            stages['sort+write'] += clock() - rendered
+        start = clock()
+        writer = open_export_writer(output_path)
+        for converted_monster in sorter.sorted():
+            writer.write(converted_monster)
+        writer.close()
+        stages['sort+write'] += clock() - start
+    return stages
+
+def _git_commit():
+    """The checked-out commit, so saved results can be matched to the code that produced them."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _input_size_mb(path):
+    if os.path.isfile(path):
+        return round(os.path.getsize(path) / (1024 * 1024), 1)
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, filename)) for filename in files)
+    return round(total / (1024 * 1024), 1)
+
+def _append_results(results_path, session):
+    """Appends one benchmark session to a JSON file holding the history of runs."""
+    history = []
+    if os.path.exists(results_path):
+        with open(results_path, 'r', encoding='utf-8') as f:
+            history = json.load(f)
+    history.append(session)
+    with open(results_path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=2)
+    print(f"\nSaved results to {results_path} ({len(history)} runs)")
+
+def benchmark_corpus(dnd_5e_source, dnd_5e_sizes=(10000, 100000), pf2e_npcs=5000, job_counts=(1,), corpus_dir=None, results_path=None):
+    """
+    Generates synthetic corpora (the 5e dump scaled to each of dnd_5e_sizes, and a Foundry-shaped
+    PF2e tree with pf2e_npcs NPCs plus as many other documents) and measures both converters
+    on them: throughput and peak memory of a full run in a fresh process per worker count,
+    and the time spent in each pipeline stage of a serial run. Corpora are kept in corpus_dir
+    (and reused on later runs) if given. With results_path, the session is appended there.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus_dir = corpus_dir or tmp_dir
+        os.makedirs(corpus_dir, exist_ok=True)
+        corpora = []
+        for size in dnd_5e_sizes:
+            path = os.path.join(corpus_dir, f"dnd_5e_{size}.json")
+            if not os.path.exists(path):
+                print(f"Generating {path}...")
+                write_dnd_5e_corpus(dnd_5e_source, path, size)
+            corpora.append((f"dnd_5e_{size}", 'dnd_5e_converter', path, size, _dnd_5e_stage_times))
+        if pf2e_npcs:
+            path = os.path.join(corpus_dir, f"pf2e_{pf2e_npcs}")
+            if not os.path.isdir(path):
+                print(f"Generating {path}...")
+                write_pf2e_corpus(path, pf2e_npcs)
+            corpora.append((f"pf2e_{pf2e_npcs}", 'pf2e_converter', path, pf2e_npcs, _pf2e_stage_times))
+
+        output_path = os.path.join(tmp_dir, 'out.json')
+        results = []
+        print(f"\n{'corpus':<14} {'converter':<18} {'jobs':>5} {'monsters':>9} {'seconds':>9} {'monsters/s':>11} {'peak MB':>8}  stages (serial run, s)")
+        for corpus_name, module_name, input_path, monsters, stage_times in corpora:
+            stages = stage_times(input_path, output_path)
+            stage_text = ", ".join(f"{stage} {seconds:.2f}" for stage, seconds in stages.items())
+            for jobs in job_counts:
+                measured = _measure_conversion(module_name, input_path, output_path, jobs=jobs)
+                converted = _count_entries(output_path)
+                throughput = converted / measured["seconds"] if measured["seconds"] else 0
+                peak = measured.get("peak_rss_mb")
+                print(f"{corpus_name:<14} {module_name:<18} {jobs:>5} {converted:>9} {measured['seconds']:>9.2f} {throughput:>11.1f} "
+                      f"{peak if peak is not None else '-':>8}  {stage_text}")
+                results.append({
+                    "corpus": corpus_name,
+                    "converter": module_name,
+                    "input_mb": _input_size_mb(input_path),
+                    "input_monsters": monsters,
+                    "jobs": jobs,
+                    "converted": converted,
+                    **measured,
+                    "monsters_per_second": round(throughput, 1),
+                    "stage_seconds": {stage: round(seconds, 3) for stage, seconds in stages.items()},
+                })
+
+    if results_path:
+        _append_results(results_path, {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "results": results,
+        })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the monster converters.")
+    parser.add_argument("suite", nargs="?", choices=["jobs", "enrichers", "render", "corpus"], default="jobs", help="jobs: scaling with --jobs; enrichers: per-description enricher replacement; render: stat block rendering per 1,000 monsters; corpus: throughput, stage times and peak memory on generated corpora.")
+    parser.add_argument("--dnd5e-input", type=str, default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "dnd_5e_base.json"), help="5e monster dump to convert.")
+    parser.add_argument("--pf2e-input", type=str, help="Directory of PF2e monster JSON files to convert (optional).")
+    parser.add_argument("--jobs", type=int, nargs="+", help="Worker counts to try (default: 1, 2, 4, ... up to the CPU count).")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per worker count; the fastest is reported.")
+    parser.add_argument("--baseline", type=str, help="render: directory holding another version of the converters to compare against.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000], help="corpus: numbers of 5e monsters to generate.")
+    parser.add_argument("--pf2e-npcs", type=int, default=5000, help="corpus: NPCs in the generated PF2e tree (0 to skip it).")
+    parser.add_argument("--corpus-dir", type=str, help="corpus: keep generated corpora here and reuse them on later runs.")
+    parser.add_argument("--results", type=str, default="converter_benchmark_results.json", help="corpus: JSON file the run is appended to.")
+
+    args = parser.parse_args()
+
+    if args.suite == "enrichers":
+        benchmark_enrichers()
+    elif args.suite == "render":
+        benchmark_render(args.dnd5e_input, args.pf2e_input, args.baseline)
+    elif args.suite == "corpus":
+        benchmark_corpus(args.dnd5e_input, args.sizes, args.pf2e_npcs, args.jobs or [1], args.corpus_dir, args.results)
+    else:
+        benchmark_jobs_scaling(args.dnd5e_input, args.pf2e_input, args.jobs, args.repeat)
@@ -0,0 +1,185 @@
+import json
+import os
+from collections import OrderedDict
+
+CACHE_FORMAT_VERSION = 2
+DEFAULT_MEMO_SIZE = 4096
+
+def content_hash(raw_bytes):
+    """Returns the hex SHA-256 of a file's raw bytes."""
+    import hashlib # Here rather than at the top, to keep it out of startup for runs without a cache
+    return hashlib.sha256(raw_bytes).hexdigest()
+
+def source_signature(*source_paths):
+    """
+    Hashes the converter source files so a cache written by a different
+    version of the rendering code is never reused.
+    """
+    import hashlib
+    digest = hashlib.sha256()
+    for source_path in source_paths:
+        with open(source_path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def _connect_cache(path):
+    """Opens (creating it if need be) a render cache database."""
+    import sqlite3
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT)")
+    db.execute("CREATE TABLE IF NOT EXISTS entries (path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, sha256 TEXT, record TEXT)")
+    return db
+
+class RenderCache:
+    """
+    On-disk cache of converted records, keyed by input file path: an sqlite database read
+    and written one entry at a time, so a run never holds the whole cache in memory.
+    Each entry remembers the file's mtime/size and content hash; a file whose
+    mtime and size are unchanged is a hit without being read, and a file whose
+    bytes hash to the stored value is a hit without being re-rendered.
+    Changes are written in one transaction that save() commits, so a run that fails or
+    is interrupted leaves the cache as it was.
+    """
+
+    def __init__(self, cache_path, signature, rebuild=False):
+        self.cache_path = cache_path
+        self.signature = signature
+        self.seen_paths = set()
+        self.hits = 0
+        self.misses = 0
+        self.removed = 0
+        self._db = self._open(rebuild)
+
+    def _open(self, rebuild):
+        import sqlite3 # Here rather than at the top, to keep it out of startup for runs without a cache
+        try:
+            db = _connect_cache(self.cache_path)
+            settings = dict(db.execute("SELECT key, value FROM settings"))
+        except sqlite3.OperationalError as e:
+            # Locked by another run, or not writable: convert without keeping anything
+            print(f"Warning: Could not open cache file {self.cache_path}: {e}")
+            return _connect_cache(':memory:')
+        except sqlite3.DatabaseError:
+            print(f"Warning: Ignoring unreadable cache file {self.cache_path}.")
+            os.remove(self.cache_path)
+            db = _connect_cache(self.cache_path)
+            settings = {}
+        if settings and (settings.get('version') != str(CACHE_FORMAT_VERSION) or settings.get('signature') != self.signature):
+            print(f"Cache at {self.cache_path} was written by a different converter version; rebuilding.")
+            rebuild = True
+        if rebuild:
+            db.execute("DELETE FROM entries")
+        db.executemany("INSERT OR REPLACE INTO settings VALUES (?, ?)", (('version', str(CACHE_FORMAT_VERSION)), ('signature', self.signature)))
+        return db
+
+    def lookup(self, path, stat_result):
+        """
+        Returns (is_fresh, cached_hash) for a file. is_fresh means mtime and size
+        match the cached entry; otherwise cached_hash (possibly None) lets the
+        caller skip rendering if the content turns out to be unchanged.
+        """
+        self.seen_paths.add(path)
+        entry = self._db.execute("SELECT mtime_ns, size, sha256 FROM entries WHERE path = ?", (path,)).fetchone()
+        if entry is None:
+            return False, None
+        mtime_ns, size, sha256 = entry
+        is_fresh = mtime_ns == stat_result.st_mtime_ns and size == stat_result.st_size
+        return is_fresh, sha256
+
+    def get_record(self, path):
+        """Returns the cached converted record (or None for a cached non-monster file)."""
+        return json.loads(self._db.execute("SELECT record FROM entries WHERE path = ?", (path,)).fetchone()[0])
+
+    def record_hit(self, path, stat_result):
+        """Counts a hit and refreshes the stored mtime/size for a file whose content was unchanged."""
+        self.hits += 1
+        self._db.execute("UPDATE entries SET mtime_ns = ?, size = ? WHERE path = ?", (stat_result.st_mtime_ns, stat_result.st_size, path))
+
+    def store(self, path, stat_result, sha256, record):
+        """Counts a miss and stores a freshly converted record."""
+        self.misses += 1
+        self.put(path, stat_result, sha256, record)
+
+    def put(self, path, stat_result, sha256, record):
+        """Stores a converted record for a file already counted as a miss (see discard)."""
+        self._db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                         (path, stat_result.st_mtime_ns, stat_result.st_size, sha256, json.dumps(record, ensure_ascii=False)))
+
+    def discard(self, path):
+        """
+        Counts a miss for a file whose record isn't stored now (it could not be converted,
+        was filtered out, or is only converted later if at all) and forgets its entry.
+        """
+        self.misses += 1
+        self._db.execute("DELETE FROM entries WHERE path = ?", (path,))
+
+    def save(self, prune=True):
+        """
+        Commits this run's changes to disk and closes the cache. With prune, entries for
+        files that were not seen during this run (i.e. deleted files) are dropped.
+        """
+        import sqlite3
+        try:
+            if prune:
+                stale_paths = [(path,) for path, in self._db.execute("SELECT path FROM entries") if path not in self.seen_paths]
+                self._db.executemany("DELETE FROM entries WHERE path = ?", stale_paths)
+                self.removed = len(stale_paths)
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Warning: Could not write cache file {self.cache_path}: {e}")
+        finally:
+            self._db.close()
+
+    def summary(self):
+        return f"Cache: {self.hits} hits, {self.misses} misses, {self.removed} removed ({self.cache_path})"
+
+class BoundedMemo:
+    """
+    In-memory LRU of values computed from content within one run, e.g. cleaned
+    descriptions keyed by the raw description text (the same spells and standard
+    abilities are embedded in hundreds of NPCs). At most max_entries are kept, the
+    least recently used going first; max_entries of 0 computes every value afresh.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MEMO_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, compute, *args):
+        """
+        Returns the value stored for key, computing it as compute(*args) on a miss. An
+        unhashable key (e.g. one built from a JSON list) is neither stored nor counted.
+        """
+        try:
+            value = self.entries[key]
+        except KeyError:
+            pass
+        except TypeError:
+            return compute(*args)
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return value
+        self.misses += 1
+        value = compute(*args)
+        if self.max_entries > 0:
+            self.entries[key] = value
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def resize(self, max_entries):
+        """Changes the bound, dropping the least recently used entries that no longer fit."""
+        self.max_entries = max_entries
+        while len(self.entries) > max(max_entries, 0):
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def summary(self, label):
+        lookups = self.hits + self.misses
+        hit_rate = self.hits / lookups if lookups else 0.0
+        return f"{label}: {self.hits} hits, {self.misses} misses ({hit_rate:.1%} hit rate), {self.evictions} evicted, limit {self.max_entries}"
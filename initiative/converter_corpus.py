@@ -0,0 +1,319 @@
+import json
+import argparse
+import os
+import random
+
+from converter_output import JsonArrayWriter
+
+# Synthetic inputs for converter_benchmark.py. Everything is drawn from a seeded
+# random.Random, so the same arguments always produce the same corpus.
+
+# 5e entries whose items carry a free-text description
+_DND_5E_DESCRIPTION_KEYS = ('special_abilities', 'actions', 'legendary_actions')
+
+def write_dnd_5e_corpus(source_path, output_path, count, seed=0):
+    """
+    Writes a 5e monster dump of count entries built from a real one (dnd_5e_base.json).
+    Monsters are cycled with numbered names, and each of their traits and actions gets a
+    description drawn from the whole source dataset, so description lengths follow the
+    real distribution instead of repeating the same few monsters verbatim.
+    Returns the number of entries written.
+    """
+    with open(source_path, 'r', encoding='utf-8') as f:
+        source = [monster for monster in json.load(f) if monster.get('name')]
+    rng = random.Random(seed)
+    pools = {key: [item['desc'] for monster in source for item in monster.get(key) or () if item.get('desc')]
+             for key in _DND_5E_DESCRIPTION_KEYS}
+
+    writer = JsonArrayWriter(output_path)
+    try:
+        for index in range(count):
+            base = source[index % len(source)]
+            monster = dict(base)
+            copy_number = index // len(source)
+            if copy_number:
+                monster['name'] = f"{base['name']} {copy_number + 1}"
+            for key, pool in pools.items():
+                if base.get(key) and pool:
+                    monster[key] = [dict(item, desc=rng.choice(pool)) for item in base[key]]
+            writer.write(monster)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+    return writer.count
+
+# --- PF2e: a Foundry system checkout's packs/ tree ---
+
+_PF2E_NPC_PACKS = ('pathfinder-bestiary', 'pathfinder-bestiary-2', 'pathfinder-bestiary-3', 'pathfinder-monster-core')
+# Packs of other document types mixed into the same tree, as in the real repository
+_PF2E_NOISE_PACKS = {
+    'spells-srd': 'spell',
+    'equipment-srd': 'weapon',
+    'feats-srd': 'feat',
+    'hazards': 'hazard',
+}
+
+_SIZES = ('tiny', 'sm', 'med', 'lg', 'huge', 'grg')
+_CREATURE_TYPES = ('aberration', 'animal', 'beast', 'construct', 'dragon', 'fey', 'fiend', 'humanoid', 'undead')
+_EXTRA_TRAITS = ('amphibious', 'demon', 'devil', 'earth', 'fire', 'giant', 'goblin', 'mindless', 'orc', 'swarm', 'water')
+_NAME_PARTS = ('Ash', 'Bone', 'Cinder', 'Dread', 'Ember', 'Frost', 'Gloom', 'Iron', 'Moss', 'Storm', 'Thorn', 'Venom')
+_NAME_KINDS = ('Drake', 'Ghoul', 'Hag', 'Knight', 'Lurker', 'Mauler', 'Ooze', 'Shade', 'Stalker', 'Wyrm')
+_DAMAGE_TYPES = ('bludgeoning', 'piercing', 'slashing', 'fire', 'cold', 'acid', 'poison', 'mental')
+_CONDITIONS = ('Frightened', 'Grabbed', 'Prone', 'Sickened', 'Slowed', 'Stunned', 'Clumsy', 'Enfeebled')
+
+# Sentence templates for descriptions; roughly a third use enrichers, like the real data
+_SENTENCES = (
+    "The {kind} lashes out with terrible speed, and the air around it shimmers with barely contained power.",
+    "Each creature in a @Template[type:{area}|distance:{distance}] takes @Damage[{dice}d{die}[{damage}]] damage.",
+    "Affected creatures must attempt a @Check[type:{save}|dc:{dc}|basic:true] save.",
+    "On a critical failure, the target is also @UUID[Compendium.pf2e.conditionitems.Item.{condition}]{{{condition}}}.",
+    "A creature that fails becomes @UUID[Compendium.pf2e.conditionitems.Item.{condition}] until the end of its next turn.",
+    "The target takes [[/r {dice}d6 #persistent {damage}]] persistent damage.",
+    "@Localize[PF2E.NPC.Abilities.Glossary.{ability}]",
+    "It can't use this ability again for [[/br 1d4 #Recharge]] rounds.",
+    "This ability has the <strong>{trait}</strong> trait, and creatures immune to {damage} effects are unaffected.",
+    "Plain prose makes up most of the text: flavour, clarifications on cover and concealment, and how the effect stacks.",
+    "While the effect lasts, the {kind} gains a +{bonus} status bonus to AC and saving throws against spells.",
+    "See <a href=\"https://2e.aonprd.com/Rules.aspx?ID={dc}\">the rules</a> for how this interacts with other reactions.",
+)
+_ABILITY_KEYS = ('Grab', 'Knockdown', 'AttackOfOpportunity', 'Constrict', 'Swallow', 'Trample')
+
+def _sentence(rng, kind):
+    return rng.choice(_SENTENCES).format(
+        kind=kind.lower(), area=rng.choice(('burst', 'cone', 'emanation', 'line')), distance=rng.choice((10, 15, 30, 60)),
+        dice=rng.randint(1, 12), die=rng.choice((4, 6, 8, 10, 12)), damage=rng.choice(_DAMAGE_TYPES),
+        save=rng.choice(('fortitude', 'reflex', 'will')), dc=rng.randint(14, 45), condition=rng.choice(_CONDITIONS),
+        ability=rng.choice(_ABILITY_KEYS), trait=rng.choice(_EXTRA_TRAITS), bonus=rng.randint(1, 4))
+
+def _description(rng, kind, max_paragraphs=3, max_sentences=6):
+    """Foundry-style description HTML: one or more paragraphs of mixed prose and enrichers."""
+    paragraphs = []
+    for _ in range(rng.randint(1, max_paragraphs)):
+        paragraphs.append("<p>" + " ".join(_sentence(rng, kind) for _ in range(rng.randint(1, max_sentences))) + "</p>")
+    return "\n".join(paragraphs)
+
+def _document_id(rng):
+    return ''.join(rng.choice('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789') for _ in range(16))
+
+def _stats():
+    # The bookkeeping block Foundry adds to every document; the converters ignore it but still parse it
+    return {"compendiumSource": None, "coreVersion": "12.331", "systemId": "pf2e", "systemVersion": "6.8.0",
+            "createdTime": None, "modifiedTime": None, "lastModifiedBy": None, "duplicateSource": None}
+
+def _spell(rng, kind, location_id, rank):
+    return {
+        "_id": _document_id(rng),
+        "name": f"{rng.choice(_NAME_PARTS)} {rng.choice(('Bolt', 'Ray', 'Ward', 'Blast', 'Curse', 'Veil'))}",
+        "type": "spell",
+        "img": "systems/pf2e/icons/default-icons/spell.svg",
+        "system": {
+            "description": {"value": _description(rng, kind, max_paragraphs=4), "gm": ""},
+            "level": {"value": rank},
+            "time": {"value": rng.choice(("1", "2", "3", "reaction"))},
+            "range": {"value": rng.choice(("", "touch", "30 feet", "120 feet"))},
+            "target": {"value": rng.choice(("", "1 creature", "up to 5 creatures"))},
+            "area": None,
+            "duration": {"sustained": False, "value": rng.choice(("", "1 minute"))},
+            "defense": {"save": {"basic": True, "statistic": rng.choice(("fortitude", "reflex", "will"))}},
+            "damage": {"0": {"formula": f"{rng.randint(1, 10)}d6", "kinds": ["damage"], "type": rng.choice(_DAMAGE_TYPES)}},
+            "heightening": {"type": "interval", "interval": 1, "damage": {"0": "2d6"}},
+            "traits": {"rarity": "common", "traditions": ["arcane", "primal"], "value": ["concentrate", "manipulate"]},
+            "location": {"value": location_id, "heightenedLevel": None},
+            "publication": {"license": "ORC", "remaster": True, "title": "Pathfinder Player Core"},
+            "rules": [],
+            "slug": None,
+        },
+        "_stats": _stats(),
+    }
+
+def _strike(rng, kind, level):
+    ranged = rng.random() < 0.3
+    traits = ["magical"] if rng.random() < 0.3 else []
+    if ranged:
+        traits.append(rng.choice(("range-increment-30", "thrown-20", "range-60")))
+    else:
+        traits.extend(rng.sample(("agile", "finesse", "reach-10", "reach-15", "deadly-d10"), rng.randint(0, 2)))
+    damage_rolls = {_document_id(rng): {"damage": f"{rng.randint(1, 4)}d{rng.choice((4, 6, 8, 10, 12))}+{level + rng.randint(0, 6)}",
+                                        "damageType": rng.choice(_DAMAGE_TYPES), "category": None}
+                    for _ in range(rng.randint(1, 2))}
+    return {
+        "_id": _document_id(rng),
+        "name": rng.choice(("Jaws", "Claw", "Tail", "Longsword", "Spear", "Shortbow", "Fist", "Horn")),
+        "type": "melee",
+        "img": "systems/pf2e/icons/default-icons/melee.svg",
+        "system": {
+            "bonus": {"value": level + rng.randint(5, 12)},
+            "damageRolls": damage_rolls,
+            "attackEffects": {"value": [rng.choice(("grab", "knockdown", "improved-grab"))] if rng.random() < 0.3 else []},
+            "description": {"value": _description(rng, kind, max_paragraphs=1, max_sentences=2) if rng.random() < 0.2 else ""},
+            "traits": {"value": traits},
+            "weaponType": {"value": "ranged" if ranged else "melee"},
+            "rules": [],
+            "slug": None,
+        },
+        "_stats": _stats(),
+    }
+
+def _action(rng, kind):
+    action_type = rng.choice(('passive', 'passive', 'action', 'reaction', 'free'))
+    return {
+        "_id": _document_id(rng),
+        "name": rng.choice(("Darkvision", "Attack of Opportunity", "Breath Weapon", "Frightful Presence", "Regeneration",
+                            "Trample", "Ferocity", "Swallow Whole", "Shield Block", "Sneak Attack")),
+        "type": "action",
+        "img": "systems/pf2e/icons/actions/Passive.webp",
+        "system": {
+            "actionType": {"value": action_type},
+            "actions": {"value": rng.randint(1, 3) if action_type == 'action' else None},
+            "category": "offensive" if action_type == 'action' else "defensive",
+            "description": {"value": _description(rng, kind)},
+            "traits": {"value": rng.sample(_EXTRA_TRAITS, rng.randint(0, 2))},
+            "rules": [],
+            "slug": None,
+        },
+        "_stats": _stats(),
+    }
+
+def _equipment(rng, kind):
+    return {
+        "_id": _document_id(rng),
+        "name": rng.choice(("Dagger", "Chain Mail", "Healing Potion", "Composite Longbow", "Scroll of Fear")),
+        "type": rng.choice(("weapon", "armor", "consumable")),
+        "img": "systems/pf2e/icons/default-icons/weapon.svg",
+        "system": {
+            "description": {"value": _description(rng, kind, max_paragraphs=1)},
+            "quantity": 1,
+            "price": {"value": {"gp": rng.randint(1, 200)}},
+            "rules": [],
+        },
+        "_stats": _stats(),
+    }
+
+def _embedded(rng, document, location_id=None):
+    # A copy of a compendium document as an NPC embeds it: its own _id, and for spells its entry
+    system = document['system'] if location_id is None else dict(document['system'], location={"value": location_id, "heightenedLevel": None})
+    return dict(document, _id=_document_id(rng), system=system)
+
+def _npc(rng, index, spell_pool, ability_pool):
+    level = rng.randint(-1, 25)
+    creature_type = rng.choice(_CREATURE_TYPES)
+    kind = rng.choice(_NAME_KINDS)
+    items = []
+    for _ in range(rng.randint(1, 3)):
+        items.append(_strike(rng, kind, level))
+    for _ in range(rng.randint(1, 8)):
+        # Most abilities are the standard ones (Darkvision, Attack of Opportunity...) with the stock text
+        items.append(_embedded(rng, rng.choice(ability_pool)) if rng.random() < 0.6 else _action(rng, kind))
+    if rng.random() < 0.4:
+        for _ in range(rng.randint(1, 2)):
+            entry_id = _document_id(rng)
+            items.append({"_id": entry_id, "name": f"{rng.choice(('Arcane', 'Divine', 'Occult', 'Primal'))} {rng.choice(('Innate', 'Prepared', 'Spontaneous'))} Spells",
+                          "type": "spellcastingEntry", "system": {"spelldc": {"dc": 10 + level, "value": level}, "tradition": {"value": "arcane"}}})
+            for _ in range(rng.randint(3, 15)):
+                # and most spells are copies of the compendium spell
+                items.append(_embedded(rng, rng.choice(spell_pool), entry_id) if rng.random() < 0.8 else _spell(rng, kind, entry_id, rng.randint(1, 10)))
+    if rng.random() < 0.05:
+        items.append(_spell(rng, kind, "", rng.randint(1, 10))) # A spell without its entry shows up under traits
+    for _ in range(rng.randint(0, 3)):
+        items.append(_equipment(rng, kind))
+    rng.shuffle(items)
+
+    skills = {skill: {"base": level + rng.randint(2, 10)} for skill in rng.sample(('acrobatics', 'athletics', 'deception', 'intimidation', 'stealth', 'survival'), rng.randint(1, 4))}
+    return {
+        "_id": _document_id(rng),
+        "name": f"{rng.choice(_NAME_PARTS)} {kind} {index}",
+        "type": "npc",
+        "img": "systems/pf2e/icons/default-icons/npc.svg",
+        "items": items,
+        "system": {
+            "abilities": {ability: {"mod": rng.randint(-2, 8)} for ability in ('str', 'dex', 'con', 'int', 'wis', 'cha')},
+            "attributes": {
+                "ac": {"value": 14 + level + rng.randint(0, 4), "details": "" if rng.random() < 0.8 else "with shield raised"},
+                "hp": {"value": 10 + level * 15, "max": 10 + level * 15, "details": "" if rng.random() < 0.8 else "regeneration 10"},
+                "speed": {"value": rng.choice((20, 25, 30, 40)), "otherSpeeds": [{"type": "fly", "value": 60}] if rng.random() < 0.3 else []},
+                "weaknesses": [{"type": "cold-iron", "value": 5 + level // 2}] if rng.random() < 0.3 else [],
+                "resistances": [{"type": rng.choice(_DAMAGE_TYPES), "value": 5 + level // 2}] if rng.random() < 0.3 else [],
+                "immunities": [{"type": rng.choice(_DAMAGE_TYPES)}] if rng.random() < 0.3 else [],
+            },
+            "details": {
+                "level": {"value": level},
+                "languages": {"value": rng.sample(('common', 'draconic', 'goblin', 'undercommon', 'sylvan'), rng.randint(0, 3)), "details": ""},
+                "publicNotes": _description(rng, kind, max_paragraphs=2) if rng.random() < 0.6 else "",
+                "privateNotes": "",
+                "blurb": "",
+                "publication": {"license": "ORC", "remaster": True, "title": "Pathfinder Monster Core"},
+            },
+            "perception": {"mod": level + rng.randint(2, 10), "senses": [{"type": "darkvision"}] if rng.random() < 0.6 else []},
+            "saves": {save: {"value": level + rng.randint(3, 12)} for save in ('fortitude', 'reflex', 'will')},
+            "skills": skills,
+            "traits": {"rarity": rng.choice(('common', 'common', 'common', 'uncommon', 'rare')), "size": {"value": rng.choice(_SIZES)},
+                       "value": [creature_type] + rng.sample(_EXTRA_TRAITS, rng.randint(0, 3))},
+        },
+        "prototypeToken": {"name": kind, "disposition": -1, "width": 1, "height": 1, "texture": {"src": "systems/pf2e/icons/default-icons/npc.svg"}},
+        "flags": {},
+        "_stats": _stats(),
+    }
+
+def _noise_document(rng, document_type, index):
+    kind = rng.choice(_NAME_KINDS)
+    if document_type == 'spell':
+        return dict(_spell(rng, kind, "", rng.randint(1, 10)), name=f"Spell {index}")
+    if document_type == 'weapon':
+        return dict(_equipment(rng, kind), name=f"Item {index}", type="weapon")
+    return {"_id": _document_id(rng), "name": f"{document_type.title()} {index}", "type": document_type,
+            "system": {"description": {"value": _description(rng, kind)}, "level": {"value": rng.randint(0, 20)}},
+            "_stats": _stats()}
+
+def write_pf2e_corpus(output_dir, npc_count, noise_per_npc=1.0, seed=0):
+    """
+    Writes a Foundry-shaped PF2e tree under output_dir: packs/<pack>/<document>.json, with
+    npc_count NPCs (strikes, actions, spellcasting entries with their spells, equipment)
+    spread over the bestiary packs, most spells and abilities embedded from a shared pool
+    as real bestiaries do, and about noise_per_npc documents of other types
+    (spells, equipment, feats, hazards) per NPC that the converter has to skip.
+    Returns (NPC files, other files) written.
+    """
+    rng = random.Random(seed)
+    packs_dir = os.path.join(output_dir, 'packs')
+    for pack in (*_PF2E_NPC_PACKS, *_PF2E_NOISE_PACKS):
+        os.makedirs(os.path.join(packs_dir, pack), exist_ok=True)
+
+    def write(pack, filename, document):
+        with open(os.path.join(packs_dir, pack, filename), 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2, ensure_ascii=False)
+
+    spell_pool = [_spell(rng, rng.choice(_NAME_KINDS), "", rng.randint(1, 10)) for _ in range(400)]
+    ability_pool = [_action(rng, rng.choice(_NAME_KINDS)) for _ in range(40)]
+    for index in range(npc_count):
+        write(_PF2E_NPC_PACKS[index % len(_PF2E_NPC_PACKS)], f"npc-{index:06d}.json", _npc(rng, index, spell_pool, ability_pool))
+
+    noise_count = int(npc_count * noise_per_npc)
+    noise_packs = list(_PF2E_NOISE_PACKS.items())
+    for index in range(noise_count):
+        pack, document_type = noise_packs[index % len(noise_packs)]
+        write(pack, f"{document_type}-{index:06d}.json", _noise_document(rng, document_type, index))
+    return npc_count, noise_count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic converter inputs for benchmarking.")
+    subparsers = parser.add_subparsers(dest="corpus", required=True)
+    dnd_5e_parser = subparsers.add_parser("dnd5e", help="Scale the bundled 5e dump to a given number of entries.")
+    dnd_5e_parser.add_argument("output_file", type=str, help="Path of the 5e dump to write.")
+    dnd_5e_parser.add_argument("--count", type=int, default=10000, help="Number of monsters to write.")
+    dnd_5e_parser.add_argument("--source", type=str, default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "dnd_5e_base.json"), help="Real 5e dump to build from.")
+    pf2e_parser = subparsers.add_parser("pf2e", help="Write a Foundry-shaped PF2e packs tree.")
+    pf2e_parser.add_argument("output_dir", type=str, help="Directory to write the packs/ tree into.")
+    pf2e_parser.add_argument("--npcs", type=int, default=5000, help="Number of NPC documents.")
+    pf2e_parser.add_argument("--noise", type=float, default=1.0, help="Non-NPC documents per NPC.")
+    for subparser in (dnd_5e_parser, pf2e_parser):
+        subparser.add_argument("--seed", type=int, default=0, help="Random seed; the same seed gives the same corpus.")
+
+    args = parser.parse_args()
+
+    if args.corpus == "dnd5e":
+        count = write_dnd_5e_corpus(args.source, args.output_file, args.count, args.seed)
+        print(f"Wrote {count} monsters to {args.output_file}")
+    else:
+        npc_count, noise_count = write_pf2e_corpus(args.output_dir, args.npcs, args.noise, args.seed)
+        print(f"Wrote {npc_count} NPCs and {noise_count} other documents under {args.output_dir}")
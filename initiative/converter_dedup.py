@@ -0,0 +1,90 @@
+import json
+from converter_cache import content_hash
+from converter_index import SEARCH_FACETS_KEY
+
+# first: keep the first copy of a monster; prefer: the same, with copies from --prefer-pack
+# packs placed first; link: keep every copy, later ones pointing at the first
+DEDUP_POLICIES = ('first', 'prefer', 'link')
+# Later copies kept by the link policy carry the export position of the first copy under this key
+DUPLICATE_OF_KEY = 'duplicateOf'
+
+def _normalized(value):
+    """
+    A JSON value with every run of whitespace in its strings collapsed to one space, and
+    none left at either end or around the brackets of notes HTML tags.
+    """
+    if isinstance(value, str):
+        # split() and replace() rather than a regex: notes run to tens of kilobytes
+        collapsed = ' '.join(value.split())
+        return collapsed.replace('> ', '>').replace(' <', '<').replace('< ', '<').replace(' >', '>')
+    if isinstance(value, dict):
+        return {key: _normalized(nested) for key, nested in value.items()}
+    if isinstance(value, list):
+        return [_normalized(nested) for nested in value]
+    return value
+
+def dedup_hash(record):
+    """
+    The hash two copies of a monster share: that of the record as written (notes or stat
+    block included, search facets not), with whitespace normalized and keys sorted.
+    """
+    written = {key: value for key, value in record.items() if key != SEARCH_FACETS_KEY}
+    return content_hash(json.dumps(_normalized(written), ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8'))
+
+class DedupExportWriter:
+    """
+    Wraps an export writer and drops records identical (see dedup_hash) to one already
+    written, at one dict lookup per record. With the link policy every copy is written
+    and those after the first carry its position in the export (a search index id) under
+    DUPLICATE_OF_KEY. Which copy comes first is up to the order records are written in.
+    write() returns the encoded record only when the record was written unchanged, so a
+    caller reusing encodings never reuses one for a dropped or linked copy.
+    """
+
+    def __init__(self, writer, policy='first'):
+        self.writer = writer
+        self.link = policy == 'link'
+        self.removed = 0
+        self.linked = 0
+        self._positions = {} # dedup hash -> export position of the first copy
+
+    @property
+    def count(self):
+        return self.writer.count
+
+    @property
+    def output_path(self):
+        return self.writer.output_path
+
+    def write(self, record, encoded=None):
+        digest = dedup_hash(record)
+        position = self._positions.get(digest)
+        if position is None:
+            self._positions[digest] = self.writer.count
+            return self.writer.write(record, encoded)
+        if not self.link:
+            self.removed += 1
+            return None
+        self.linked += 1
+        self.writer.write({**record, DUPLICATE_OF_KEY: position})
+        return None
+
+    def close(self):
+        self.writer.close()
+        if self.link:
+            print(f"Linked {self.linked} duplicate monsters to their first copy.")
+        else:
+            print(f"Removed {self.removed} duplicate monsters.")
+
+    def abort(self):
+        self.writer.abort()
+
+def add_dedup_arguments(parser, packs=False):
+    """The --dedup options; with packs, also prefer and --prefer-pack (PF2e packs)."""
+    policies = DEDUP_POLICIES if packs else tuple(policy for policy in DEDUP_POLICIES if policy != 'prefer')
+    parser.add_argument("--dedup", choices=policies, help="Drop identical copies of a monster (same record, whitespace aside): keep the first copy, "
+                                                          + ("prefer the copy from a --prefer-pack pack, " if packs else "")
+                                                          + f"or keep every copy with later ones linked to the first by {DUPLICATE_OF_KEY}.")
+    if packs:
+        parser.add_argument("--prefer-pack", action="append", default=[], help="With --dedup, keep copies from packs matching this glob (like --pack) "
+                                                                               "over others; repeat in order of preference.")
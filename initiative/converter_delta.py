@@ -0,0 +1,226 @@
+import io
+import json
+import os
+from converter_cache import content_hash
+from converter_index import sidecar_path
+from converter_input import iter_json_array
+
+DELTA_VERSION = 1
+HASH_INDEX_VERSION = 1
+
+_GZIP_MAGIC = b'\x1f\x8b'
+
+def canonical_encoding(record):
+    """A record's encoding for hashing: minified JSON, exactly as NDJSON and json-min exports write it."""
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+
+def record_hash(encoded):
+    """The content hash of a record, from its canonical_encoding."""
+    return content_hash(encoded.encode('utf-8'))
+
+def export_fingerprint(hashes):
+    """
+    Identifies an export's content: the hash of its sorted record hashes, so the same
+    monsters give the same fingerprint whatever the format, order or sharding.
+    """
+    return content_hash(''.join(sorted(hashes)).encode('ascii'))
+
+def delta_path(output_path, shard_by=None):
+    """Where an export's delta goes: delta.json in a sharded export, else <name>.delta.json next to it."""
+    return sidecar_path(output_path, shard_by, 'delta')
+
+def hash_index_path(output_path, shard_by=None):
+    """Where the hash index of an export written with a delta goes, for the next delta to start from."""
+    return sidecar_path(output_path, shard_by, 'hashes')
+
+def _export_stat(path):
+    """Size and mtime of an export (of a sharded export's manifest), which its hash index must match to be used."""
+    if os.path.isdir(path):
+        from converter_output import SHARD_MANIFEST_FILENAME # Not at the top: converter_output imports this module
+        path = os.path.join(path, SHARD_MANIFEST_FILENAME)
+    stat_result = os.stat(path)
+    return [stat_result.st_size, stat_result.st_mtime_ns]
+
+class _KeyCounter:
+    """
+    Keys records as [version, name, occurrence]: monsters are told apart by bestiary and
+    name, and same-named ones by their order in the export (the second "Goblin" is 1).
+    """
+
+    def __init__(self):
+        self._seen = {}
+
+    def key(self, record):
+        version, name = str(record.get('version', '')), str(record.get('name', ''))
+        occurrence = self._seen.get((version, name), 0)
+        self._seen[(version, name)] = occurrence + 1
+        return (version, name, occurrence)
+
+    def counted(self, key):
+        """Whether a record with this key has been counted."""
+        version, name, occurrence = key
+        return self._seen.get((version, name), 0) > occurrence
+
+def _open_export_text(path):
+    """Opens an export file as text, gunzipping it if it starts with the gzip magic bytes."""
+    raw = open(path, 'rb')
+    if raw.read(2) != _GZIP_MAGIC:
+        raw.seek(0)
+        return io.TextIOWrapper(raw, encoding='utf-8')
+    import gzip # Only compressed bases need it
+    raw.seek(0)
+    return io.TextIOWrapper(gzip.GzipFile(fileobj=raw, mode='rb'), encoding='utf-8')
+
+def _iter_export_file(path):
+    """Yields (record, canonical encoding) for every record of a JSON array or NDJSON export file."""
+    with _open_export_text(path) as f:
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        if first == '[':
+            for record in iter_json_array(f):
+                yield record, canonical_encoding(record)
+            return
+        for line in f:
+            line = line.rstrip('\n')
+            if line.strip():
+                # NDJSON lines are already canonical, so they are hashed as they are
+                yield json.loads(line), line
+
+def _iter_keyed_records(path):
+    """Yields (key, canonical encoding) for every record of an export: a file, or a sharded export's directory."""
+    keys = _KeyCounter()
+    if not os.path.isdir(path):
+        for record, encoded in _iter_export_file(path):
+            yield keys.key(record), encoded
+        return
+    from converter_output import SHARD_MANIFEST_FILENAME # Not at the top: converter_output imports this module
+    with open(os.path.join(path, SHARD_MANIFEST_FILENAME), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    # Shards are read one after another, so occurrences are counted over the manifest's
+    # rows, which are in the order the records were written
+    shard_keys = [[] for _ in manifest['shards']]
+    for name, _, version, shard in manifest['monsters']:
+        shard_keys[shard].append(keys.key({'version': version, 'name': name}))
+    for shard, keys_in_shard in zip(manifest['shards'], shard_keys):
+        records = _iter_export_file(os.path.join(path, os.path.basename(str(shard['file']))))
+        for key, (_, encoded) in zip(keys_in_shard, records):
+            yield key, encoded
+
+class BaseExport:
+    """
+    Hash index over a previous export, the base a delta is computed against:
+    record key (see _KeyCounter) -> hash of the record's canonical encoding.
+    """
+
+    def __init__(self, path, hashes):
+        self.path = path
+        self.hashes = hashes
+        self.fingerprint = export_fingerprint(hashes.values())
+
+    @classmethod
+    def read(cls, path):
+        """
+        Reads an export in any of the converters' formats (compressed or not, single file
+        or sharded). The hash index written alongside it by a previous delta is used
+        instead when the export hasn't changed since, so only the first delta from an
+        export has to decode and hash all of it.
+        """
+        hashes = _read_hash_index(path)
+        if hashes is None:
+            hashes = {key: record_hash(encoded) for key, encoded in _iter_keyed_records(path)}
+        return cls(path, hashes)
+
+def _read_hash_index(export_path):
+    """The hash index saved for an export, or None if there is none or the export changed since."""
+    index_path = hash_index_path(export_path, os.path.isdir(export_path))
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('hashIndexVersion') != HASH_INDEX_VERSION or index.get('export') != _export_stat(export_path):
+            return None
+        return {(version, name, occurrence): digest for version, name, occurrence, digest in index['hashes']}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+def load_base_export(path):
+    """BaseExport.read, printing an error and returning None when the base export can't be read."""
+    try:
+        return BaseExport.read(path)
+    except FileNotFoundError:
+        print(f"Error: Base export not found at {path}")
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"Error: Could not read base export {path}: {e}")
+    return None
+
+class DeltaExportWriter:
+    """
+    Wraps an export writer and, besides writing every record, compares each with a
+    BaseExport. On close() it writes the delta from the base to this export to
+    delta_path: the records added and changed since the base (each with its key) and
+    the keys of those removed, plus both exports' fingerprints so the tracker can tell
+    whether the compendium it holds is the delta's base. Only changed records are kept
+    in memory. The new export's hash index goes to hash_index_path, to serve as the base
+    of the next delta. With canonical, the wrapped writer already encodes records
+    canonically (NDJSON, json-min) and its encoding is hashed rather than encoding them again.
+    """
+
+    def __init__(self, writer, base, delta_path, hash_index_path, canonical=False):
+        self.writer = writer
+        self.base = base
+        self.delta_path = delta_path
+        self.hash_index_path = hash_index_path
+        self.canonical = canonical
+        self._keys = _KeyCounter()
+        self._hashes = [] # [version, name, occurrence, hash] of every record, for the hash index
+        self._added = [] # Canonical JSON of the delta's entries
+        self._changed = []
+
+    @property
+    def count(self):
+        return self.writer.count
+
+    @property
+    def output_path(self):
+        return self.writer.output_path
+
+    def write(self, record, encoded=None):
+        encoded = self.writer.write(record, encoded)
+        canonical = encoded if self.canonical else canonical_encoding(record)
+        digest = record_hash(canonical)
+        key = self._keys.key(record)
+        self._hashes.append([*key, digest])
+        base_digest = self.base.hashes.get(key)
+        if base_digest != digest:
+            entries = self._added if base_digest is None else self._changed
+            entries.append(f'{{"key":{canonical_encoding(key)},"record":{canonical}}}')
+        return encoded
+
+    def _write_delta(self):
+        removed = [key for key in self.base.hashes if not self._keys.counted(key)]
+        tmp_path = f"{self.delta_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(f'{{"deltaVersion":{DELTA_VERSION},"base":"{self.base.fingerprint}",'
+                    f'"target":"{export_fingerprint(digest for *_, digest in self._hashes)}","count":{len(self._hashes)},'
+                    f'"added":[{",".join(self._added)}],"changed":[{",".join(self._changed)}],'
+                    f'"removed":{canonical_encoding(removed)}}}')
+        os.replace(tmp_path, self.delta_path)
+        return removed
+
+    def _write_hash_index(self):
+        tmp_path = f"{self.hash_index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'hashIndexVersion': HASH_INDEX_VERSION, 'export': _export_stat(self.writer.output_path),
+                                'hashes': self._hashes}, ensure_ascii=False, separators=(',', ':')))
+        os.replace(tmp_path, self.hash_index_path)
+
+    def close(self):
+        self.writer.close()
+        self._write_hash_index()
+        removed = self._write_delta()
+        print(f"Wrote delta from {self.base.path}: {len(self._added)} added, {len(self._changed)} changed, "
+              f"{len(removed)} removed to {self.delta_path}")
+
+    def abort(self):
+        self.writer.abort()
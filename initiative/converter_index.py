@@ -0,0 +1,124 @@
+import json
+import os
+import re
+
+SEARCH_INDEX_VERSION = 1
+# Converted records carry their search facets under this key until they are written
+SEARCH_FACETS_KEY = '_search'
+SEARCH_FACETS = ('type', 'size', 'rarity', 'traits', 'damage')
+
+_EXPORT_EXTENSIONS = ('.json', '.ndjson', '.jsonl')
+
+def sidecar_path(output_path, shard_by, name):
+    """A file that goes with an export: <name>.json in a sharded export, else <export name>.<name>.json next to it."""
+    if shard_by:
+        return os.path.join(output_path, f"{name}.json")
+    base = output_path[:-3] if output_path.lower().endswith('.gz') else output_path
+    for extension in _EXPORT_EXTENSIONS:
+        if base.lower().endswith(extension):
+            base = base[:-len(extension)]
+            break
+    return f"{base}.{name}.json"
+
+def search_index_path(output_path, shard_by=None):
+    """Where an export's search index goes: index.json in a sharded export, else <name>.index.json next to it."""
+    return sidecar_path(output_path, shard_by, 'index')
+
+def name_tokens(name):
+    return set(re.findall(r'[a-z0-9]+', name.lower()))
+
+def name_trigrams(name):
+    """Every three-character substring of the lowercased name; a search term's trigrams narrow substring search."""
+    lowered = name.lower()
+    return {lowered[i:i + 3] for i in range(len(lowered) - 2)}
+
+def _delta_encode(ids):
+    previous = 0
+    deltas = []
+    for monster_id in ids:
+        deltas.append(monster_id - previous)
+        previous = monster_id
+    return deltas
+
+class SearchIndexBuilder:
+    """
+    Inverted index over the monsters of an export, for the tracker's compendium search.
+    Monster ids are positions in the export (for a sharded export, rows of its manifest).
+    Postings map name tokens, name trigrams, challenge/level and each of SEARCH_FACETS
+    (creature type, size, rarity, traits, damage types) to the ids having them, ascending
+    and delta-encoded to keep the file small.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.postings = {'tokens': {}, 'trigrams': {}, 'challenge': {}, **{facet: {} for facet in SEARCH_FACETS}}
+
+    def _post(self, field, key, monster_id):
+        ids = self.postings[field].setdefault(key, [])
+        if not ids or ids[-1] != monster_id:
+            ids.append(monster_id)
+
+    def add(self, record, facets=None):
+        monster_id = len(self.names)
+        name = str(record.get('name', ''))
+        self.names.append(name)
+        for token in name_tokens(name):
+            self._post('tokens', token, monster_id)
+        for trigram in name_trigrams(name):
+            self._post('trigrams', trigram, monster_id)
+        self._post('challenge', str(record.get('challenge', '')), monster_id)
+        for facet, values in (facets or {}).items():
+            for value in values:
+                self._post(facet, value, monster_id)
+
+    def to_json(self):
+        return {
+            'indexVersion': SEARCH_INDEX_VERSION,
+            'count': len(self.names),
+            'names': self.names,
+            'postings': {field: {key: _delta_encode(ids) for key, ids in sorted(keys.items())}
+                         for field, keys in self.postings.items()},
+        }
+
+    def write(self, index_path):
+        tmp_path = f"{index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(self.to_json(), ensure_ascii=False, separators=(',', ':'))) # json.dump never uses the C encoder
+        os.replace(tmp_path, index_path)
+
+class IndexedExportWriter:
+    """
+    Wraps an export writer: takes the search facets off each record before it is written
+    and, given an index_path, indexes the record and writes the index on close().
+    """
+
+    def __init__(self, writer, index_path=None):
+        self.writer = writer
+        self.index_path = index_path
+        self.index = SearchIndexBuilder() if index_path else None
+
+    @property
+    def count(self):
+        return self.writer.count
+
+    @property
+    def output_path(self):
+        return self.writer.output_path
+
+    def write(self, record, encoded=None):
+        facets = record.get(SEARCH_FACETS_KEY)
+        if facets is not None:
+            # Without mutating the record, which may still be held by the render cache
+            record = {key: value for key, value in record.items() if key != SEARCH_FACETS_KEY}
+        if self.index:
+            self.index.add(record, facets)
+        return self.writer.write(record, encoded)
+
+    def close(self):
+        self.writer.close()
+        if self.index:
+            self.index.write(self.index_path)
+            print(f"Wrote search index for {len(self.index.names)} monsters to {self.index_path}")
+
+    def abort(self):
+        self.writer.abort()
@@ -0,0 +1,197 @@
+import functools
+import json
+import os
+import re
+
+DEFAULT_READ_CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = ' \t\n\r'
+
+# How much of a document sniff_top_level_string looks at from each end
+SNIFF_HEAD_BYTES = 4096
+SNIFF_TAIL_BYTES = 256
+
+_JSON_STRING = rb'"(?:[^"\\]|\\.)*"'
+_JSON_TOKEN_RE = re.compile(rb'\s*(' + _JSON_STRING + rb'|[{}\[\]:,]|[^\s{}\[\]:,"]+)')
+# What may follow the part of a number raw_decode accepted and still belong to it ("-2" of "-2.5", "1.5" of "1.5e3")
+_NUMBER_CONTINUATION_RE = re.compile(r'[0-9eE.+\-]*')
+
+def _is_incomplete(error, buffer):
+    """
+    Guesses whether a decode error was caused by the element being cut off at the
+    end of the buffer (so reading more may fix it) rather than by malformed JSON.
+    """
+    return error.msg.startswith('Unterminated string') or error.pos >= len(buffer) - 6
+
+def iter_json_array(f, chunk_size=DEFAULT_READ_CHUNK_SIZE):
+    """
+    Yields the elements of a top-level JSON array from an open text file one at a time,
+    using json.JSONDecoder.raw_decode over buffered chunks. Only the current element
+    (plus one chunk) is held in memory. Raises json.JSONDecodeError when the input is
+    malformed; every element before the bad one has already been yielded by then.
+    The error's msg carries the element index and absolute character offset.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    at_eof = False
+    consumed = 0 # Characters dropped from the front of the buffer, for error positions
+
+    def read_more():
+        nonlocal buffer, pos, at_eof, consumed
+        chunk = f.read(chunk_size)
+        if not chunk:
+            at_eof = True
+        consumed += pos
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def next_token():
+        """Skips whitespace and returns the next character ('' at end of input)."""
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buffer) or at_eof:
+                return buffer[pos] if pos < len(buffer) else ''
+            read_more()
+
+    def fail(message):
+        raise json.JSONDecodeError(f"{message} (character {consumed + pos})", buffer, pos)
+
+    if next_token() != '[':
+        fail("Expecting '[' at the start of the monster list")
+    pos += 1
+
+    if next_token() == ']':
+        return
+    index = 0
+    while True:
+        next_token()
+        while True:
+            try:
+                element, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if at_eof or not _is_incomplete(e, buffer):
+                    raise json.JSONDecodeError(f"{e.msg} (in element {index}, character {consumed + e.pos})", e.doc, e.pos)
+                read_more()
+                continue
+            # Before EOF, a value is only taken once something after it is in the buffer: one that
+            # runs to the buffer's end (allowing for a number cut mid-token, whose decoded prefix
+            # stops short of it) might continue in the next chunk
+            if not at_eof and _NUMBER_CONTINUATION_RE.fullmatch(buffer, end):
+                read_more()
+                continue
+            break
+        pos = end
+        yield element
+        index += 1
+
+        token = next_token()
+        if token == ']':
+            return
+        if token != ',':
+            fail(f"Expecting ',' delimiter after element {index - 1}")
+        pos += 1
+        if pos >= chunk_size:
+            # Drop what has already been decoded so the buffer stays bounded
+            consumed += pos
+            buffer = buffer[pos:]
+            pos = 0
+
+def _sniff_head(head, key_token):
+    """Tokenizes the head of a document, tracking nesting, until the key shows up as a member of the root object."""
+    depth = 0
+    expecting_key = False
+    member_key = None
+    pos = 0
+    while True:
+        match = _JSON_TOKEN_RE.match(head, pos)
+        if not match:
+            return None # Cut off mid-token (or malformed): undecided
+        token = match.group(1)
+        pos = match.end()
+        if token in (b'{', b'['):
+            if depth == 0 and token != b'{':
+                return None # Not an object document
+            depth += 1
+            expecting_key = depth == 1
+        elif token in (b'}', b']'):
+            depth -= 1
+            if depth == 0:
+                return None # The key isn't there; leave that to the full parse
+        elif token == b',':
+            expecting_key = depth == 1
+        elif token != b':' and depth == 1:
+            if expecting_key:
+                member_key = token
+                expecting_key = False
+            else:
+                if member_key == key_token and token.startswith(b'"'):
+                    return json.loads(token)
+                member_key = None
+
+@functools.lru_cache(maxsize=None)
+def _last_member_re(key_token):
+    return re.compile(rb'(?<!\\)' + re.escape(key_token) + rb'\s*:\s*(' + _JSON_STRING + rb')\s*\}\s*$')
+
+def sniff_top_level_string(head, tail, key):
+    """
+    Returns the string value of a top-level key of a JSON object document, looking only at
+    its first and last bytes: found in tail when it is the root object's last member (as in
+    Foundry's sorted-key sources), or in head when it comes before anything long. tail must
+    end where the document does (pass the whole document as both if it is short). Returns
+    None when neither shows it, in which case only a full parse can tell.
+    """
+    key_token = json.dumps(key).encode('utf-8')
+    if key_token in tail:
+        last_member = _last_member_re(key_token).search(tail, tail.rfind(key_token))
+        if last_member:
+            return json.loads(last_member.group(1))
+    if key_token not in head:
+        return None
+    return _sniff_head(head, key_token)
+
+def _line_document_id(head, tail):
+    return sniff_top_level_string(head, tail, '_id')
+
+def iter_pack_lines(pack, keep=None):
+    """
+    Yields (line number, document _id or None, raw bytes) for the live documents of a
+    line-delimited pack (a Foundry/NeDB .db file or JSONL), one document per line.
+    NeDB appends a new version of a document on every update and a {"$$deleted": true}
+    line on removal, so a first pass finds each _id's last line and only that one is
+    yielded; ids are sniffed from the ends of the line (see sniff_top_level_string), so a
+    line whose id isn't visible there counts as a document of its own. keep(head, tail),
+    if given, rejects lines in the same pass. Only ids and line numbers are held in memory.
+    pack is a path or a seekable binary file (such as a zip archive member).
+    """
+    if isinstance(pack, (str, os.PathLike)):
+        with open(pack, 'rb') as f:
+            yield from iter_pack_lines(f, keep)
+        return
+
+    dropped = set()
+    last_line = {}
+    for line_number, line in enumerate(pack, 1):
+        line = line.strip()
+        if not line:
+            continue
+        head, tail = line[:SNIFF_HEAD_BYTES], line[-SNIFF_TAIL_BYTES:]
+        document_id = _line_document_id(head, tail)
+        if document_id is not None:
+            if document_id in last_line:
+                dropped.add(last_line[document_id])
+            last_line[document_id] = line_number
+            if b'"$$deleted"' in head and json.loads(line).get('$$deleted'):
+                dropped.add(line_number)
+                continue
+        if keep and not keep(head, tail):
+            dropped.add(line_number)
+
+    line_ids = {line_number: document_id for document_id, line_number in last_line.items()}
+    pack.seek(0)
+    for line_number, line in enumerate(pack, 1):
+        line = line.strip()
+        if line and line_number not in dropped:
+            yield line_number, line_ids.get(line_number), line
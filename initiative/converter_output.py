@@ -0,0 +1,391 @@
+import io
+import json
+import heapq
+import os
+import re
+from converter_dedup import DedupExportWriter
+from converter_delta import DeltaExportWriter, delta_path, hash_index_path
+from converter_index import IndexedExportWriter, sidecar_path
+
+DEFAULT_SORT_RUN_SIZE = 500
+
+OUTPUT_FORMATS = ('json', 'json-min', 'ndjson')
+
+EXPORT_POINTER_VERSION = 1
+
+def export_pointer_path(output_path):
+    """
+    Where a single-file export's pointer goes: <name>.export.json next to it, naming the
+    file just written, so the tracker loads that one rather than guessing among the
+    extensions an older export of the same name may have been left under.
+    """
+    return sidecar_path(output_path, None, 'export')
+
+def needs_export_pointer(output_path):
+    """
+    Whether the tracker needs a pointer to find a single-file export: it loads <name>.json
+    by itself (in any format, compressed or not), so only a file named otherwise
+    (<name>.ndjson, <name>.json.gz, ...) gets one.
+    """
+    return not output_path.endswith('.json')
+
+def resolve_output_format(output_path, output_format=None, compress=None):
+    """
+    Picks (format, compress) for an export: the given values win, the rest follow the
+    file name, so monsters.ndjson.gz is gzip-compressed NDJSON. Without a recognised
+    extension the export is the indented JSON array.
+    """
+    name = output_path.lower()
+    if compress is None:
+        compress = name.endswith('.gz')
+    if name.endswith('.gz'):
+        name = name[:-3]
+    if output_format is None:
+        output_format = 'ndjson' if name.endswith(('.ndjson', '.jsonl')) else 'json'
+    return output_format, compress
+
+class ExportWriter:
+    """
+    Base of the export writers: records are written one at a time to a temporary file
+    that replaces output_path only on close(), so a failed run never leaves a truncated
+    export behind. With compress the file is gzip-compressed; the header carries no name
+    or timestamp, so the same export always compresses to the same bytes.
+    write(record, encoded=None) returns the record's encoded JSON; handing that back when
+    the same record is written again (in the same format) skips encoding it a second time.
+    With a pointer_path, the export's pointer (see export_pointer_path) is written after it
+    if the export needs one (see needs_export_pointer), and removed otherwise.
+    """
+
+    output_format = None # One of OUTPUT_FORMATS, set by each subclass
+
+    def __init__(self, output_path, compress=False, pointer_path=None):
+        self.output_path = output_path
+        self.compress = compress
+        self.pointer_path = pointer_path
+        self.count = 0
+        self._tmp_path = f"{output_path}.tmp"
+        self._raw = open(self._tmp_path, 'wb')
+        stream = self._raw
+        if compress:
+            import gzip # Only compressed exports pay for importing it
+            stream = gzip.GzipFile(filename='', mode='wb', fileobj=self._raw, compresslevel=6, mtime=0)
+        self._file = io.TextIOWrapper(stream, encoding='utf-8')
+
+    def encode(self, record):
+        raise NotImplementedError
+
+    def write(self, record, encoded=None):
+        raise NotImplementedError
+
+    def _finish(self):
+        """Writes whatever follows the last record."""
+
+    def _close_files(self):
+        self._file.close()
+        self._raw.close() # GzipFile leaves the file it was given open
+
+    def close(self):
+        self._finish()
+        self._close_files()
+        os.replace(self._tmp_path, self.output_path)
+        if self.pointer_path and not needs_export_pointer(self.output_path):
+            # One left by an earlier export under another name would send the tracker there
+            try:
+                os.remove(self.pointer_path)
+            except FileNotFoundError:
+                pass
+        elif self.pointer_path:
+            # Written after the export is in place, so it never names a file that isn't there yet
+            with open(f"{self.pointer_path}.tmp", 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'exportVersion': EXPORT_POINTER_VERSION, 'file': os.path.basename(self.output_path),
+                                    'format': self.output_format, 'compressed': self.compress}))
+            os.replace(f"{self.pointer_path}.tmp", self.pointer_path)
+
+    def abort(self):
+        """Closes and removes the partial temporary file, leaving output_path untouched."""
+        self._close_files()
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+class JsonArrayWriter(ExportWriter):
+    """
+    Writes records as a JSON array, producing exactly the same bytes as
+    json.dump(records, f, indent=2, ensure_ascii=False) would, or with minify the
+    same as json.dump(records, f, ensure_ascii=False, separators=(',', ':')).
+    """
+
+    def __init__(self, output_path, compress=False, minify=False, pointer_path=None):
+        super().__init__(output_path, compress, pointer_path)
+        self.minify = minify
+        self.output_format = 'json-min' if minify else 'json'
+
+    def encode(self, record):
+        if self.minify:
+            return json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+        # Strings in JSON never contain raw newlines, so re-indenting line starts is safe
+        return json.dumps(record, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+
+    def write(self, record, encoded=None):
+        if encoded is None:
+            encoded = self.encode(record)
+        if self.minify:
+            self._file.write(('[' if self.count == 0 else ',') + encoded)
+        else:
+            self._file.write(('[\n  ' if self.count == 0 else ',\n  ') + encoded)
+        self.count += 1
+        return encoded
+
+    def _finish(self):
+        if self.count == 0:
+            self._file.write('[]')
+        else:
+            self._file.write(']' if self.minify else '\n]')
+
+class NdjsonWriter(ExportWriter):
+    """Writes newline-delimited JSON: one minified record per line, so exports can be read a line at a time."""
+
+    output_format = 'ndjson'
+
+    def encode(self, record):
+        return json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+
+    def write(self, record, encoded=None):
+        if encoded is None:
+            encoded = self.encode(record)
+        self._file.write(encoded)
+        self._file.write('\n')
+        self.count += 1
+        return encoded
+
+SHARD_KEYS = ('challenge', 'name')
+SHARD_MANIFEST_FILENAME = 'manifest.json'
+SHARD_MANIFEST_VERSION = 1
+
+def _shard_id(record, shard_by):
+    """The shard a record goes to: its challenge/level, or the first letter of its name."""
+    if shard_by == 'name':
+        initial = record.get('name', '')[:1].lower()
+        return f"name-{initial if 'a' <= initial <= 'z' else 'other'}"
+    challenge = str(record.get('challenge', ''))
+    slug = re.sub(r'[^a-z0-9]+', '-', challenge.lower()).strip('-')
+    if challenge.startswith('-'):
+        slug = f"minus-{slug}" # Level -1 mustn't share a shard with level 1
+    return f"challenge-{slug or 'none'}"
+
+class ShardedExportWriter:
+    """
+    Writes an export as a directory of shards plus a manifest, so the tracker can load
+    only the shards a user browses or searches into. Records are grouped by challenge or
+    name initial (see SHARD_KEYS), each shard being an export of its own in the given
+    format. manifest.json lists every shard (file and count) and every monster as
+    [name, challenge, version, shard index], in the order they were written.
+    Takes the same calls as ExportWriter; the manifest is written last, on close().
+    """
+
+    def __init__(self, output_dir, shard_by='challenge', output_format='json', compress=False):
+        self.output_path = output_dir
+        self.shard_by = shard_by
+        self.output_format = output_format
+        self.compress = compress
+        self.count = 0
+        self._writers = {} # shard id -> (shard index, writer)
+        self._shards = []
+        self._monsters = []
+        os.makedirs(output_dir, exist_ok=True)
+
+    def write(self, record, encoded=None):
+        shard_id = _shard_id(record, self.shard_by)
+        shard = self._writers.get(shard_id)
+        if shard is None:
+            extension = ('.ndjson' if self.output_format == 'ndjson' else '.json') + ('.gz' if self.compress else '')
+            self._shards.append({'id': shard_id, 'file': f"{shard_id}{extension}", 'count': 0})
+            shard = self._writers[shard_id] = (len(self._shards) - 1, _open_file_writer(
+                os.path.join(self.output_path, self._shards[-1]['file']), self.output_format, self.compress))
+        index, writer = shard
+        encoded = writer.write(record, encoded)
+        self._shards[index]['count'] += 1
+        self._monsters.append([record.get('name', ''), record.get('challenge', ''), record.get('version', ''), index])
+        self.count += 1
+        return encoded
+
+    def close(self):
+        for _, writer in self._writers.values():
+            writer.close()
+        manifest_path = os.path.join(self.output_path, SHARD_MANIFEST_FILENAME)
+        self._remove_stale_shards(manifest_path)
+        with open(f"{manifest_path}.tmp", 'w', encoding='utf-8') as f:
+            # json.dumps rather than json.dump, which never uses the C encoder
+            f.write(json.dumps({'manifestVersion': SHARD_MANIFEST_VERSION, 'shardBy': self.shard_by, 'format': self.output_format,
+                                'compressed': self.compress, 'shards': self._shards,
+                                'fields': ['name', 'challenge', 'version', 'shard'], 'monsters': self._monsters},
+                               ensure_ascii=False, separators=(',', ':')))
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+
+    def _remove_stale_shards(self, manifest_path):
+        """Deletes the shards of a previous export to this directory that this one didn't write."""
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                previous_shards = json.load(f).get('shards', [])
+        except (OSError, ValueError, AttributeError):
+            return
+        current_files = {shard['file'] for shard in self._shards}
+        for shard in previous_shards:
+            filename = os.path.basename(str(shard.get('file', '')))
+            if filename and filename not in current_files:
+                try:
+                    os.remove(os.path.join(self.output_path, filename))
+                except OSError:
+                    pass
+
+    def abort(self):
+        """Aborts every shard, leaving the previous export (if any) in place."""
+        for _, writer in self._writers.values():
+            writer.abort()
+
+def _open_file_writer(output_path, output_format, compress, pointer_path=None):
+    if output_format == 'ndjson':
+        return NdjsonWriter(output_path, compress, pointer_path)
+    return JsonArrayWriter(output_path, compress, minify=output_format == 'json-min', pointer_path=pointer_path)
+
+def open_export_writer(output_path, output_format='json', compress=False, shard_by=None, search_index_path=None, base=None, dedup=None):
+    """
+    The writer for an export in one of OUTPUT_FORMATS (see resolve_output_format); with
+    shard_by, output_path is a directory that receives a sharded export (whose manifest
+    names its files); otherwise the export's pointer is written next to it when its file
+    isn't <name>.json (see needs_export_pointer). Records' search
+    facets are dropped from the export, and indexed if there is a search_index_path.
+    Given a base (a converter_delta.BaseExport), the delta from it is written next to the
+    export, with the hash index the next delta starts from (see converter_delta).
+    With a dedup policy (see converter_dedup.DEDUP_POLICIES), identical copies of a
+    monster are dropped or linked before anything else sees them.
+    """
+    if shard_by:
+        writer = ShardedExportWriter(output_path, shard_by, output_format, compress)
+    else:
+        writer = _open_file_writer(output_path, output_format, compress, export_pointer_path(output_path))
+    if base is not None:
+        writer = DeltaExportWriter(writer, base, delta_path(output_path, shard_by), hash_index_path(output_path, shard_by),
+                                   canonical=output_format in ('ndjson', 'json-min'))
+    writer = IndexedExportWriter(writer, search_index_path)
+    return DedupExportWriter(writer, dedup) if dedup else writer
+
+def add_output_arguments(parser):
+    """The export format options both converter CLIs share."""
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, help="Export as an indented JSON array, a minified one, or newline-delimited JSON "
+                                                                  "(default: from the output file's extension, .ndjson/.jsonl or .json). "
+                                                                  "An output file not named <name>.json also gets <name>.export.json, "
+                                                                  "which tells the tracker the file to load.")
+    parser.add_argument("--gzip", action="store_true", default=None, help="Gzip-compress the export (default: when the output file ends in .gz).")
+    parser.add_argument("--shard-by", choices=SHARD_KEYS, help="Write a sharded export instead: output_file is a directory that gets "
+                                                               "manifest.json and one file per challenge/level or name initial.")
+    parser.add_argument("--search-index", action="store_true", help="Also write an inverted index for the tracker's compendium search "
+                                                                    "(<name>.index.json, or index.json in a sharded export).")
+    parser.add_argument("--base", metavar="PREVIOUS_EXPORT", help="A previous export (any format) to also write the delta from: the monsters added, "
+                                                                  "changed and removed since, for the tracker to update only those "
+                                                                  "(<name>.delta.json, or delta.json in a sharded export). A hash index "
+                                                                  "(<name>.hashes.json) is kept with it so the next delta needn't reread the export.")
+
+def monster_sort_key(record):
+    """Sort key used for converter exports: the lowercased monster name."""
+    return record.get('name', '').lower()
+
+class _Largest:
+    """Heap entry that orders in reverse, turning heapq's min-heap into a max-heap on key."""
+    __slots__ = ('key', 'record')
+
+    def __init__(self, key, record):
+        self.key = key
+        self.record = record
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+class SmallestRecords:
+    """
+    Keeps the limit records with the smallest (sort key, tiebreak) seen so far in a bounded
+    heap, so a limited export holds the first records in export order regardless of the
+    order they arrive in. The tiebreak (such as a relative source path) settles equal names.
+    """
+
+    def __init__(self, limit, key=monster_sort_key):
+        self.limit = max(0, limit)
+        self.key = key
+        self.seen = 0
+        self._heap = []
+
+    def add(self, record, tiebreak=''):
+        """Offers a record; returns whether it is (for now) among the kept ones."""
+        self.seen += 1
+        entry = _Largest((self.key(record), tiebreak), record)
+        if len(self._heap) < self.limit:
+            heapq.heappush(self._heap, entry)
+            return True
+        if self._heap and entry.key < self._heap[0].key:
+            heapq.heapreplace(self._heap, entry)
+            return True
+        return False
+
+    def sorted(self):
+        """The kept records, smallest first."""
+        return [entry.record for entry in sorted(self._heap, key=lambda entry: entry.key)]
+
+class ExternalSorter:
+    """
+    Sorts records by key with bounded memory. Records are buffered up to run_size,
+    then each full buffer is sorted and spilled to a temporary file as a run;
+    sorted() k-way merges the runs. Ties go by the tiebreak given to add(), then keep
+    insertion order, matching list.sort().
+    """
+
+    def __init__(self, key=monster_sort_key, run_size=DEFAULT_SORT_RUN_SIZE):
+        self.key = key
+        self.run_size = max(1, run_size)
+        self.count = 0
+        self._buffer = []
+        self._run_paths = []
+        self._tmp_dir = None
+
+    def add(self, record, tiebreak=0):
+        self._buffer.append((self.key(record), tiebreak, self.count, record))
+        self.count += 1
+        if len(self._buffer) >= self.run_size:
+            self._spill()
+
+    def _spill(self):
+        if self._tmp_dir is None:
+            import tempfile # Most exports fit in one run and never spill, so it isn't imported up front
+            self._tmp_dir = tempfile.TemporaryDirectory(prefix='monster_sort_')
+        self._buffer.sort(key=lambda entry: entry[:3])
+        run_path = os.path.join(self._tmp_dir.name, f"run_{len(self._run_paths)}.jsonl")
+        with open(run_path, 'w', encoding='utf-8') as f:
+            for entry in self._buffer:
+                f.write(json.dumps(entry, ensure_ascii=False))
+                f.write('\n')
+        self._run_paths.append(run_path)
+        self._buffer = []
+
+    @staticmethod
+    def _read_run(run_path):
+        with open(run_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                yield tuple(json.loads(line))
+
+    def sorted(self):
+        """Yields every added record in sorted order, then removes the spilled runs."""
+        self._buffer.sort(key=lambda entry: entry[:3])
+        runs = [self._read_run(run_path) for run_path in self._run_paths]
+        runs.append(iter(self._buffer))
+        try:
+            for *_, record in heapq.merge(*runs, key=lambda entry: entry[:3]):
+                yield record
+        finally:
+            self.cleanup()
+
+    def cleanup(self):
+        self._buffer = []
+        self._run_paths = []
+        if self._tmp_dir is not None:
+            self._tmp_dir.cleanup()
+            self._tmp_dir = None
@@ -0,0 +1,82 @@
+import os
+from collections import deque
+
+DEFAULT_PREFETCH_DEPTH = 64
+
+def resolve_jobs(jobs):
+    """Turns a --jobs value into a worker count. 0 or a negative value means one worker per CPU."""
+    if jobs is None:
+        return 1
+    if jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+def _apply_to_chunk(func, chunk):
+    """Runs func over one chunk of items inside a worker process."""
+    return [func(item) for item in chunk]
+
+def _iter_chunks(items, chunksize):
+    """Yields lists of up to chunksize items from any iterable."""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def parallel_map(func, items, jobs=1, chunksize=16):
+    """
+    Applies func to every item and yields the results in input order.
+    With jobs > 1 the work is fanned out to a process pool in chunks; only a
+    small window of chunks is in flight at once, so a consumer that stops early
+    (e.g. because of --limit) doesn't pay for the whole input.
+    func must be a module-level function so it can be pickled.
+    """
+    jobs = resolve_jobs(jobs)
+    if jobs <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    # Imported only when there are workers: it pulls in multiprocessing, a large share of startup time
+    from concurrent.futures import ProcessPoolExecutor
+    executor = ProcessPoolExecutor(max_workers=jobs)
+    pending = deque()
+    max_in_flight = jobs * 2
+    try:
+        for chunk in _iter_chunks(items, max(1, chunksize)):
+            pending.append(executor.submit(_apply_to_chunk, func, chunk))
+            if len(pending) >= max_in_flight:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def prefetch_map(func, items, threads=0, depth=DEFAULT_PREFETCH_DEPTH):
+    """
+    Applies func to every item on a pool of threads and yields the results in input order,
+    keeping up to depth items in flight ahead of the consumer. Meant for blocking I/O such
+    as reading files from network storage, which then overlaps with the consumer's work;
+    at most depth results are held at once. With threads of 0 it is a plain map.
+    """
+    if threads <= 0:
+        for item in items:
+            yield func(item)
+        return
+
+    from concurrent.futures import ThreadPoolExecutor
+    executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='prefetch')
+    pending = deque()
+    depth = max(1, depth)
+    try:
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= depth:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,220 @@
+import json
+import contextlib
+import functools
+import sys
+import time
+
+class _Frame:
+    """One active stage call; nested stages report their totals to it so it can keep self time."""
+    __slots__ = ('stage', 'start', 'blocks', 'child_seconds', 'child_blocks', 'traced_start', 'child_traced_peak')
+
+class ConversionProfiler:
+    """
+    Collects where a conversion spends its time, for --profile. Stages are functions the
+    converter names (see instrument); for each one it records the calls, the wall time and
+    the net change in allocated memory blocks, both excluding nested stages, and with
+    trace_memory the highest tracemalloc peak a single call reached. Whatever isn't
+    covered by a stage is reported as "other". track_items also records each monster, so
+    the slowest ones can be listed.
+    Stages are timed by swapping the functions for timing wrappers during the run, so
+    conversions without --profile don't pay for any of this.
+    """
+
+    def __init__(self, trace_memory=False, top=10):
+        self.trace_memory = trace_memory
+        self._tracemalloc = None
+        if trace_memory:
+            import tracemalloc # Slow to import (it pulls in pickle), and only --profile-memory needs it
+            self._tracemalloc = tracemalloc
+        self.top = top
+        self.stages = {}
+        self.items = []
+        self.seconds = 0.0
+        self.peak_bytes = None
+        self._stack = []
+        self._start = None
+
+    def _start_run(self):
+        if self.trace_memory:
+            self._tracemalloc.start()
+        self._start = time.perf_counter()
+
+    def _stop_run(self):
+        self.seconds = time.perf_counter() - self._start
+        if self.trace_memory:
+            self.peak_bytes = self._tracemalloc.get_traced_memory()[1]
+            for stage in self.stages.values():
+                self.peak_bytes = max(self.peak_bytes, stage['peak_bytes'] or 0)
+            self._tracemalloc.stop()
+
+    def _enter(self, stage):
+        frame = _Frame()
+        frame.stage = stage
+        frame.child_seconds = 0.0
+        frame.child_blocks = 0
+        frame.child_traced_peak = 0
+        if self.trace_memory:
+            frame.traced_start = self._tracemalloc.get_traced_memory()[0]
+            self._tracemalloc.reset_peak()
+        frame.blocks = sys.getallocatedblocks()
+        self._stack.append(frame)
+        frame.start = time.perf_counter()
+        return frame
+
+    def _exit(self, frame):
+        seconds = time.perf_counter() - frame.start
+        blocks = sys.getallocatedblocks() - frame.blocks
+        self._stack.pop()
+        stats = self.stages.get(frame.stage)
+        if stats is None:
+            stats = self.stages[frame.stage] = {'calls': 0, 'seconds': 0.0, 'blocks': 0, 'peak_bytes': None}
+        stats['calls'] += 1
+        stats['seconds'] += seconds - frame.child_seconds
+        stats['blocks'] += blocks - frame.child_blocks
+        traced_peak = 0
+        if self.trace_memory:
+            # A nested stage reset the peak, so take the highest of its peak and ours
+            traced_peak = max(self._tracemalloc.get_traced_memory()[1], frame.child_traced_peak)
+            stats['peak_bytes'] = max(stats['peak_bytes'] or 0, traced_peak - frame.traced_start)
+        if self._stack:
+            parent = self._stack[-1]
+            parent.child_seconds += seconds
+            parent.child_blocks += blocks
+            parent.child_traced_peak = max(parent.child_traced_peak, traced_peak)
+        return seconds, blocks
+
+    def wrap(self, stage, func):
+        """Returns func timed as stage; a generator function is timed on every item it yields."""
+        import inspect # Slow to import, and every converter run imports this module
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def timed_generator(*args, **kwargs):
+                frame = self._enter(stage)
+                try:
+                    generator = func(*args, **kwargs)
+                finally:
+                    self._exit(frame)
+                while True:
+                    frame = self._enter(stage)
+                    try:
+                        item = next(generator)
+                    except StopIteration:
+                        return
+                    finally:
+                        self._exit(frame)
+                    yield item
+            return timed_generator
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            frame = self._enter(stage)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._exit(frame)
+        return timed
+
+    @contextlib.contextmanager
+    def instrument(self, *targets):
+        """
+        Profiles the block: the run is timed as a whole and the named functions per call.
+        Each target is (owner, {name: stage}), where owner is a module's globals() or a class
+        (for methods). A stage given as (stage, describe) marks the per-monster function,
+        recorded with track_items. The original functions are put back afterwards.
+        """
+        originals = []
+        self._start_run()
+        try:
+            for owner, stages in targets:
+                namespace = owner if isinstance(owner, dict) else owner.__dict__
+                for name, stage in stages.items():
+                    original = namespace[name]
+                    timed = self.track_items(*stage, func=original) if isinstance(stage, tuple) else self.wrap(stage, original)
+                    originals.append((owner, name, original))
+                    if isinstance(owner, dict):
+                        owner[name] = timed
+                    else:
+                        setattr(owner, name, timed)
+            yield self
+        finally:
+            for owner, name, original in reversed(originals):
+                if isinstance(owner, dict):
+                    owner[name] = original
+                else:
+                    setattr(owner, name, original)
+            self._stop_run()
+
+    def track_items(self, stage, describe, func):
+        """
+        Returns func timed as stage and recorded per call, for the per-monster report.
+        describe(argument, result) gives the (monster name, source) of a call; a source of
+        None is reported as the call's position in the input.
+        """
+        @functools.wraps(func)
+        def tracked(item, *args, **kwargs):
+            frame = self._enter(stage)
+            result = None
+            try:
+                result = func(item, *args, **kwargs)
+                return result
+            finally:
+                seconds, blocks = self._exit(frame)
+                name, source = describe(item, result)
+                self.items.append((seconds, blocks, name, source if source is not None else f"entry {len(self.items)}"))
+        return tracked
+
+    def report(self):
+        """The profile as a JSON-serialisable dict."""
+        covered = sum(stats['seconds'] for stats in self.stages.values())
+        stages = {stage: {'calls': stats['calls'], 'seconds': round(stats['seconds'], 4), 'blocks': stats['blocks'],
+                          **({'peak_bytes': stats['peak_bytes']} if self.trace_memory else {})}
+                  for stage, stats in sorted(self.stages.items(), key=lambda entry: -entry[1]['seconds'])}
+        stages['other'] = {'calls': None, 'seconds': round(max(self.seconds - covered, 0.0), 4), 'blocks': None}
+        slowest = sorted(self.items, key=lambda item: -item[0])[:self.top]
+        return {
+            'seconds': round(self.seconds, 4),
+            'entries': len(self.items),
+            'peak_bytes': self.peak_bytes,
+            'stages': stages,
+            'slowest': [{'seconds': round(seconds, 5), 'blocks': blocks, 'name': name, 'source': source}
+                        for seconds, blocks, name, source in slowest],
+        }
+
+    def print_report(self, report=None):
+        report = report or self.report()
+        total = report['seconds'] or 1
+        print(f"\nProfile: {report['seconds']:.2f}s for {report['entries']} entries"
+              + (f", tracemalloc peak {report['peak_bytes'] / (1024 * 1024):.1f} MB" if report['peak_bytes'] is not None else ''))
+        print(f"{'stage':<14} {'calls':>8} {'seconds':>9} {'share':>7} {'net blocks':>11}" + (f" {'peak KB':>9}" if self.trace_memory else ''))
+        for stage, stats in report['stages'].items():
+            calls = stats['calls'] if stats['calls'] is not None else '-'
+            blocks = stats['blocks'] if stats['blocks'] is not None else '-'
+            line = f"{stage:<14} {calls:>8} {stats['seconds']:>9.3f} {stats['seconds'] / total:>7.1%} {blocks:>11}"
+            if self.trace_memory:
+                peak = stats.get('peak_bytes')
+                line += f" {peak / 1024:>9.1f}" if peak is not None else f" {'-':>9}"
+            print(line)
+        if report['slowest']:
+            print(f"\nSlowest {len(report['slowest'])} monsters")
+            print(f"{'ms':>9} {'net blocks':>11}  monster (source)")
+            for item in report['slowest']:
+                print(f"{item['seconds'] * 1000:>9.2f} {item['blocks']:>11}  {item['name']} ({item['source']})")
+
+    def write_report(self, report_path, report=None):
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report or self.report(), f, indent=2, ensure_ascii=False)
+        print(f"Wrote profile report to {report_path}")
+
+def add_profile_arguments(parser):
+    """The --profile options both converter CLIs share."""
+    parser.add_argument("--profile", action="store_true", help="Time each conversion stage and monster (runs serially) and report where the time goes.")
+    parser.add_argument("--profile-memory", action="store_true", help="With --profile, also trace memory and report the peak per stage (much slower).")
+    parser.add_argument("--profile-top", type=int, default=10, help="With --profile, how many of the slowest monsters to list.")
+    parser.add_argument("--profile-report", type=str, help="With --profile, where to write the JSON report (default: <output_file>.profile.json).")
+
+def report_profile(profiler, report_path):
+    """Prints the profile and writes it as JSON, if the conversion got as far as running."""
+    if profiler.seconds:
+        report = profiler.report()
+        profiler.print_report(report)
+        profiler.write_report(report_path, report)
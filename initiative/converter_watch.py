@@ -0,0 +1,158 @@
+import os
+import select
+import struct
+import time
+
+DEFAULT_POLL_INTERVAL = 0.5
+DEFAULT_DEBOUNCE = 0.2
+
+# From <sys/inotify.h>
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+# Files are reported once written and closed (or moved in), never half-written
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF
+_EVENT_HEADER = struct.Struct('iIII') # wd, mask, cookie, len
+
+class PollingWatcher:
+    """
+    Finds created, modified and deleted files under root by comparing os.walk snapshots
+    of their mtime and size every interval seconds. Works everywhere; see InotifyWatcher.
+    """
+
+    def __init__(self, root, extensions, interval=DEFAULT_POLL_INTERVAL):
+        self.root = root
+        self.extensions = tuple(extensions)
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for directory, _, files in os.walk(self.root):
+            for filename in files:
+                if filename.endswith(self.extensions):
+                    path = os.path.join(directory, filename)
+                    try:
+                        stat_result = os.stat(path)
+                    except OSError:
+                        continue
+                    snapshot[path] = (stat_result.st_mtime_ns, stat_result.st_size)
+        return snapshot
+
+    def wait(self, timeout):
+        """Returns the paths changed since the last call (empty if none within timeout)."""
+        deadline = time.monotonic() + timeout
+        while True:
+            time.sleep(max(0.0, min(self.interval, deadline - time.monotonic())))
+            snapshot = self._scan()
+            changed = {path for path in snapshot.keys() | self._snapshot.keys() if snapshot.get(path) != self._snapshot.get(path)}
+            self._snapshot = snapshot
+            if changed or time.monotonic() >= deadline:
+                return changed
+
+    def close(self):
+        pass
+
+class InotifyWatcher:
+    """
+    Linux inotify on every directory under root (through libc, so no extra dependency).
+    wait() reports written, moved and deleted files with one of the extensions, and the
+    directories created, moved or deleted under root (whose files the caller re-examines).
+    After an event queue overflow it returns None: anything may have changed.
+    """
+
+    def __init__(self, root, extensions):
+        import ctypes # Only watch sessions need it
+        import ctypes.util
+        self.root = root
+        self.extensions = tuple(extensions)
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._get_errno = ctypes.get_errno
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(self._get_errno(), "inotify_init1 failed")
+        self._directories = {}
+        self._add_tree(root)
+
+    def _add_tree(self, top):
+        for directory, _, _ in os.walk(top):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+            if wd < 0:
+                raise OSError(self._get_errno(), f"inotify_add_watch failed for {directory}")
+            self._directories[wd] = directory
+
+    def _read_events(self):
+        changed = set()
+        try:
+            buffer = os.read(self._fd, 1 << 16)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, name_length = _EVENT_HEADER.unpack_from(buffer, offset)
+            name = buffer[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + name_length].rstrip(b'\0')
+            offset += _EVENT_HEADER.size + name_length
+            if mask & _IN_Q_OVERFLOW:
+                return None
+            directory = self._directories.get(wd)
+            if mask & _IN_IGNORED:
+                self._directories.pop(wd, None)
+                continue
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO) and os.path.isdir(path):
+                    self._add_tree(path)
+                changed.add(path)
+            elif path.endswith(self.extensions) and not mask & _IN_CREATE:
+                changed.add(path)
+        return changed
+
+    def wait(self, timeout):
+        """Returns the paths changed since the last call (empty if none within timeout), or None after an overflow."""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        return self._read_events()
+
+    def close(self):
+        os.close(self._fd)
+
+def open_watcher(root, extensions, poll=False, poll_interval=DEFAULT_POLL_INTERVAL):
+    """An InotifyWatcher where the platform has inotify (unless poll), else a PollingWatcher."""
+    if not poll:
+        try:
+            return InotifyWatcher(root, extensions)
+        except (AttributeError, OSError, TypeError) as e: # No libc inotify (not Linux) or out of watches
+            print(f"Note: inotify unavailable ({e}); polling every {poll_interval}s instead.")
+    return PollingWatcher(root, extensions, poll_interval)
+
+def iter_change_batches(watcher, debounce=DEFAULT_DEBOUNCE):
+    """
+    Yields the set of changed paths each time the tree settles: after the first change,
+    changes are gathered until none have arrived for debounce seconds, so an editor's
+    save or a checkout lands as one batch. None means anything may have changed.
+    """
+    while True:
+        changed = watcher.wait(1.0)
+        if not changed and changed is not None:
+            continue
+        while changed is not None:
+            more = watcher.wait(debounce)
+            if more is None:
+                changed = None
+            elif not more:
+                break
+            else:
+                changed |= more
+        yield changed
@@ -1,8 +1,84 @@
 import json
 import argparse
+import functools
 import math
 import re
-from bs4 import BeautifulSoup
+from converter_dedup import DedupExportWriter, add_dedup_arguments
+from converter_delta import DeltaExportWriter, load_base_export
+from converter_index import SEARCH_FACETS_KEY, IndexedExportWriter, search_index_path
+from converter_input import iter_json_array
+from converter_output import ExportWriter, JsonArrayWriter, NdjsonWriter, ShardedExportWriter, add_output_arguments, open_export_writer, resolve_output_format
+from converter_parallel import parallel_map
+from converter_profile import ConversionProfiler, add_profile_arguments, report_profile
+from html_sanitizer import strip_anchors
+from monster_model import MonsterModel
+from statblock_renderer import STATBLOCK_SCHEMA_VERSION, render_statblock
+from statblock_styles import NotesCompactor
+
+# (dump key, abbreviation, saving throw key) for each ability, in display order
+_ABILITIES = tuple((stat, stat[:3].upper(), f"{stat}_save") for stat in ('strength', 'dexterity', 'constitution', 'intelligence', 'wisdom', 'charisma'))
+
+_SKILL_NAMES = {
+    'history': 'History', 'perception': 'Perception', 'stealth': 'Stealth',
+    'insight': 'Insight', 'persuasion': 'Persuasion', 'medicine': 'Medicine',
+    'religion': 'Religion', 'athletics': 'Athletics', 'acrobatics': 'Acrobatics',
+    'sleight_of_hand': 'Sleight of Hand', 'arcana': 'Arcana', 'investigation': 'Investigation',
+    'nature': 'Nature', 'performance': 'Performance', 'intimidation': 'Intimidation',
+    'survival': 'Survival', 'deception': 'Deception', 'animal_handling': 'Animal Handling'
+}
+
+# Free-text tidbits kept as-is when present: (dump key, stat block key), in display order
+_TEXT_TIDBITS = (
+    ('senses', 'senses'),
+    ('languages', 'languages'),
+    ('damage_vulnerabilities', 'damageVulnerabilities'),
+    ('damage_resistances', 'damageResistances'),
+    ('damage_immunities', 'damageImmunities'),
+    ('condition_immunities', 'conditionImmunities'),
+)
+
+def _entry_pairs(entries):
+    """(name, description) of each special ability or action of a dump entry."""
+    return [(entry.get('name', 'Unknown'), entry.get('desc', 'No description.')) for entry in entries or ()]
+
+class Dnd5eMonster(MonsterModel):
+    """
+    The fields of a 5e dump entry (see MonsterModel), named after the dump's keys. Ability
+    scores, saving throws, skills and text tidbits are in _ABILITIES, _SKILL_NAMES and
+    _TEXT_TIDBITS order, and special abilities, actions and legendary actions are
+    (name, description) pairs.
+    """
+
+    __slots__ = ('size', 'type', 'subtype', 'alignment', 'armor_class', 'hit_points', 'hit_dice', 'speed', 'ability_scores', 'saves',
+                 'skills', 'text_tidbits', 'special_abilities', 'actions', 'legendary_actions')
+
+    version = "dnd_5e"
+
+    def __init__(self, monster):
+        get = monster.get
+        self.name = get('name', 'Unnamed Monster')
+        # Ensure HP is an integer for totalHp
+        self.hp = self.total_hp = int(get('hit_points', 0))
+        self.challenge = get('challenge_rating', '0')
+        # Calculate initiative bonus from Dexterity
+        dex_score = get('dexterity', 10) # Default to 10 (modifier of 0) if missing
+        self.initiative_bonus = math.floor((dex_score - 10) / 2) if isinstance(dex_score, int) else 0
+
+        self.size = get('size', 'Unknown')
+        self.type = get('type', 'creature')
+        self.subtype = get('subtype')
+        self.alignment = get('alignment', 'unaligned')
+        self.armor_class = get('armor_class', 'N/A')
+        self.hit_points = get('hit_points', 'N/A')
+        self.hit_dice = get('hit_dice')
+        self.speed = get('speed', 'N/A')
+        self.ability_scores = [get(stat, 'N/A') for stat, _, _ in _ABILITIES]
+        self.saves = [get(save_key) for _, _, save_key in _ABILITIES]
+        self.skills = [get(key) for key in _SKILL_NAMES]
+        self.text_tidbits = [get(key) for key, _ in _TEXT_TIDBITS]
+        self.special_abilities = _entry_pairs(get('special_abilities'))
+        self.actions = _entry_pairs(get('actions'))
+        self.legendary_actions = _entry_pairs(get('legendary_actions'))
 
 def _get_modifier_text(score):
     """Calculates and returns the D&D 5e ability modifier text."""
@@ -11,6 +87,7 @@ def _get_modifier_text(score):
     modifier = math.floor((score - 10) / 2)
     return f"({'+' if modifier >= 0 else ''}{modifier})"
 
+@functools.lru_cache(maxsize=None)
 def _calculate_xp_and_pb(cr_str):
     """Calculates XP and Proficiency Bonus based on Challenge Rating."""
     cr_to_xp = {
@@ -53,206 +130,89 @@ def _calculate_xp_and_pb(cr_str):
     return xp, pb
 
 
-def _generate_header_html(monster_data):
-    """Generates the HTML for the monster header."""
-    name = monster_data.get('name', 'Unnamed Monster')
-    size = monster_data.get('size', 'Unknown')
-    m_type = monster_data.get('type', 'creature')
-    subtype = f" ({monster_data['subtype'].replace('any race', 'any race').title()})" if monster_data.get('subtype') else ''
-    alignment = monster_data.get('alignment', 'unaligned')
-
-    return f"""
-<div class="mon-stat-block__header" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; line-height: 1.1; background-color: rgb(255, 255, 255);">
-    <div class="mon-stat-block__name" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold; font-size: 34px; font-family: MrsEavesSmallCaps, Roboto, Helvetica, sans-serif; color: rgb(130, 32, 0);">
-        <span class="mon-stat-block__name-link" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; color: rgb(130, 32, 0); text-decoration: none;">{name}</span>
-    </div>
-    <div class="mon-stat-block__meta" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-style: italic; margin-bottom: 15px;">{size} {m_type.title()}{subtype}, {alignment}</div>
-</div>
-"""
-
-def _generate_attributes_html(monster_data):
-    """Generates the HTML for AC, HP, and Speed attributes."""
+def _hit_dice_text(monster):
+    """The hit dice shown after the hit points, e.g. " (8d10 + 16)"."""
     hp_extra = ""
-    if monster_data.get('hit_dice') and monster_data.get('constitution') is not None:
+    hit_dice, constitution = monster.hit_dice, monster.ability_scores[2]
+    if hit_dice and constitution is not None:
         try:
-            num_dice_str = monster_data['hit_dice'].split('d')[0]
+            num_dice_str = hit_dice.split('d')[0]
             num_dice = int(num_dice_str)
-            con_mod = math.floor((int(monster_data['constitution']) - 10) / 2)
+            con_mod = math.floor((int(constitution) - 10) / 2)
             calculated_hp_bonus = num_dice * con_mod
             if calculated_hp_bonus > 0:
-                 hp_extra = f" ({monster_data['hit_dice']} + {calculated_hp_bonus})"
+                 hp_extra = f" ({hit_dice} + {calculated_hp_bonus})"
             elif calculated_hp_bonus < 0:
-                 hp_extra = f" ({monster_data['hit_dice']} - {abs(calculated_hp_bonus)})"
+                 hp_extra = f" ({hit_dice} - {abs(calculated_hp_bonus)})"
             else: # If bonus is 0, just show hit dice
-                 hp_extra = f" ({monster_data['hit_dice']})"
+                 hp_extra = f" ({hit_dice})"
         except (ValueError, TypeError):
-            hp_extra = f" ({monster_data.get('hit_dice', 'N/A')})" # Fallback if parsing hit_dice or con fails
-    elif monster_data.get('hit_dice'):
-        hp_extra = f" ({monster_data['hit_dice']})"
-
-
-    return f"""
-<div class="mon-stat-block__attributes" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; color: rgb(0, 0, 0); font-family: &quot;Scala Sans Offc&quot;, Roboto, Helvetica, sans-serif; font-size: 15px; font-variant-caps: normal; letter-spacing: normal;">
-    <div class="mon-stat-block__attribute" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(130, 32, 0); line-height: 1.2;">
-        <span class="mon-stat-block__attribute-label" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">Armor Class</span>&nbsp;<span class="mon-stat-block__attribute-value" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;"><span class="mon-stat-block__attribute-data-value" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{monster_data.get('armor_class', 'N/A')}&nbsp;</span><span class="mon-stat-block__attribute-data-extra" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;"></span></span>
-    </div>
-    <div class="mon-stat-block__attribute" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(130, 32, 0); line-height: 1.2;">
-        <span class="mon-stat-block__attribute-label" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">Hit Points</span>&nbsp;<span class="mon-stat-block__attribute-data" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;"><span class="mon-stat-block__attribute-data-value" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{monster_data.get('hit_points', 'N/A')}&nbsp;</span><span class="mon-stat-block__attribute-data-extra" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{hp_extra}</span></span>
-    </div>
-    <div class="mon-stat-block__attribute" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(130, 32, 0); line-height: 1.2;">
-        <span class="mon-stat-block__attribute-label" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">Speed</span>&nbsp;<span class="mon-stat-block__attribute-data" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{monster_data.get('speed', 'N/A')}</span>
-    </div>
-</div>
-"""
-
-def _generate_ability_scores_html_for_main_block(monster_data):
+            hp_extra = f" ({hit_dice})" # Fallback if parsing hit_dice or con fails
+    elif hit_dice:
+        hp_extra = f" ({hit_dice})"
+    return hp_extra
+
+def _description_entries(items):
+    """[name, description HTML] pairs for (name, description) special abilities, actions, or legendary actions."""
+    entries = []
+    for name, desc in items:
+        # Replace newlines with <br> for HTML display if present
+        desc = desc.replace('\\n', '<br>')
+
+        # Clean the description HTML, removing hrefs (<a> tags are dropped, their text kept)
+        entries.append([str(name), strip_anchors(desc)])
+    return entries
+
+def build_statblock(monster):
     """
-    Generates the HTML for the ability scores block,
-    specifically for the main stat block HTML.
+    The stat block of a monster (a Dnd5eMonster) as structured data (see
+    statblock_renderer.render_statblock). Every value that ends up in the notes is
+    already a display string, so the tracker can render the block without knowing the
+    game rules. Empty sections are left out.
     """
-    abilities_html = ""
-    ability_order = ['strength', 'dexterity', 'constitution', 'intelligence', 'wisdom', 'charisma']
-
-    for stat in ability_order:
-        score = monster_data.get(stat, 'N/A')
-        mod_text = _get_modifier_text(score)
-        stat_abbr = stat[:3].upper()
-        
-        abilities_html += f"""
-<div class="ability-block__stat ability-block__stat--{stat_abbr.lower()}" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; width: 59.1667px; padding: 5px 0px; text-align: center;">
-    <div class="ability-block__heading" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">{stat_abbr}</div>
-    <div class="ability-block__data" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;"><span class="ability-block__score" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{score}</span>&nbsp;<span class="ability-block__modifier" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin-left: 2px;">{mod_text}</span></div>
-</div>"""
-    return abilities_html
-
-
-def _generate_tidbits_html(monster_data):
-    """Generates HTML for saving throws, skills, senses, languages, and CR/PB."""
-    tidbits_html = []
-
-    # Saving Throws
+    subtype = f" ({monster.subtype.replace('any race', 'any race').title()})" if monster.subtype else ''
+    statblock = {
+        "schema": STATBLOCK_SCHEMA_VERSION,
+        "system": "dnd_5e",
+        "name": str(monster.name),
+        "meta": f"{monster.size} {monster.type.title()}{subtype}, {monster.alignment}",
+        "ac": str(monster.armor_class),
+        "hp": str(monster.hit_points),
+        "hitDice": _hit_dice_text(monster),
+        "speed": str(monster.speed),
+        "abilities": [[stat_abbr, str(score), _get_modifier_text(score)] for (_, stat_abbr, _), score in zip(_ABILITIES, monster.ability_scores)],
+    }
+
     save_throws = []
-    for stat in ['strength', 'dexterity', 'constitution', 'intelligence', 'wisdom', 'charisma']:
-        save_key = f"{stat}_save"
-        if monster_data.get(save_key) is not None and str(monster_data[save_key]).strip():
-            save_throws.append(f"{stat[:3].upper()} +{monster_data[save_key]}")
+    for (_, stat_abbr, _), save_value in zip(_ABILITIES, monster.saves):
+        if save_value is not None and str(save_value).strip():
+            save_throws.append([stat_abbr, str(save_value)])
     if save_throws:
-        tidbits_html.append(f"""
-<div class="mon-stat-block__tidbit" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(130, 32, 0); line-height: 1.2;">
-    <span class="mon-stat-block__tidbit-label" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">Saving Throws</span>&nbsp;<span class="mon-stat-block__tidbit-data" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{', '.join(save_throws)}</span>
-</div>""")
+        statblock["saves"] = save_throws
 
-    # Skills
     skills = []
-    skill_mapping = {
-        'history': 'History', 'perception': 'Perception', 'stealth': 'Stealth',
-        'insight': 'Insight', 'persuasion': 'Persuasion', 'medicine': 'Medicine',
-        'religion': 'Religion', 'athletics': 'Athletics', 'acrobatics': 'Acrobatics',
-        'sleight_of_hand': 'Sleight of Hand', 'arcana': 'Arcana', 'investigation': 'Investigation',
-        'nature': 'Nature', 'performance': 'Performance', 'intimidation': 'Intimidation',
-        'survival': 'Survival', 'deception': 'Deception', 'animal_handling': 'Animal Handling'
-    }
-
-    for key, display_name in skill_mapping.items():
-        if monster_data.get(key) is not None and str(monster_data[key]).strip():
-            skills.append(f"{display_name} +{monster_data[key]}")
-
+    for display_name, skill_value in zip(_SKILL_NAMES.values(), monster.skills):
+        if skill_value is not None and str(skill_value).strip():
+            skills.append([display_name, str(skill_value)])
     if skills:
-        tidbits_html.append(f"""
-<div class="mon-stat-block__tidbit" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(130, 32, 0); line-height: 1.2;">
-    <span class="mon-stat-block__tidbit-label" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">Skills</span>&nbsp;<span class="mon-stat-block__tidbit-data" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{', '.join(skills)}</span>
-</div>""")
-
-    # Senses
-    if monster_data.get('senses'):
-        tidbits_html.append(f"""
-<div class="mon-stat-block__tidbit" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(130, 32, 0); line-height: 1.2;">
-    <span class="mon-stat-block__tidbit-label" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">Senses</span>&nbsp;<span class="mon-stat-block__tidbit-data" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{monster_data['senses']}</span>
-</div>""")
-
-    # Languages
-    if monster_data.get('languages'):
-        tidbits_html.append(f"""
-<div class="mon-stat-block__tidbit" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(130, 32, 0); line-height: 1.2;">
-    <span class="mon-stat-block__tidbit-label" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">Languages</span>&nbsp;<span class="mon-stat-block__tidbit-data" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{monster_data['languages']}</span>
-</div>""")
-
-    # Damage Vulnerabilities, Resistances, Immunities, Condition Immunities (only if they have values)
-    if monster_data.get('damage_vulnerabilities'):
-        tidbits_html.append(f"""
-<div class="mon-stat-block__tidbit" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(130, 32, 0); line-height: 1.2;">
-    <span class="mon-stat-block__tidbit-label" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">Damage Vulnerabilities</span>&nbsp;<span class="mon-stat-block__tidbit-data" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{monster_data['damage_vulnerabilities']}</span>
-</div>""")
-    if monster_data.get('damage_resistances'):
-        tidbits_html.append(f"""
-<div class="mon-stat-block__tidbit" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(130, 32, 0); line-height: 1.2;">
-    <span class="mon-stat-block__tidbit-label" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">Damage Resistances</span>&nbsp;<span class="mon-stat-block__tidbit-data" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{monster_data['damage_resistances']}</span>
-</div>""")
-    if monster_data.get('damage_immunities'):
-        tidbits_html.append(f"""
-<div class="mon-stat-block__tidbit" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(130, 32, 0); line-height: 1.2;">
-    <span class="mon-stat-block__tidbit-label" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">Damage Immunities</span>&nbsp;<span class="mon-stat-block__tidbit-data" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{monster_data['damage_immunities']}</span>
-</div>""")
-    if monster_data.get('condition_immunities'):
-        tidbits_html.append(f"""
-<div class="mon-stat-block__tidbit" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(130, 32, 0); line-height: 1.2;">
-    <span class="mon-stat-block__tidbit-label" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">Condition Immunities</span>&nbsp;<span class="mon-stat-block__tidbit-data" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{monster_data['condition_immunities']}</span>
-</div>""")
+        statblock["skills"] = skills
 
+    # Senses, languages, then damage vulnerabilities, resistances, immunities and
+    # condition immunities (only if they have values)
+    for (_, statblock_key), text in zip(_TEXT_TIDBITS, monster.text_tidbits):
+        if text:
+            statblock[statblock_key] = str(text)
 
     # Challenge Rating and Proficiency Bonus
-    cr_str = str(monster_data.get('challenge_rating', '0'))
+    cr_str = str(monster.challenge)
     xp, pb = _calculate_xp_and_pb(cr_str)
-    
-    tidbits_html.append(f"""
-<div class="mon-stat-block__tidbit-container" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; display: flex;">
-    <div class="mon-stat-block__tidbit" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(130, 32, 0); line-height: 1.2;">
-        <span class="mon-stat-block__tidbit-label" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">Challenge</span>&nbsp;<span class="mon-stat-block__tidbit-data" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{cr_str} ({xp} XP)</span>
-    </div>
-    <div class="mon-stat-block__tidbit-spacer" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; width: 40px; min-width: 10px;"></div>
-    <div class="mon-stat-block__tidbit" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(130, 32, 0); line-height: 1.2;">
-        <span class="mon-stat-block__tidbit-label" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">Proficiency Bonus</span>&nbsp;<span class="mon-stat-block__tidbit-data" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">+{pb}</span>
-    </div>
-</div>
-""")
-
-    return "\n".join(tidbits_html)
-
-def _generate_description_block_html(heading_text, items):
-    """Generates HTML for special abilities, actions, or legendary actions."""
-    if not items:
-        return ""
-
-    content_html = ""
-    for item in items:
-        name = item.get('name', 'Unknown')
-        desc = item.get('desc', 'No description.')
-        
-        # Replace newlines with <br> for HTML display if present
-        desc = desc.replace('\\n', '<br>')
+    statblock.update(challenge=cr_str, xp=str(xp), proficiencyBonus=str(pb))
 
-        # Use BeautifulSoup to parse and clean the description HTML, removing hrefs
-        soup = BeautifulSoup(desc, 'html.parser')
-        for a_tag in soup.find_all('a'):
-            a_tag.unwrap() # Remove the <a> tag but keep its content
-
-        # Convert back to string and ensure it's clean (no extra newlines from BeautifulSoup)
-        cleaned_desc = str(soup).strip()
-        
-        # Add emphasis/strong tags as per example
-        if heading_text == "Traits":
-             content_html += f"""<p style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin-bottom: 10px;"><em style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;"><strong style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">{name}.</strong></em>&nbsp;{cleaned_desc}</p>"""
-        else: # For Actions and Legendary Actions, name is usually bold, then desc follows.
-            content_html += f"""<p style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin-bottom: 10px;"><strong style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">{name}.</strong>&nbsp;{cleaned_desc}</p>"""
-            
-    return f"""
-<div class="mon-stat-block__description-block" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">
-    <div class="mon-stat-block__description-block-heading" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; border-bottom-width: 1px; border-bottom-style: solid; border-bottom-color: rgb(130, 32, 0); color: rgb(130, 32, 0); font-size: 24px; line-height: 1.4; margin-top: 20px; margin-bottom: 15px;">{heading_text}</div>
-    <div class="mon-stat-block__description-block-content" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">
-        {content_html}
-    </div>
-</div>
-"""
+    for key, statblock_key in (('special_abilities', 'traits'), ('actions', 'actions'), ('legendary_actions', 'legendaryActions')):
+        entries = _description_entries(getattr(monster, key))
+        if entries:
+            statblock[statblock_key] = entries
+    return statblock
 
 def format_monster_notes(monster_data):
     """
@@ -260,103 +220,203 @@ def format_monster_notes(monster_data):
     mimicking D&D Beyond stat block styling for the 'notes' field.
     All href links are removed.
     """
-    
-    header_html = _generate_header_html(monster_data)
-    attributes_html = _generate_attributes_html(monster_data)
-    ability_scores_html = _generate_ability_scores_html_for_main_block(monster_data)
-    tidbits_html = _generate_tidbits_html(monster_data)
-    
-    traits_html = _generate_description_block_html("Traits", monster_data.get('special_abilities', []))
-    actions_html = _generate_description_block_html("Actions", monster_data.get('actions', []))
-    legendary_actions_html = _generate_description_block_html("Legendary Actions", monster_data.get('legendary_actions', []))
-
-    full_notes_html = f"""
-<div class="mon-stat-block" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; color: rgb(0, 0, 0); font-family: &quot;Scala Sans Offc&quot;, Roboto, Helvetica, sans-serif; font-size: 15px; font-variant-caps: normal; letter-spacing: normal;">
-    {header_html}
-    <div class="mon-stat-block__separator" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;"><img class="mon-stat-block__separator-img" alt="" src="https://www.dndbeyond.com/file-attachments/0/579/stat-block-header-bar.svg" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; border-style: none; min-height: 10px;"></div>
-    {attributes_html}
-    <div class="mon-stat-block__separator" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;"><img class="mon-stat-block__separator-img" alt="" src="https://www.dndbeyond.com/file-attachments/0/579/stat-block-header-bar.svg" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; border-style: none; min-height: 10px;"></div>
-    <div class="ability-block" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; display: flex; flex-wrap: wrap; margin: 0px; color: rgb(130, 32, 0);">
-        {ability_scores_html}
-    </div>
-    <div class="mon-stat-block__separator" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;"><img class="mon-stat-block__separator-img" alt="" src="https://www.dndbeyond.com/file-attachments/0/579/stat-block-header-bar.svg" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; border-style: none; min-height: 10px;"></div>
-    <div class="mon-stat-block__tidbits" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">
-        {tidbits_html}
-    </div>
-    <div class="mon-stat-block__separator" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;"><img class="mon-stat-block__separator-img" alt="" src="https://www.dndbeyond.com/file-attachments/0/579/stat-block-header-bar.svg" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; border-style: none; min-height: 10px;"></div>
-    <div class="mon-stat-block__description-blocks" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin-top: 20px;">
-        {traits_html}
-        {actions_html}
-        {legendary_actions_html}
-    </div>
-</div>
-"""
-    return full_notes_html
-
-
-def convert_monster_data(input_json_path, output_json_path):
+    return render_statblock(build_statblock(Dnd5eMonster(monster_data)))
+
+
+_DAMAGE_TYPES = ('acid', 'bludgeoning', 'cold', 'fire', 'force', 'lightning', 'necrotic', 'piercing', 'poison', 'psychic', 'radiant', 'slashing', 'thunder')
+_DAMAGE_TYPE_NAMES = frozenset(_DAMAGE_TYPES)
+_LAST_WORD_RE = re.compile(r'\w+$')
+_DAMAGE_WORD_RE = re.compile(r' damage\b')
+_DAMAGE_WORD_WINDOW = max(map(len, _DAMAGE_TYPES)) + 1
+
+def _damage_types_dealt(desc):
+    """
+    The damage types in a lowercased description's "<type> damage" phrases. Finds each
+    " damage" and checks the word before it, which is several times quicker than a regex
+    alternation of every damage type scanning the whole text.
+    """
+    found = []
+    pos = desc.find(' damage')
+    while pos != -1:
+        # The window is one longer than any damage type, so a longer word never matches as its tail
+        word = _LAST_WORD_RE.search(desc, max(0, pos - _DAMAGE_WORD_WINDOW), pos)
+        if word and word.group() in _DAMAGE_TYPE_NAMES and _DAMAGE_WORD_RE.match(desc, pos):
+            found.append(word.group())
+        pos = desc.find(' damage', pos + 7)
+    return found
+
+def _search_facets(monster):
+    """
+    What the search index files a monster under: creature type, size, traits (subtypes
+    and special ability names) and the damage types its abilities mention.
+    """
+    facets = {}
+    for facet, key in (('type', 'type'), ('size', 'size')):
+        if monster.get(key):
+            facets[facet] = [str(monster[key]).lower()]
+    traits = {subtype.strip().lower() for subtype in str(monster.get('subtype') or '').split(',') if subtype.strip()}
+    # "Legendary Resistance (3/Day)" is filed under "legendary resistance"
+    traits.update(re.sub(r'\s*\(.*?\)', '', str(ability.get('name', ''))).strip().lower() for ability in monster.get('special_abilities') or [])
+    traits.discard('')
+    if traits:
+        facets['traits'] = sorted(traits)
+    damage = {damage_type for key in ('special_abilities', 'actions', 'reactions', 'legendary_actions') for entry in monster.get(key) or []
+              for damage_type in _damage_types_dealt(str(entry.get('desc', '')).lower())}
+    if damage:
+        facets['damage'] = sorted(damage)
+    return facets
+
+def _convert_single_monster(monster, structured=False):
+    """
+    Converts one monster dump entry to the Initiative Tracker format. With structured,
+    the record carries the stat block data instead of the rendered notes.
+    Returns the converted monster data or None if the entry is skipped or fails.
+    """
+    # Check for a valid monster name before proceeding
+    original_name = monster.get('name')
+    if not original_name: # Skips if name is missing or an empty string
+        print("Warning: Skipping an entry because monster name is missing.")
+        return None
+
+    try:
+        extracted = Dnd5eMonster(monster)
+        converted_monster = extracted.record()
+        converted_monster[SEARCH_FACETS_KEY] = _search_facets(monster)
+        statblock = build_statblock(extracted)
+        if structured:
+            converted_monster["statblock"] = statblock
+        else:
+            converted_monster["notes"] = render_statblock(statblock)
+        return converted_monster
+    except Exception as e:
+        # Now using original_name in the warning message for better context
+        print(f"Warning: Failed to process monster '{original_name}' due to: {e}")
+        return None
+
+
+def _iter_monster_dump(input_file, input_json_path):
+    """
+    Yields monster dump entries one at a time as they are parsed. A malformed entry
+    is reported and ends the stream, so everything before it still gets converted.
+    """
+    try:
+        yield from iter_json_array(input_file)
+    except json.JSONDecodeError as e:
+        print(f"Error: Could not decode JSON from {input_json_path}: {e.msg}. Entries before this point were still converted.")
+
+def _describe_profiled_monster(monster, converted_monster):
+    return str(monster.get('name')), None
+
+def _profile_targets():
+    """What --profile times, as (owner, {function name: stage}) pairs."""
+    return (
+        (globals(), {
+            '_convert_single_monster': ('convert', _describe_profiled_monster),
+            '_iter_monster_dump': 'parse',
+            'build_statblock': 'statblock',
+            '_hit_dice_text': 'hit dice',
+            '_description_entries': 'descriptions',
+            'render_statblock': 'render',
+            '_search_facets': 'facets',
+        }),
+        (Dnd5eMonster, {'__init__': 'extract'}),
+        (NotesCompactor, {'compact': 'compact'}),
+        (JsonArrayWriter, {'write': 'write'}),
+        (NdjsonWriter, {'write': 'write'}),
+        (ExportWriter, {'close': 'write'}),
+        (ShardedExportWriter, {'write': 'write', 'close': 'write'}),
+        (IndexedExportWriter, {'write': 'index', 'close': 'index'}),
+        (DeltaExportWriter, {'write': 'delta', 'close': 'delta'}),
+        (DedupExportWriter, {'write': 'dedup', 'close': 'dedup'}),
+    )
+
+def convert_monster_data(input_json_path, output_json_path, *, jobs=1, compact=False, structured=False, profiler=None,
+                         output_format='json', compress=False, shard_by=None, search_index=False, base_path=None,
+                         dedup=None):
     """
     Reads monster data from a JSON file and converts it to the Initiative Tracker format.
+    Everything after output_json_path is an option, passed by keyword.
+    The input is parsed incrementally, so conversion starts immediately and memory stays
+    bounded regardless of the dump size.
+    With jobs > 1 the per-monster rendering is spread over a process pool;
+    the output is identical to the serial run.
+    With compact, notes use the classes from statblock.css instead of inline styles.
+    With structured, records carry a "statblock" object instead of notes and the tracker
+    renders the HTML when a monster's notes are first opened.
+    With a ConversionProfiler, the run is serial and timed per stage and per monster.
+    output_format and compress pick the export format (see converter_output.OUTPUT_FORMATS);
+    with shard_by, output_json_path is a directory that gets a sharded export.
+    With search_index, an inverted index for the tracker's search is written next to it,
+    and with a base_path (a previous export) the delta from it (see converter_delta).
+    With a dedup policy, monsters identical to one already written are dropped or linked
+    to it (see converter_dedup).
     """
+    if profiler:
+        if jobs != 1:
+            print("Note: --profile converts serially; --jobs is ignored.")
+        # Convert serially with the stage functions swapped for timed ones
+        with profiler.instrument(*_profile_targets()):
+            return convert_monster_data(input_json_path, output_json_path, jobs=1, compact=compact, structured=structured,
+                                        output_format=output_format, compress=compress, shard_by=shard_by, search_index=search_index,
+                                        base_path=base_path, dedup=dedup)
+
+    # Read before anything is written, as the base is often the export about to be replaced
+    base = load_base_export(base_path) if base_path else None
+    if base_path and base is None:
+        return
+
     try:
-        with open(input_json_path, 'r', encoding='utf-8') as f:
-            monster_dump_data = json.load(f)
+        input_file = open(input_json_path, 'r', encoding='utf-8')
     except FileNotFoundError:
         print(f"Error: Input file not found at {input_json_path}")
         return
-    except json.JSONDecodeError:
-        print(f"Error: Could not decode JSON from {input_json_path}. Please ensure it's valid JSON.")
-        return
 
-    converted_monsters = []
-    for monster in monster_dump_data:
-        # Check for a valid monster name before proceeding
-        original_name = monster.get('name')
-        if not original_name: # Skips if name is missing or an empty string
-            print("Warning: Skipping an entry because monster name is missing.")
-            continue
+    if compact and structured:
+        print("Warning: --compact has no effect with --structured, which writes no notes HTML.")
+    compactor = NotesCompactor() if compact and not structured else None
+    convert = functools.partial(_convert_single_monster, structured=True) if structured else _convert_single_monster
 
+    # Records are streamed to the output as they are converted rather than collected in a list
+    with input_file:
         try:
-            # Ensure HP is an integer for totalHp
-            hp_value = int(monster.get('hit_points', 0))
-            
-            # Get CR for the challenge field
-            cr = monster.get('challenge_rating', '0')
-            
-            # Calculate initiative bonus from Dexterity
-            dex_score = monster.get('dexterity', 10) # Default to 10 (modifier of 0) if missing
-            initiative_bonus = 0
-            if isinstance(dex_score, int):
-                initiative_bonus = math.floor((dex_score - 10) / 2)
-
-            converted_monster = {
-                "name": original_name,
-                "hp": str(hp_value),
-                "totalHp": str(hp_value),
-                "initiativeBonus": initiative_bonus,
-                "version": "dnd_5e",
-                "challenge": str(cr),
-                "notes": format_monster_notes(monster)
-            }
-
-            converted_monsters.append(converted_monster)
-        except Exception as e:
-            # Now using original_name in the warning message for better context
-            print(f"Warning: Failed to process monster '{original_name}' due to: {e}")
-            continue
-
-    try:
-        with open(output_json_path, 'w', encoding='utf-8') as f:
-            json.dump(converted_monsters, f, indent=2, ensure_ascii=False)
-        print(f"Successfully converted {len(converted_monsters)} monsters to {output_json_path}")
-    except IOError as e:
-        print(f"Error writing to output file {output_json_path}: {e}")
-
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Convert D&D monster data from a dump to Initiative Tracker format.")
+            writer = open_export_writer(output_json_path, output_format, compress, shard_by,
+                                        search_index_path(output_json_path, shard_by) if search_index else None, base, dedup)
+            try:
+                monster_dump_entries = _iter_monster_dump(input_file, input_json_path)
+                for converted_monster in parallel_map(convert, monster_dump_entries, jobs, chunksize=32):
+                    if converted_monster:
+                        writer.write(compactor.compact(converted_monster) if compactor else converted_monster)
+            except BaseException:
+                writer.abort()
+                raise
+            writer.close()
+            print(f"Successfully converted {writer.count} monsters to {output_json_path}")
+            if compactor:
+                print(compactor.summary())
+        except IOError as e:
+            print(f"Error writing to output file {output_json_path}: {e}")
+
+def main(argv=None, prog=None):
+    """Command-line entry point; also run as `convert.py 5e`."""
+    parser = argparse.ArgumentParser(prog=prog, description="Convert D&D monster data from a dump to Initiative Tracker format.")
     parser.add_argument("input_file", type=str, help="Path to the input JSON monster dump file.")
     parser.add_argument("output_file", type=str, help="Path for the output JSON file in Initiative Tracker format.")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of worker processes for rendering (0 = one per CPU).")
+    parser.add_argument("--compact", action="store_true", help="Emit class-only notes markup styled by statblock.css.")
+    parser.add_argument("--structured", action="store_true", help="Emit structured stat block data instead of notes HTML; the tracker renders it on demand.")
+    add_output_arguments(parser)
+    add_dedup_arguments(parser)
+    add_profile_arguments(parser)
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
-    convert_monster_data(args.input_file, args.output_file)
+    output_format, compress = resolve_output_format(args.output_file, args.format, args.gzip)
+    profiler = ConversionProfiler(args.profile_memory, args.profile_top) if args.profile else None
+    convert_monster_data(args.input_file, args.output_file, jobs=args.jobs, compact=args.compact, structured=args.structured,
+                         profiler=profiler, output_format=output_format, compress=compress, shard_by=args.shard_by,
+                         search_index=args.search_index, base_path=args.base, dedup=args.dedup)
+    if profiler:
+        report_profile(profiler, args.profile_report or f"{args.output_file}.profile.json")
+
+if __name__ == "__main__":
+    main()
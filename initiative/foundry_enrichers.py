@@ -0,0 +1,169 @@
+import os
+import re
+
+# Registered enrichers, in priority order: (name, pattern, handler).
+# When two patterns could match at the same position the earlier one wins,
+# e.g. a labelled @UUID[...]{...} is tried before the bare @UUID[...] form.
+_ENRICHERS = []
+
+# Compiled lazily from _ENRICHERS: the alternation regex, the literal strings every
+# enricher starts with, and for each enricher's wrapping group a function that calls
+# its handler with the enricher's own groups
+_enricher_re = None
+_triggers = None
+_dispatch_table = {}
+
+_REGEX_SPECIAL_CHARS = '.^$*+?{}[]|()'
+
+def enricher(name, pattern):
+    """
+    Registers a handler for one Foundry inline enricher syntax. The handler receives
+    the pattern's capture groups as positional arguments and returns the replacement
+    text. Patterns must not use named groups or backreferences.
+    """
+    def register(handler):
+        global _enricher_re
+        _ENRICHERS.append((name, pattern, handler))
+        _enricher_re = None # Recompiled on next use
+        return handler
+    return register
+
+def _bind_handler(handler, first_group, group_count):
+    """Returns a match -> replacement function passing only this enricher's groups."""
+    if group_count == 0:
+        return lambda match: handler()
+    if group_count == 1:
+        return lambda match: handler(match.group(first_group))
+    groups = range(first_group, first_group + group_count)
+    return lambda match: handler(*match.group(*groups))
+
+def _literal_prefix(pattern):
+    """The literal text every match of pattern starts with (e.g. '@UUID[' or '[[/r '), possibly ''."""
+    prefix = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == '\\' and index + 1 < len(pattern) and not pattern[index + 1].isalnum():
+            char = pattern[index + 1]
+            index += 2
+        elif char in _REGEX_SPECIAL_CHARS or char == '\\':
+            break
+        else:
+            index += 1
+        if pattern[index:index + 1] in ('*', '?', '{'):
+            break # The quantifier makes this character optional
+        prefix.append(char)
+        if pattern[index:index + 1] == '+':
+            break
+    return ''.join(prefix)
+
+def _compile():
+    """
+    Builds the single alternation regex over every registered enricher, plus the
+    trigger strings (the shared literal start of each family of enrichers, e.g. '@'
+    and '[[/') used to find candidate positions with str.find.
+    """
+    global _enricher_re, _triggers
+    alternatives = []
+    prefixes_by_first_char = {}
+    _dispatch_table.clear()
+    group_index = 0
+    for _, pattern, handler in _ENRICHERS:
+        inner_groups = re.compile(pattern).groups
+        alternatives.append(f"({pattern})")
+        prefix = _literal_prefix(pattern)
+        prefixes_by_first_char.setdefault(prefix[:1], []).append(prefix)
+        _dispatch_table[group_index + 1] = _bind_handler(handler, group_index + 2, inner_groups)
+        group_index += 1 + inner_groups
+    _enricher_re = re.compile('|'.join(alternatives))
+    # Without a literal start for every enricher, fall back to a plain regex scan
+    _triggers = None if '' in prefixes_by_first_char else [os.path.commonprefix(prefixes) for prefixes in prefixes_by_first_char.values()]
+    return _enricher_re
+
+def _dispatch(match):
+    # The enricher's wrapping group is the last one to close, so it's the match's lastindex
+    return _dispatch_table[match.lastindex](match)
+
+def replace_enrichers(text):
+    """
+    Replaces every registered enricher in text in a single left-to-right scan.
+    Candidate positions are found with str.find on the trigger strings, which skips
+    plain prose far faster than a regex scan; the alternation regex is only tried
+    (anchored) where a trigger occurs. Replacement text is not rescanned.
+    """
+    pattern = _enricher_re or _compile()
+    if _triggers is None:
+        return pattern.sub(_dispatch, text)
+
+    find = text.find
+    next_positions = [find(trigger) for trigger in _triggers]
+    if max(next_positions) < 0:
+        return text
+
+    parts = []
+    copied_up_to = 0
+    match_at = pattern.match
+    while True:
+        candidates = [position for position in next_positions if position >= 0]
+        if not candidates:
+            break
+        position = min(candidates)
+        match = match_at(text, position)
+        if match:
+            parts.append(text[copied_up_to:position])
+            parts.append(_dispatch(match))
+            copied_up_to = scan_from = match.end()
+        else:
+            scan_from = position + 1
+        for index, next_position in enumerate(next_positions):
+            if 0 <= next_position < scan_from:
+                next_positions[index] = find(_triggers[index], scan_from)
+    parts.append(text[copied_up_to:])
+    return ''.join(parts)
+
+@enricher('uuid_label', r'@UUID\[[^\]]+\]\{([^}]+)\}')
+def _uuid_with_label(label):
+    # e.g. @UUID[Compendium.pf2e.conditionitems.Item.Grabbed]{Grabbed} -> Grabbed
+    return label
+
+@enricher('uuid', r'@UUID\[(?:[^\]]*[/\.])?([^\].]+?)\]')
+def _uuid_without_label(last_segment):
+    # e.g. @UUID[Compendium.pf2e.conditionitems.Item.Grabbed] -> Grabbed
+    return last_segment
+
+@enricher('check', r'@Check\[([^\]]+)\]')
+def _check(parameters):
+    return f"Check ({parameters.replace('|', ' ').title()})"
+
+@enricher('damage', r'@Damage\[([^\]]+)\]')
+def _damage(formula):
+    return f"{formula.replace('[', ' ').replace(']', ' ')} damage"
+
+@enricher('template', r'@Template\[([^\]]+)\](?:\{([^}]+)\})?')
+def _template(parameters, label):
+    # e.g. @Template[type:cone|distance:30] or @Template[cone|distance:30] -> 30-foot cone
+    if label:
+        return label
+    area_type = ''
+    distance = ''
+    for part in parameters.split('|'):
+        key, _, value = part.partition(':')
+        if not value:
+            area_type = key
+        elif key == 'type':
+            area_type = value
+        elif key == 'distance':
+            distance = value
+    return f"{distance}-foot {area_type}" if distance else area_type
+
+@enricher('localize', r'@Localize\[[^\]]+\]')
+def _localize():
+    return '' # Localization keys can't be resolved outside Foundry
+
+@enricher('roll', r'\[\[/r ([^\]]+)\]\]')
+def _inline_roll(formula):
+    return f"({formula})" # [[/r 2d6]] -> (2d6)
+
+@enricher('blind_roll', r'\[\[/br (.*?)\]\]')
+def _blind_roll(formula):
+    return f"({formula})" # [[/br ...]] -> (...)
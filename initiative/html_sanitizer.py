@@ -0,0 +1,192 @@
+import re
+from html.entities import name2codepoint
+from html.parser import HTMLParser
+
+# Tags BeautifulSoup serializes as self-closing (<br/>) and never pushes onto the open-tag stack
+_VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link', 'menuitem',
+    'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound', 'command', 'frame',
+    'image', 'isindex', 'nextid', 'spacer',
+}
+
+# Attributes BeautifulSoup treats as whitespace-separated lists (and re-joins with single spaces)
+_LIST_ATTRIBUTES = {
+    'class', 'accesskey', 'dropzone', 'rel', 'rev', 'headers', 'accept-charset', 'archive',
+    'sizes', 'sandbox', 'for',
+}
+
+# Raw-text content html.parser doesn't tokenize, and tags inside which BeautifulSoup keeps
+# whitespace verbatim; both are left to BeautifulSoup
+_FULL_PARSE_TAGS = {'script', 'style', 'pre', 'textarea'}
+
+_ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+
+_AMPERSAND_RE = re.compile(r'&(?:#[xX]([0-9a-fA-F]+);|#([0-9]+);|([a-zA-Z][a-zA-Z0-9]*);|(?=[^a-zA-Z#])|$)')
+
+class _NeedsFullParse(Exception):
+    """Raised when a fragment uses markup the streaming sanitizer doesn't reproduce exactly."""
+
+def _is_plain_codepoint(codepoint):
+    """Numeric references BeautifulSoup decodes to the same code point (no cp1252 remapping)."""
+    return codepoint in (9, 10, 13) or 32 <= codepoint < 127 or (160 <= codepoint <= 0x10FFFF and not 0xD800 <= codepoint <= 0xDFFF)
+
+def _has_only_simple_entities(html_fragment):
+    """
+    True if every '&' is a bare ampersand or a well-formed reference that BeautifulSoup
+    and html.unescape decode identically.
+    """
+    position = html_fragment.find('&')
+    while position != -1:
+        match = _AMPERSAND_RE.match(html_fragment, position)
+        if not match:
+            return False
+        hex_ref, decimal_ref, named_ref = match.groups()
+        if hex_ref and not _is_plain_codepoint(int(hex_ref, 16)):
+            return False
+        if decimal_ref and not _is_plain_codepoint(int(decimal_ref)):
+            return False
+        if named_ref and named_ref not in name2codepoint:
+            return False
+        position = html_fragment.find('&', position + 1)
+    return True
+
+def _escape_text(text):
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+def _format_attribute(name, value):
+    """Formats one attribute the way BeautifulSoup's minimal formatter does."""
+    if value is None:
+        value = ''
+    elif name in _LIST_ATTRIBUTES and value != ' '.join(value.split()):
+        raise _NeedsFullParse()
+    value = _escape_text(value)
+    quote = '"'
+    if '"' in value:
+        if "'" in value:
+            value = value.replace('"', '&quot;')
+        else:
+            quote = "'"
+    return f' {name}={quote}{value}{quote}'
+
+class _AnchorStripper(HTMLParser):
+    """
+    Single-pass re-serializer mirroring BeautifulSoup's html.parser tree builder:
+    unmatched end tags are dropped, an end tag closes every tag opened after its
+    match, unclosed tags are closed at the end, whitespace-only text runs between
+    tags collapse to a single space or newline, and <a> tags are left out while
+    their contents are kept.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.parts = []
+        self.open_tags = []
+        self.pending_text = []
+        self.closed_void_tags = []
+
+    def _flush_text(self):
+        if not self.pending_text:
+            return
+        text = ''.join(self.pending_text)
+        self.pending_text = []
+        if not text.strip(_ASCII_SPACES):
+            text = '\n' if '\n' in text else ' '
+        self.parts.append(_escape_text(text))
+
+    def _start_tag(self, tag, attrs):
+        if tag in _FULL_PARSE_TAGS:
+            raise _NeedsFullParse()
+        self._flush_text()
+        if tag == 'a':
+            return
+        attributes = dict(attrs) # Duplicate attributes: the last one wins
+        formatted = ''.join(_format_attribute(name, attributes[name]) for name in sorted(attributes))
+        self.parts.append(f'<{tag}{formatted}/>' if tag in _VOID_TAGS else f'<{tag}{formatted}>')
+
+    def handle_starttag(self, tag, attrs):
+        self._start_tag(tag, attrs)
+        if tag in _VOID_TAGS:
+            # A matching </br> etc. right after is swallowed without ending the text run
+            self.closed_void_tags.append(tag)
+        else:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self._start_tag(tag, attrs)
+        if tag not in _VOID_TAGS and tag != 'a':
+            self.parts.append(f'</{tag}>')
+
+    def handle_endtag(self, tag):
+        if tag in self.closed_void_tags:
+            self.closed_void_tags.remove(tag)
+            return
+        self._flush_text()
+        if tag not in self.open_tags:
+            return
+        while True:
+            open_tag = self.open_tags.pop()
+            if open_tag != 'a':
+                self.parts.append(f'</{open_tag}>')
+            if open_tag == tag:
+                return
+
+    def handle_data(self, data):
+        self.pending_text.append(data)
+
+    def handle_entityref(self, name):
+        self.pending_text.append(chr(name2codepoint[name]))
+
+    def handle_charref(self, name):
+        codepoint = int(name[1:], 16) if name[:1] in 'xX' else int(name)
+        self.pending_text.append(chr(codepoint))
+
+    def handle_comment(self, data):
+        raise _NeedsFullParse()
+
+    def handle_decl(self, decl):
+        raise _NeedsFullParse()
+
+    def handle_pi(self, data):
+        raise _NeedsFullParse()
+
+    def unknown_decl(self, data):
+        raise _NeedsFullParse()
+
+    def result(self):
+        self._flush_text()
+        for open_tag in reversed(self.open_tags):
+            if open_tag != 'a':
+                self.parts.append(f'</{open_tag}>')
+        self.open_tags = []
+        return ''.join(self.parts)
+
+def _strip_anchors_with_soup(html_fragment):
+    """Reference implementation: a full BeautifulSoup parse, used for rare markup."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html_fragment, 'html.parser')
+    for a_tag in soup.find_all('a'):
+        a_tag.unwrap() # Remove the <a> tag but keep its content
+    return str(soup).strip()
+
+def strip_anchors(html_fragment):
+    """
+    Removes <a> tags from an HTML fragment but keeps their content, returning exactly
+    what BeautifulSoup(html_fragment, 'html.parser') with every <a> unwrapped would
+    serialize to (stripped). Fragments without markup never reach a parser; everything
+    else is re-serialized in one streaming pass, and only comments, declarations,
+    <script>/<style> and unusual entities fall back to a full BeautifulSoup parse.
+    """
+    if '<' not in html_fragment and '&' not in html_fragment:
+        # Plain text: nothing to parse
+        return html_fragment.replace('>', '&gt;').strip()
+
+    if '&' in html_fragment and not _has_only_simple_entities(html_fragment):
+        return _strip_anchors_with_soup(html_fragment)
+
+    stripper = _AnchorStripper()
+    try:
+        stripper.feed(html_fragment)
+        stripper.close()
+    except _NeedsFullParse:
+        return _strip_anchors_with_soup(html_fragment)
+    return stripper.result().strip()
@@ -0,0 +1,26 @@
+class MonsterModel:
+    """
+    A monster as a converter extracts it from its source (a PF2e NPC document, a 5e dump
+    entry): only what its record and stat block are built from, read once into flat
+    attributes. Search facets are read from the source itself, before extraction, so a
+    monster the filter drops is never extracted. The raw source can be dropped as soon as
+    it is extracted, and __slots__ keeps each instance small and its attributes quick to read.
+    Each game system subclasses it with the fields its stat block needs. A field holds the
+    value with the default its reader has always applied, so an explicit null in the
+    source stays None just as it did when the readers took it from the raw source.
+    """
+
+    __slots__ = ('name', 'hp', 'total_hp', 'initiative_bonus', 'challenge')
+
+    version = None # The records' "version": the game system, set by each subclass
+
+    def record(self):
+        """The Initiative Tracker fields of the monster's record, without notes, stat block or search facets."""
+        return {
+            "name": self.name,
+            "hp": str(self.hp),
+            "totalHp": str(self.total_hp),
+            "initiativeBonus": self.initiative_bonus,
+            "version": self.version,
+            "challenge": str(self.challenge),
+        }
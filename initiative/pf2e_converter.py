@@ -1,23 +1,43 @@
 import json
 import argparse
+import bisect
+import fnmatch
+import functools
 import math
 import os
-import re
-from bs4 import BeautifulSoup
+import posixpath
+import time
+from converter_cache import DEFAULT_MEMO_SIZE, BoundedMemo, RenderCache, content_hash, source_signature
+from converter_dedup import DedupExportWriter, add_dedup_arguments
+from converter_delta import DeltaExportWriter, delta_path, hash_index_path, load_base_export
+from converter_index import SEARCH_FACETS_KEY, IndexedExportWriter, search_index_path
+from converter_input import SNIFF_HEAD_BYTES, SNIFF_TAIL_BYTES, iter_pack_lines, sniff_top_level_string
+from converter_output import (DEFAULT_SORT_RUN_SIZE, ExportWriter, ExternalSorter, JsonArrayWriter, NdjsonWriter, ShardedExportWriter, SmallestRecords,
+                              add_output_arguments, export_pointer_path, monster_sort_key, open_export_writer, resolve_output_format)
+from converter_parallel import DEFAULT_PREFETCH_DEPTH, parallel_map, prefetch_map
+from converter_profile import ConversionProfiler, add_profile_arguments, report_profile
+from converter_watch import DEFAULT_DEBOUNCE, DEFAULT_POLL_INTERVAL, iter_change_batches, open_watcher
+from foundry_enrichers import replace_enrichers
+from html_sanitizer import strip_anchors
+from monster_model import MonsterModel
+from statblock_renderer import STATBLOCK_SCHEMA_VERSION, render_statblock
+from statblock_styles import NotesCompactor
 
 # Removed: _get_ability_score_from_mod as it's no longer needed for pseudo D&D stats
 
-def _format_pf2_senses(senses_list):
-    """Formats PF2e senses list into a readable string."""
-    if not senses_list:
+# Line-delimited compendium packs (Foundry's NeDB .db files, or JSONL), read alongside loose .json files
+PACK_FILE_EXTENSIONS = ('.db', '.jsonl')
+
+# Modules whose code shapes the converted records; a change to any of them invalidates the render cache
+_RENDER_SOURCE_FILES = ('pf2e_converter.py', 'foundry_enrichers.py', 'html_sanitizer.py', 'monster_model.py', 'statblock_renderer.py')
+
+def _format_pf2_senses(senses):
+    """Formats PF2e (type, acuity, range) senses into a readable string."""
+    if not senses:
         return "None"
     
     formatted_senses = []
-    for sense in senses_list:
-        s_type = sense.get('type', 'unknown')
-        s_acuity = sense.get('acuity', '')
-        s_range = sense.get('range', '')
-
+    for s_type, s_acuity, s_range in senses:
         part = s_type.replace('-', ' ').title()
         if s_acuity:
             part = f"{s_acuity.title()} {part}"
@@ -27,13 +47,12 @@ def _format_pf2_senses(senses_list):
     return ", ".join(formatted_senses)
 
 def _format_pf2_dr_immunities(dr_list):
-    """Formats PF2e damage/resistance/immunity lists into a readable string."""
+    """Formats PF2e (type, value) damage/resistance/immunity lists into a readable string."""
     if not dr_list:
         return "None"
     formatted = []
-    for item in dr_list:
-        item_type = item.get('type', 'unknown').replace('-', ' ').title()
-        item_value = item.get('value', '')
+    for item_type, item_value in dr_list:
+        item_type = item_type.replace('-', ' ').title()
         formatted.append(f"{item_type} {item_value}" if item_value else item_type)
     return ", ".join(formatted)
 
@@ -57,30 +76,164 @@ def _get_action_cost_symbol(action_type, actions_value):
     return ''
 
 
-def _generate_header_html(monster_data):
-    """Generates the HTML for the monster header."""
-    name = monster_data.get('name', 'Unnamed Monster')
-    
+_PF2_SIZE_NAMES = {
+    'tiny': 'Tiny', 'sm': 'Small', 'med': 'Medium', 'lg': 'Large',
+    'huge': 'Huge', 'grg': 'Gargantuan'
+}
+
+_PF2_ABILITIES = ('str', 'dex', 'con', 'int', 'wis', 'cha') # PF2e uses abbreviations
+_PF2_SAVES = ('fortitude', 'reflex', 'will')
+
+_EQUIPMENT_TYPES = ('weapon', 'armor', 'consumable')
+
+class _NpcItem:
+    """
+    The fields of an item shown in a Traits, Strikes, Actions or Equipment block: those of
+    every item, then a strike's traits, bonus and damage rolls as (damage, damage type) or
+    a spell's level, time, range and target; the other types' fields are left unset. Each
+    is read as _block_entry always read it, defaults included.
+    """
+
+    __slots__ = ('type', 'name', 'action_type', 'actions', 'description',
+                 'traits', 'weapon_type', 'bonus', 'damage_rolls', # Strikes
+                 'level', 'time', 'range', 'target') # Spells
+
+    def __init__(self, item):
+        # One class branching on the type, like _block_entry: an NPC has dozens of items
+        system = item.get('system', {})
+        self.type = item_type = item.get('type')
+        self.name = item.get('name', 'Unknown')
+        self.action_type = system.get('actionType', {}).get('value')
+        self.actions = system.get('actions', {}).get('value')
+        if item_type in _EQUIPMENT_TYPES:
+            self.description = system.get('description', {}).get('value', '')
+            return
+        self.description = system.get('description', {}).get('value', 'No description.')
+        if item_type == 'melee': # Also covers ranged strikes disguised as 'melee' type
+            system = item['system']
+            damage_rolls = system.get('damageRolls', {})
+            self.traits = system['traits'].get('value', [])
+            self.weapon_type = system.get('weaponType', {}).get('value', 'melee')
+            self.bonus = system['bonus'].get('value', 'N/A')
+            self.damage_rolls = [(damage_rolls[d_key].get('damage', 'N/A'), damage_rolls[d_key].get('damageType', 'physical'))
+                                 for d_key in sorted(damage_rolls.keys())] if damage_rolls else []
+        elif item_type == 'spell':
+            system = item['system']
+            self.level = system['level'].get('value', '')
+            self.time = system['time'].get('value', '')
+            self.range = system['range'].get('value', '')
+            self.target = system['target'].get('value', '')
+
+def _spellcasting_spell(spell):
+    """
+    A spell cast from a spellcasting entry, as (sort key, fields of its stat block entry):
+    it is sorted by level and then name, and its entry is memoized by those fields.
+    """
+    system = spell['system']
+    fields = (str(spell.get('name', 'Unknown Spell')), str(system['level']['value']),
+              # Include time, range, target for spells if available
+              *((str(value) if value else '') for value in (system[key].get('value', '') for key in ('time', 'range', 'target'))),
+              system['description'].get('value', ''))
+    return (system['level'].get('value', 0), spell.get('name', '')), fields
+
+class Pf2eNpc(MonsterModel):
+    """
+    The fields of a Foundry PF2e NPC document (see MonsterModel). Its items are sorted into
+    the stat block's blocks as they are extracted: blocks maps traits, strikes, actions and
+    equipment to their _NpcItems, and spellcasting lists (name, spells) for each
+    spellcasting entry, its spells as _spellcasting_spell gives them.
+    """
+
+    __slots__ = ('perception', 'level', 'size', 'rarity', 'alignment', 'traits', 'creature_type', 'ac', 'ac_details', 'hp_max',
+                 'hp_details', 'speed', 'other_speeds', 'senses', 'ability_mods', 'saves', 'skills', 'languages_details', 'languages',
+                 'weaknesses', 'resistances', 'immunities', 'condition_immunities', 'blocks', 'spellcasting', 'public_notes')
+
+    version = "pf2e"
+
+    def __init__(self, monster_data):
+        system = monster_data['system']
+        traits, details, attributes, perception = system['traits'], system['details'], system['attributes'], system['perception']
+        hp, speed = attributes['hp'], attributes['speed']
+        level = details.get('level', {})
+
+        self.name = monster_data.get('name', 'Unnamed Monster')
+        self.hp = hp.get('value', 0)
+        self.total_hp = hp.get('max', self.hp) # Use value as fallback if max is not defined
+        # The perception modifier is also the initiative bonus
+        self.initiative_bonus = self.perception = perception.get('mod', 0)
+        self.challenge = level.get('value', 0) # The record's challenge is the level, defaulting to 0
+        self.level = level.get('value', 'N/A')
+
+        self.size = traits.get('size', {}).get('value', 'M')
+        self.rarity = traits.get('rarity', 'common')
+        self.alignment = details.get('alignment', {}).get('value')
+        self.traits = traits.get('value', [])
+        self.creature_type = details.get('creatureType', '')
+
+        self.ac = attributes['ac'].get('value', 'N/A')
+        self.ac_details = attributes['ac'].get('details', '')
+        self.hp_max = hp.get('max', 'N/A')
+        self.hp_details = hp.get('details', '') # Often contains hit dice
+        self.speed = speed.get('value', 'N/A')
+        self.other_speeds = [(s.get('type', 'unknown'), s.get('value', 'N/A')) for s in speed.get('otherSpeeds') or ()]
+        self.senses = [(sense.get('type', 'unknown'), sense.get('acuity', ''), sense.get('range', '')) for sense in perception.get('senses') or ()]
+
+        self.ability_mods = tuple(system['abilities'].get(stat_abbr, {}).get('mod') for stat_abbr in _PF2_ABILITIES)
+        self.saves = tuple(system['saves'].get(save_type, {}).get('value') for save_type in _PF2_SAVES)
+        self.skills = [(skill_name, skill_data.get('base')) for skill_name, skill_data in (system.get('skills') or {}).items()]
+        languages = details['languages']
+        self.languages_details = languages.get('details')
+        self.languages = languages.get('value', [])
+        self.weaknesses, self.resistances, self.immunities = (
+            [(entry.get('type', 'unknown'), entry.get('value', '')) for entry in attributes.get(key) or ()]
+            for key in ('weaknesses', 'resistances', 'immunities'))
+        self.condition_immunities = attributes.get('conditionImmunities', [])
+
+        # Separate items into categories for display
+        spellcasting_entries = {} # Key: spellcastingEntry._id, Value: (name, spells)
+        self.blocks = blocks = {"traits": [], "strikes": [], "actions": [], "equipment": []}
+        trait_items = blocks["traits"] # For passive abilities/traits not tied to PF2e 'action' type
+        for item in monster_data.get('items', []):
+            item_type = item.get('type')
+            if item_type == 'spellcastingEntry':
+                spellcasting_entries[item['_id']] = (item.get('name', 'Spellcasting'), [])
+            elif item_type == 'spell':
+                # Spells are associated with a spellcasting entry by system.location.value
+                location_id = item['system']['location'].get('value')
+                if location_id and location_id in spellcasting_entries:
+                    spellcasting_entries[location_id][1].append(_spellcasting_spell(item))
+                else:
+                    # If a spell has no associated entry, treat as a trait
+                    trait_items.append(_NpcItem(item))
+            elif item_type == 'melee': # PF2e uses 'melee' type for NPC strikes (both melee and ranged)
+                blocks["strikes"].append(_NpcItem(item))
+            elif item_type == 'action':
+                if item['system']['actionType'].get('value') == 'passive':
+                    trait_items.append(_NpcItem(item)) # Treat passive actions as traits
+                else:
+                    blocks["actions"].append(_NpcItem(item)) # Regular actions and reactions
+            elif item_type in _EQUIPMENT_TYPES:
+                blocks["equipment"].append(_NpcItem(item)) # New section for equipment
+        self.spellcasting = list(spellcasting_entries.values())
+        self.public_notes = details.get('publicNotes', '')
+
+def _meta_line(npc):
+    """The rarity, size, traits and alignment line under the monster's name."""
     # Size
-    size_trait = monster_data['system']['traits'].get('size', {}).get('value', 'M') # Get size safely
-    pf2_size_map = {
-        'tiny': 'Tiny', 'sm': 'Small', 'med': 'Medium', 'lg': 'Large',
-        'huge': 'Huge', 'grg': 'Gargantuan'
-    }
-    size_display = pf2_size_map.get(size_trait, 'Unknown')
+    size_display = _PF2_SIZE_NAMES.get(npc.size, 'Unknown')
 
     # Rarity
-    rarity = monster_data['system']['traits'].get('rarity', 'common')
+    rarity = npc.rarity
     rarity_display = rarity.title() if rarity != 'common' else ''
 
-    # Alignment (safe access and inference)
-    alignment_value = monster_data.get('system', {}).get('details', {}).get('alignment', {}).get('value')
+    # Alignment (given, or inferred)
+    alignment_value = npc.alignment
     
     if alignment_value:
         alignment_display = alignment_value.replace('-', ' ').title()
     else:
         # Infer alignment from traits.value
-        traits = monster_data['system']['traits'].get('value', [])
+        traits = npc.traits
         is_lawful = 'lawful' in traits
         is_chaotic = 'chaotic' in traits
         is_good = 'good' in traits
@@ -105,7 +258,7 @@ def _generate_header_html(monster_data):
 
 
     # Creature Type / Traits (now including all non-filtered traits)
-    all_traits = monster_data['system']['traits'].get('value', [])
+    all_traits = npc.traits
     
     # Define sets of known PF2e trait categories for filtering from the meta line
     pf2_alignment_traits = {'chaotic', 'evil', 'good', 'lawful', 'neutral', 'unaligned'}
@@ -121,7 +274,7 @@ def _generate_header_html(monster_data):
     meta_traits_list.append(size_display)
 
     # Add primary creature type from system.details.creatureType if present
-    main_creature_type_from_details = monster_data['system']['details'].get('creatureType', '').lower()
+    main_creature_type_from_details = npc.creature_type.lower()
     if main_creature_type_from_details and main_creature_type_from_details not in [p.lower() for p in meta_traits_list]:
         meta_traits_list.append(main_creature_type_from_details.title())
     
@@ -161,174 +314,97 @@ def _generate_header_html(monster_data):
     if not final_meta_string: # Final fallback
         final_meta_string = "Unaligned"
 
+    return final_meta_string
 
-    return f"""
-<div class="mon-stat-block__header" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; line-height: 1.1; background-color: rgb(255, 255, 255);">
-    <div class="mon-stat-block__name" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold; font-size: 34px; font-family: MrsEavesSmallCaps, Roboto, Helvetica, sans-serif; color: rgb(0, 0, 0);">
-        <span class="mon-stat-block__name-link" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; color: rgb(0, 0, 0); text-decoration: none;">{name}</span>
-    </div>
-    <div class="mon-stat-block__meta" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-style: italic; margin-bottom: 15px;">{final_meta_string}</div>
-</div>
-"""
-
-def _generate_attributes_html(monster_data):
-    """Generates the HTML for AC, HP, and Speed attributes."""
+def _attribute_fields(npc):
+    """AC, HP, Perception and Speed display strings."""
     
     # AC details
-    ac_value = monster_data['system']['attributes']['ac'].get('value', 'N/A')
-    ac_details = monster_data['system']['attributes']['ac'].get('details', '')
-    ac_display = f"{ac_value} ({ac_details})" if ac_details else str(ac_value)
+    ac_display = f"{npc.ac} ({npc.ac_details})" if npc.ac_details else str(npc.ac)
 
     # HP details
-    hp_max = monster_data['system']['attributes']['hp'].get('max', 'N/A')
-    hp_details = monster_data['system']['attributes']['hp'].get('details', '') # Often contains hit dice
-    hp_display = f"{hp_max} {hp_details}" if hp_details else str(hp_max)
+    hp_display = f"{npc.hp_max} {npc.hp_details}" if npc.hp_details else str(npc.hp_max)
 
     # Speed details
-    speed_value = monster_data['system']['attributes']['speed'].get('value', 'N/A')
-    other_speeds = []
-    if monster_data['system']['attributes']['speed'].get('otherSpeeds'):
-        for s in monster_data['system']['attributes']['speed']['otherSpeeds']:
-            s_type = s.get('type', 'unknown').replace('-', ' ')
-            s_value = s.get('value', 'N/A')
-            other_speeds.append(f"{s_type} {s_value} ft.")
+    other_speeds = [f"{s_type.replace('-', ' ')} {s_value} ft." for s_type, s_value in npc.other_speeds]
     
-    speed_display = f"{speed_value} ft."
+    speed_display = f"{npc.speed} ft."
     if other_speeds:
         speed_display += ", " + ", ".join(other_speeds)
 
     # Perception details
-    perception_mod = monster_data['system']['perception'].get('mod', 0)
-    perception_senses = _format_pf2_senses(monster_data['system']['perception'].get('senses', []))
+    perception_mod = npc.perception
+    perception_senses = _format_pf2_senses(npc.senses)
     perception_display = f"+{perception_mod}" if perception_mod >= 0 else str(perception_mod) # Format as +X or -X
     if perception_senses and perception_senses != "None":
         perception_display += f"; {perception_senses}"
 
+    return {"ac": ac_display, "hp": hp_display, "perception": perception_display, "speed": speed_display}
 
-    return f"""
-<div class="mon-stat-block__attributes" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; color: rgb(0, 0, 0); font-family: &quot;Scala Sans Offc&quot;, Roboto, Helvetica, sans-serif; font-size: 14px; font-variant-caps: normal; letter-spacing: normal;">
-    <div class="mon-stat-block__attribute" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(0, 0, 0); line-height: 1.2;">
-        <span class="mon-stat-block__attribute-label" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">Armor Class</span>&nbsp;<span class="mon-stat-block__attribute-value" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;"><span class="mon-stat-block__attribute-data-value" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{ac_display}&nbsp;</span></span>
-    </div>
-    <div class="mon-stat-block__attribute" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(0, 0, 0); line-height: 1.2;">
-        <span class="mon-stat-block__attribute-label" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">Hit Points</span>&nbsp;<span class="mon-stat-block__attribute-data" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;"><span class="mon-stat-block__attribute-data-value" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{hp_display}</span></span>
-    </div>
-    <div class="mon-stat-block__attribute" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(0, 0, 0); line-height: 1.2;">
-        <span class="mon-stat-block__attribute-label" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">Perception</span>&nbsp;<span class="mon-stat-block__attribute-data" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{perception_display}</span>
-    </div>
-    <div class="mon-stat-block__attribute" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(0, 0, 0); line-height: 1.2;">
-        <span class="mon-stat-block__attribute-label" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">Speed</span>&nbsp;<span class="mon-stat-block__attribute-data" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{speed_display}</span>
-    </div>
-</div>
-"""
-
-def _generate_ability_scores_html_for_main_block(monster_data):
-    """
-    Generates the HTML for the ability scores block using PF2e modifiers.
-    """
-    abilities_html = ""
-    ability_order = ['str', 'dex', 'con', 'int', 'wis', 'cha'] # PF2e uses abbreviations
-
-    for stat_abbr in ability_order:
-        mod = monster_data['system']['abilities'].get(stat_abbr, {}).get('mod')
+def _ability_modifiers(npc):
+    """[abbreviation, modifier text] for each ability, using PF2e modifiers."""
+    abilities = []
+
+    for stat_abbr, mod in zip(_PF2_ABILITIES, npc.ability_mods):
         mod_text = f"({'+' if mod >= 0 else ''}{mod})" if mod is not None else 'N/A' # Display only modifier
-        
-        abilities_html += f"""
-<div class="ability-block__stat ability-block__stat--{stat_abbr}" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; width: 59.1667px; padding: 5px 0px; text-align: center;">
-    <div class="ability-block__heading" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">{stat_abbr.upper()}</div>
-    <div class="ability-block__data" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;"><span class="ability-block__modifier" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{mod_text}</span></div>
-</div>"""
-    return abilities_html
+        abilities.append([stat_abbr.upper(), mod_text])
+    return abilities
 
 
-def _generate_tidbits_html(monster_data):
-    """Generates HTML for saving throws, skills, senses, languages, and CR/PB."""
-    tidbits_html = []
+def _tidbit_fields(npc):
+    """Saving throws, skills, languages, defenses and level; empty ones are left out."""
+    tidbits = {}
 
     # Saving Throws
     save_throws = []
     # PF2e saves are fortitude, reflex, will
-    for save_type in ['fortitude', 'reflex', 'will']:
-        save_value = monster_data['system']['saves'].get(save_type, {}).get('value')
+    for save_type, save_value in zip(_PF2_SAVES, npc.saves):
         if save_value is not None:
-            save_throws.append(f"{save_type.title()} {save_value}")
+            save_throws.append([save_type.title(), str(save_value)])
     if save_throws:
-        tidbits_html.append(f"""
-<div class="mon-stat-block__tidbit" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(0, 0, 0); line-height: 1.2;">
-    <span class="mon-stat-block__tidbit-label" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">Saving Throws</span>&nbsp;<span class="mon-stat-block__tidbit-data" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{', '.join(save_throws)}</span>
-</div>""")
+        tidbits["saves"] = save_throws
 
     # Skills
     skills_list = []
-    if monster_data['system'].get('skills'):
-        for skill_name, skill_data in monster_data['system']['skills'].items():
-            if skill_data.get('base') is not None:
-                skills_list.append(f"{skill_name.title()} {skill_data['base']}")
+    for skill_name, skill_base in npc.skills:
+        if skill_base is not None:
+            skills_list.append([skill_name.title(), str(skill_base)])
     if skills_list:
-        tidbits_html.append(f"""
-<div class="mon-stat-block__tidbit" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(0, 0, 0); line-height: 1.2;">
-    <span class="mon-stat-block__tidbit-label" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">Skills</span>&nbsp;<span class="mon-stat-block__tidbit-data" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{', '.join(skills_list)}</span>
-</div>""")
+        tidbits["skills"] = skills_list
 
     # Languages
-    languages_details = monster_data['system']['details']['languages'].get('details')
-    languages_value = monster_data['system']['details']['languages'].get('value', [])
-    if languages_details:
-        languages_display = languages_details
-    elif languages_value:
-        languages_display = ", ".join([lang.title() for lang in languages_value])
+    if npc.languages_details:
+        languages_display = npc.languages_details
+    elif npc.languages:
+        languages_display = ", ".join([lang.title() for lang in npc.languages])
     else:
         languages_display = "None"
     
     if languages_display != "None":
-        tidbits_html.append(f"""
-<div class="mon-stat-block__tidbit" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(0, 0, 0); line-height: 1.2;">
-    <span class="mon-stat-block__tidbit-label" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">Languages</span>&nbsp;<span class="mon-stat-block__tidbit-data" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{languages_display}</span>
-</div>""")
+        tidbits["languages"] = str(languages_display)
 
     # Weaknesses, Resistances, Immunities (from system.attributes)
-    weaknesses = _format_pf2_dr_immunities(monster_data['system']['attributes'].get('weaknesses', []))
+    weaknesses = _format_pf2_dr_immunities(npc.weaknesses)
     if weaknesses != "None":
-        tidbits_html.append(f"""
-<div class="mon-stat-block__tidbit" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(0, 0, 0); line-height: 1.2;">
-    <span class="mon-stat-block__tidbit-label" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">Weaknesses</span>&nbsp;<span class="mon-stat-block__tidbit-data" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{weaknesses}</span>
-</div>""")
+        tidbits["weaknesses"] = weaknesses
     
-    resistances = _format_pf2_dr_immunities(monster_data['system']['attributes'].get('resistances', []))
+    resistances = _format_pf2_dr_immunities(npc.resistances)
     if resistances != "None":
-        tidbits_html.append(f"""
-<div class="mon-stat-block__tidbit" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(0, 0, 0); line-height: 1.2;">
-    <span class="mon-stat-block__tidbit-label" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">Resistances</span>&nbsp;<span class="mon-stat-block__tidbit-data" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{resistances}</span>
-</div>""")
+        tidbits["resistances"] = resistances
 
-    immunities = _format_pf2_dr_immunities(monster_data['system']['attributes'].get('immunities', []))
+    immunities = _format_pf2_dr_immunities(npc.immunities)
     if immunities != "None":
-        tidbits_html.append(f"""
-<div class="mon-stat-block__tidbit" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(0, 0, 0); line-height: 1.2;">
-    <span class="mon-stat-block__tidbit-label" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">Immunities</span>&nbsp;<span class="mon-stat-block__tidbit-data" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{immunities}</span>
-</div>""")
+        tidbits["immunities"] = immunities
         
-    condition_immunities_list = monster_data['system']['attributes'].get('conditionImmunities', [])
-    if condition_immunities_list:
-        condition_immunities_display = _format_pf2_condition_immunities(condition_immunities_list)
+    if npc.condition_immunities:
+        condition_immunities_display = _format_pf2_condition_immunities(npc.condition_immunities)
         if condition_immunities_display != "None":
-            tidbits_html.append(f"""
-<div class="mon-stat-block__tidbit" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(0, 0, 0); line-height: 1.2;">
-    <span class="mon-stat-block__tidbit-label" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">Condition Immunities</span>&nbsp;<span class="mon-stat-block__tidbit-data" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{condition_immunities_display}</span>
-</div>""")
+            tidbits["conditionImmunities"] = condition_immunities_display
 
     # Challenge Rating (Level in PF2e)
-    level = monster_data['system']['details'].get('level', {}).get('value', 'N/A')
-    
-    tidbits_html.append(f"""
-<div class="mon-stat-block__tidbit-container" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; display: flex;">
-    <div class="mon-stat-block__tidbit" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(0, 0, 0); line-height: 1.2;">
-        <span class="mon-stat-block__tidbit-label" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">Level</span>&nbsp;<span class="mon-stat-block__tidbit-data" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">{level}</span>
-    </div>
-</div>
-""")
+    tidbits["level"] = str(npc.level)
 
-    return "\n".join(tidbits_html)
+    return tidbits
 
 
 def _clean_description_html(description_value):
@@ -339,120 +415,148 @@ def _clean_description_html(description_value):
     if not description_value:
         return ""
     
-    # Pattern to capture UUIDs that have display text in curly braces
-    # e.g., @UUID[Compendium.pf2e.conditionitems.Item.Grabbed]{Grabbed} -> Grabbed
-    cleaned_desc = re.sub(r'@UUID\[[^\]]+\]\{([^}]+)\}', r'\1', description_value)
-    
-    # Pattern to capture UUIDs that don't have curly braces, taking the last part of the path
-    # e.g., @UUID[Compendium.pf2e.conditionitems.Item.Grabbed] -> Grabbed
-    # This regex is more specific: it looks for @UUID[...] and captures the segment after the last '.' or '/'
-    # Updated regex to handle different path separators if necessary, and ensure only the name is captured
-    cleaned_desc = re.sub(r'@UUID\[(?:[^\]]*[/\.])?([^\].]+?)\]', r'\1', cleaned_desc)
-
-
-    cleaned_desc = re.sub(r'@Check\[([^\]]+)\]', lambda m: f"Check ({m.group(1).replace('|', ' ').title()})", cleaned_desc)
-    cleaned_desc = re.sub(r'@Damage\[([^\]]+)\]', lambda m: f"{m.group(1).replace('[', ' ').replace(']', ' ')} damage", cleaned_desc)
-    cleaned_desc = re.sub(r'@Localize\[[^\]]+\]', '', cleaned_desc) # Remove localize tags
-    cleaned_desc = re.sub(r'\[\[/r ([^\]]+)\]\]', r'(\1)', cleaned_desc) # Replace [[/r 2d6]] with (2d6)
-    cleaned_desc = re.sub(r'\[\[/br (.*?)\]\]', r'(\1)', cleaned_desc) # Replace [[/br ...]] with (...)
+    # Resolve @UUID, @Check, @Damage, @Template, @Localize and inline rolls in one pass
+    # (see foundry_enrichers for the individual handlers)
+    cleaned_desc = replace_enrichers(description_value)
 
     # Replace newlines with <br> for HTML display
     cleaned_desc = cleaned_desc.replace('\n', '<br>')
 
-    # Use BeautifulSoup to parse and clean any remaining HTML tags or hrefs
-    soup = BeautifulSoup(cleaned_desc, 'html.parser')
-    for a_tag in soup.find_all('a'):
-        a_tag.unwrap() # Remove the <a> tag but keep its content
+    # Clean any remaining HTML tags or hrefs (<a> tags are dropped, their text kept)
+    return strip_anchors(cleaned_desc)
 
-    return str(soup).strip()
 
+# Shared by every monster converted in this process (each --jobs worker has its own)
+_DESCRIPTION_MEMO = BoundedMemo(DEFAULT_MEMO_SIZE)
+_SPELL_MEMO = BoundedMemo(DEFAULT_MEMO_SIZE)
 
-def _generate_description_block_html(heading_text, items):
-    """Generates HTML for special abilities, actions, or legendary actions."""
-    if not items:
-        return ""
+def set_memo_size(max_entries):
+    """Bounds the cleaned description and spell memos to max_entries each (0 turns them off)."""
+    _DESCRIPTION_MEMO.resize(max_entries)
+    _SPELL_MEMO.resize(max_entries)
 
-    content_html = ""
-    for item in items:
-        name = item.get('name', 'Unknown')
-        desc = item.get('system', {}).get('description', {}).get('value', 'No description.')
-        action_type = item.get('system', {}).get('actionType', {}).get('value')
-        actions_value = item.get('system', {}).get('actions', {}).get('value')
+def memo_summary():
+    return "\n".join((_DESCRIPTION_MEMO.summary("Description memo"), _SPELL_MEMO.summary("Spell memo")))
 
-        cleaned_desc = _clean_description_html(desc)
-        
-        # Add action cost symbol for actions/reactions/free actions
-        action_symbol = _get_action_cost_symbol(action_type, actions_value)
-        if action_symbol and action_symbol != '[P]': # Don't add symbol for passives here, they usually just have bold name
-            name_display = f"{name} {action_symbol}"
-        else:
-            name_display = name
+def _cleaned_description(description_value):
+    """_clean_description_html through the memo, keyed by the raw description text."""
+    return _DESCRIPTION_MEMO.get(description_value, _clean_description_html, description_value)
 
-        # PF2e specific formatting for Strikes (Melee/Ranged items)
-        if item.get('type') == 'melee': # Also covers ranged strikes disguised as 'melee' type
-            bonus = item['system']['bonus'].get('value', 'N/A')
-            damage_rolls = item['system'].get('damageRolls', {})
-            
-            damage_parts = []
-            for d_key in sorted(damage_rolls.keys()):
-                d_roll = damage_rolls[d_key]
-                damage = d_roll.get('damage', 'N/A')
-                d_type = d_roll.get('damageType', 'physical').title()
-                damage_parts.append(f"{damage} {d_type} damage")
-            
-            damage_display = ", ".join(damage_parts)
-            
-            # Extract reach from traits
-            reach_trait = next((t for t in item['system']['traits'].get('value', []) if 'reach-' in t), None)
-            reach_display = reach_trait.replace('reach-', 'reach ').replace('-', ' ') + "," if reach_trait else ""
-
-            # Extract thrown range from traits for ranged strikes
-            thrown_trait = next((t for t in item['system']['traits'].get('value', []) if 'thrown-' in t), None)
-            thrown_range_display = thrown_trait.replace('thrown-', 'range increment ') + ' ft.' if thrown_trait else ""
-
-            # Determine if it's a ranged or melee attack
-            weapon_type = item['system'].get('weaponType', {}).get('value', 'melee')
-            is_ranged_trait = any('range-' in t for t in item['system']['traits'].get('value', [])) or \
-                   any('thrown-' in t for t in item['system']['traits'].get('value', []))
-            attack_type_display = "Ranged Attack" if weapon_type == 'ranged' or is_ranged_trait else "Melee Attack"
-
-            strike_line = f"<strong style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;\">{name_display}.</strong> {attack_type_display}: +{bonus} to hit, "
-            if reach_display:
-                strike_line += f"{reach_display} "
-            if thrown_range_display:
-                strike_line += f"{thrown_range_display}, " # Add comma if there's a range
-            strike_line += "one target."
-
-            if damage_display:
-                strike_line += f" Hit: {damage_display}."
-            if cleaned_desc:
-                strike_line += f" {cleaned_desc}"
-            content_html += f"<p style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin-bottom: 10px;\">{strike_line}</p>"
-        elif item.get('type') == 'spell':
-            spell_level = item['system']['level'].get('value', '')
-            spell_time = item['system']['time'].get('value', '')
-            spell_range = item['system']['range'].get('value', '')
-            spell_target = item['system']['target'].get('value', '')
-            
-            spell_line = f"<strong style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;\">{name_display} (Level {spell_level}).</strong> {action_symbol} Cast: {spell_time}. Range: {spell_range}. Target: {spell_target}."
-            if cleaned_desc:
-                spell_line += f" {cleaned_desc}"
-            content_html += f"<p style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin-bottom: 10px;\">{spell_line}</p>"
-        elif item.get('type') in ['weapon', 'armor', 'consumable']:
-            # Handle equipment: name and description
-            item_desc = _clean_description_html(item.get('system', {}).get('description', {}).get('value', ''))
-            content_html += f"""<p style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin-bottom: 10px;"><strong style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">{name_display}.</strong>&nbsp;{item_desc}</p>"""
-        else: # For actions and general traits/abilities
-            content_html += f"""<p style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin-bottom: 10px;"><strong style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;">{name_display}.</strong>&nbsp;{cleaned_desc}</p>"""
-            
-    return f"""
-<div class="mon-stat-block__description-block" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">
-    <div class="mon-stat-block__description-block-heading" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; border-bottom-width: 1px; border-bottom-style: solid; border-bottom-color: rgb(0, 0, 0); color: rgb(0, 0, 0); font-size: 24px; line-height: 1.4; margin-top: 20px; margin-bottom: 15px;">{heading_text}</div>
-    <div class="mon-stat-block__description-block-content" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">
-        {content_html}
-    </div>
-</div>
-"""
+def _block_entry(item):
+    """
+    One item of a Traits, Strikes, Actions or Equipment block as stat block data:
+    a strike, a spell, or a named ability or piece of equipment.
+    """
+    name = item.name
+
+    # Add action cost symbol for actions/reactions/free actions
+    action_symbol = _get_action_cost_symbol(item.action_type, item.actions)
+    if action_symbol and action_symbol != '[P]': # Don't add symbol for passives here, they usually just have bold name
+        name_display = f"{name} {action_symbol}"
+    else:
+        name_display = str(name)
+    entry = {"name": name_display}
+
+    if item.type in _EQUIPMENT_TYPES:
+        # Handle equipment: name and description
+        item_desc = _cleaned_description(item.description)
+        if item_desc:
+            entry["text"] = item_desc
+        return entry
+
+    cleaned_desc = _cleaned_description(item.description)
+
+    # PF2e specific formatting for Strikes (Melee/Ranged items)
+    if item.type == 'melee': # Also covers ranged strikes disguised as 'melee' type
+        trait_values = item.traits
+
+        # Extract reach from traits
+        reach_trait = next((t for t in trait_values if 'reach-' in t), None)
+
+        # Extract thrown range from traits for ranged strikes
+        thrown_trait = next((t for t in trait_values if 'thrown-' in t), None)
+
+        # Determine if it's a ranged or melee attack
+        weapon_type = item.weapon_type
+        is_ranged_trait = any('range-' in t for t in trait_values) or any('thrown-' in t for t in trait_values)
+
+        entry.update(
+            kind="strike",
+            attack="Ranged Attack" if weapon_type == 'ranged' or is_ranged_trait else "Melee Attack",
+            bonus=str(item.bonus),
+        )
+        if reach_trait:
+            entry["reach"] = reach_trait.replace('reach-', 'reach ').replace('-', ' ')
+        if thrown_trait:
+            entry["range"] = thrown_trait.replace('thrown-', 'range increment ') + ' ft.'
+        if item.damage_rolls:
+            entry["damage"] = [[str(damage), damage_type.title()] for damage, damage_type in item.damage_rolls]
+    elif item.type == 'spell':
+        entry.update(
+            kind="spell",
+            level=str(item.level),
+            time=str(item.time),
+            range=str(item.range),
+            target=str(item.target),
+        )
+        if action_symbol:
+            entry["actions"] = action_symbol
+    if cleaned_desc:
+        entry["text"] = cleaned_desc
+    return entry
+
+def _spell_entry(fields):
+    """
+    One spell of a spellcasting entry, with whichever of cast/range/target it has, from its
+    fields (see _spellcasting_spell). NPCs embed their own copies of compendium spells, so
+    entries are memoized by content; each stat block gets its own copy of the memoized
+    entry, so changing one never changes another.
+    """
+    return dict(_SPELL_MEMO.get(fields, _build_spell_entry, *fields))
+
+def _build_spell_entry(name, level, time, range_, target, description_value):
+    entry = {"name": name, "level": level}
+    for key, value in (('time', time), ('range', range_), ('target', target)):
+        if value:
+            entry[key] = value
+    entry["text"] = _clean_description_html(description_value)
+    return entry
+
+def build_statblock(npc):
+    """
+    The stat block of an NPC (a Pf2eNpc) as structured data (see statblock_renderer.render_statblock),
+    with descriptions already cleaned. Every value that ends up in the notes is already a
+    display string, so the tracker can render the block without knowing the game rules.
+    Empty sections are left out.
+    """
+    statblock = {
+        "schema": STATBLOCK_SCHEMA_VERSION,
+        "system": "pf2e",
+        "name": str(npc.name),
+        "meta": _meta_line(npc),
+        **_attribute_fields(npc),
+        "abilities": _ability_modifiers(npc),
+        **_tidbit_fields(npc),
+    }
+
+    for key, items in npc.blocks.items():
+        if items:
+            statblock[key] = [_block_entry(item) for item in items]
+
+    spellcasting = []
+    for name, spells in npc.spellcasting:
+        # Sort spells by level and then name for consistent output
+        sorted_spells = sorted(spells, key=lambda spell: spell[0])
+        if sorted_spells:
+            spellcasting.append({"name": str(name), "spells": [_spell_entry(fields) for _, fields in sorted_spells]})
+    if spellcasting:
+        statblock["spellcasting"] = spellcasting
+
+    # Public Notes / Blurb - shown at the end
+    public_notes_content = npc.public_notes
+    if public_notes_content:
+        statblock["publicNotes"] = _cleaned_description(public_notes_content)
+    return statblock
 
 def format_monster_notes(monster_data):
     """
@@ -460,226 +564,919 @@ def format_monster_notes(monster_data):
     mimicking D&D Beyond stat block styling for the 'notes' field.
     All href links and PF2e UUIDs are removed.
     """
-    
-    # Public Notes / Blurb - will be moved to the end
-    public_notes_content = monster_data['system']['details'].get('publicNotes', '')
-    
-    header_html = _generate_header_html(monster_data)
-    attributes_html = _generate_attributes_html(monster_data)
-    ability_scores_html = _generate_ability_scores_html_for_main_block(monster_data)
-    tidbits_html = _generate_tidbits_html(monster_data)
-
-    # Separate items into categories for display
-    spellcasting_entries = {} # Key: spellcastingEntry._id, Value: {data, spells:[]}
-    actions = []
-    strikes = []
-    traits = [] # For passive abilities/traits not tied to PF2e 'action' type
-    equipment = [] # Weapons, Armor, Consumables
+    return render_statblock(build_statblock(Pf2eNpc(monster_data)))
 
+def _search_facets(monster_data):
+    """
+    What the search index files an NPC under: creature type, size, rarity, traits and the
+    damage types of its strikes and spells.
+    """
+    traits = monster_data['system']['traits']
+    facets = {}
+    creature_type = monster_data['system']['details'].get('creatureType', '')
+    if creature_type:
+        facets['type'] = [creature_type.lower()]
+    size = _PF2_SIZE_NAMES.get(traits.get('size', {}).get('value', 'M'))
+    if size:
+        facets['size'] = [size.lower()]
+    facets['rarity'] = [str(traits.get('rarity', 'common')).lower()]
+    trait_values = sorted({str(trait).lower() for trait in traits.get('value', [])})
+    if trait_values:
+        facets['traits'] = trait_values
+    damage = set()
     for item in monster_data.get('items', []):
-        if item.get('type') == 'spellcastingEntry':
-            spellcasting_entries[item['_id']] = {'data': item, 'spells': []}
-        elif item.get('type') == 'spell':
-            # Spells are associated with a spellcasting entry by system.location.value
-            location_id = item['system']['location'].get('value')
-            if location_id and location_id in spellcasting_entries:
-                spellcasting_entries[location_id]['spells'].append(item)
-            else:
-                # If a spell has no associated entry, treat as a trait
-                traits.append(item)
-        elif item.get('type') == 'melee': # PF2e uses 'melee' type for NPC strikes (both melee and ranged)
-            strikes.append(item)
-        elif item.get('type') == 'action':
-            if item['system']['actionType'].get('value') == 'passive':
-                traits.append(item) # Treat passive actions as traits
-            else:
-                actions.append(item) # Regular actions and reactions
-        elif item.get('type') in ['weapon', 'armor', 'consumable']:
-            equipment.append(item)
+        item_type = item.get('type')
+        if item_type == 'melee':
+            for roll in (item['system'].get('damageRolls') or {}).values():
+                damage.add(str(roll.get('damageType', '')).lower())
+        elif item_type == 'spell':
+            for roll in (item['system'].get('damage') or {}).values():
+                if isinstance(roll, dict):
+                    damage.add(str(roll.get('type', '')).lower())
+    damage.discard('')
+    if damage:
+        facets['damage'] = sorted(damage)
+    return facets
+
+class MonsterFilter:
+    """
+    The --min-level/--max-level/--trait/--rarity selection. It is checked against a level
+    and the search facets (see _search_facets), so the same test works on a parsed NPC,
+    before it is extracted, and on a converted record served from the render cache.
+    Every given trait must be present; any of the given rarities will do.
+    """
+
+    def __init__(self, min_level=None, max_level=None, traits=(), rarities=()):
+        self.min_level = min_level
+        self.max_level = max_level
+        self.traits = {trait.lower() for trait in traits}
+        self.rarities = {rarity.lower() for rarity in rarities}
+
+    def __bool__(self):
+        return self.min_level is not None or self.max_level is not None or bool(self.traits) or bool(self.rarities)
+
+    def matches(self, level, facets):
+        if self.min_level is not None or self.max_level is not None:
+            try:
+                level = float(level)
+            except (TypeError, ValueError):
+                return False
+            if (self.min_level is not None and level < self.min_level) or (self.max_level is not None and level > self.max_level):
+                return False
+        if self.traits and not self.traits.issubset(facets.get('traits', ())):
+            return False
+        if self.rarities and self.rarities.isdisjoint(facets.get('rarity', ())):
+            return False
+        return True
+
+    def matches_record(self, converted_monster):
+        return self.matches(converted_monster.get('challenge'), converted_monster.get(SEARCH_FACETS_KEY) or {})
+
+# What _extract_npc returns for an NPC that monster_filter rejects: unlike a document that
+# isn't an NPC, the render cache mustn't remember it as one, as other runs may want it
+_FILTERED_OUT = object()
+
+def _extract_npc(monster_data, filepath, monster_filter=None):
+    """
+    Checks if a loaded document is an 'npc' type and extracts it.
+    Returns (its Pf2eNpc, its search facets), None if it's not an 'npc' (or its name is
+    missing), or _FILTERED_OUT if it doesn't pass monster_filter, which is checked before
+    anything else is extracted.
+    """
+    # Omit entry if the name is missing
+    monster_name = monster_data.get('name')
+    if not monster_name:
+        print(f"Skipping {filepath}: monster name is missing.")
+        return None
 
+    # Check if it's an 'npc' type as specified
+    if monster_data.get('type') != 'npc':
+        # print(f"Skipping {filepath}: 'type' is not 'npc'.")
+        return None
 
-    traits_html = _generate_description_block_html("Traits", traits)
-    strikes_html = _generate_description_block_html("Strikes", strikes)
-    actions_html = _generate_description_block_html("Actions", actions)
-    equipment_html = _generate_description_block_html("Equipment", equipment) # New section for equipment
+    # HP and level are read ahead of the filter, so an NPC without them fails whether or not it is filtered out
+    monster_data['system']['attributes']['hp']
+    level = monster_data['system']['details'].get('level', {}).get('value', 0)
 
-    spellcasting_html = ""
-    for entry_id, entry_data in spellcasting_entries.items():
-        spell_list_html = ""
-        # Sort spells by level and then name for consistent output
-        sorted_spells = sorted(entry_data['spells'], key=lambda s: (s['system']['level'].get('value', 0), s.get('name', '')))
-        for spell in sorted_spells:
-            spell_desc = _clean_description_html(spell['system']['description'].get('value', ''))
-            # Include time, range, target for spells if available
-            spell_time = spell['system']['time'].get('value', '')
-            spell_range = spell['system']['range'].get('value', '')
-            spell_target = spell['system']['target'].get('value', '')
-            
-            spell_details = []
-            if spell_time: spell_details.append(f"Cast: {spell_time}")
-            if spell_range: spell_details.append(f"Range: {spell_range}")
-            if spell_target: spell_details.append(f"Target: {spell_target}")
-            
-            details_str = ", ".join(spell_details)
-            if details_str:
-                details_str = f" ({details_str})"
+    search_facets = _search_facets(monster_data)
+    if monster_filter and not monster_filter.matches(level, search_facets):
+        return _FILTERED_OUT
+    return Pf2eNpc(monster_data), search_facets
 
-            spell_list_html += f"<p style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin-bottom: 5px;\"><strong style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;\">{spell.get('name', 'Unknown Spell')} (Level {spell['system']['level']['value']}).</strong>{details_str} {spell_desc}</p>"
-        
-        if spell_list_html:
-            spellcasting_html += f"""
-<div class="mon-stat-block__description-block" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">
-    <div class="mon-stat-block__description-block-heading" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; border-bottom-width: 1px; border-bottom-color: rgb(0, 0, 0); color: rgb(0, 0, 0); font-size: 24px; line-height: 1.4; margin-top: 20px; margin-bottom: 15px;">{entry_data['data'].get('name', 'Spellcasting')}</div>
-    <div class="mon-stat-block__description-block-content" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">
-        {spell_list_html}
-    </div>
-</div>
-"""
-
-
-    # Combine all parts into the final HTML string, following the nested structure
-    full_notes_html = f"""
-<div class="mon-stat-block__header" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; line-height: 1.1; background-color: rgb(255, 255, 255);">
-    <div class="mon-stat-block__name" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;">
-        <div class="name" style="">
-            <h1 style="padding: 0px; letter-spacing: 1px; color: rgb(0, 0, 0); font-size: 1.6rem; line-height: 1; break-after: avoid;">
-                {header_html}
-                <hr style="border: none; border-top: 1px solid rgb(0, 0, 0); margin: 10px 0;">
-                {attributes_html}
-                <hr style="border: none; border-top: 1px solid rgb(0, 0, 0); margin: 10px 0;">
-                <div class="mon-stat-block__stat-block" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; color: rgb(0, 0, 0); font-size: 14px;">
-                    <hr style="border: none; border-top: 1px solid rgb(0, 0, 0); margin: 10px 0;">
-                    <div class="ability-block" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; display: flex; flex-wrap: wrap; margin: 0px; color: rgb(0, 0, 0);">
-                        {ability_scores_html}
-                    </div>
-                    <hr style="border: none; border-top: 1px solid rgb(0, 0, 0); margin: 10px 0;">
-                </div>
-                <div class="mon-stat-block__tidbits" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; color: rgb(0, 0, 0); font-size: 14px;">
-                    {tidbits_html}
-                </div>
-                <hr style="border: none; border-top: 1px solid rgb(0, 0, 0); margin: 10px 0;">
-                <div class="mon-stat-block__description-blocks" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin-top: 20px; color: rgb(0, 0, 0); font-size: 14px;">
-                    {traits_html}
-                    {strikes_html}
-                    {actions_html}
-                    {spellcasting_html}
-                    {equipment_html}
-                </div>
-                {'' if not public_notes_content else f'''
-                <hr style="border: none; border-top: 1px solid rgb(0, 0, 0); margin: 10px 0;">
-                <div class="public-notes" style="box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin-bottom: 15px; font-size: 12px; line-height: 1.5;">{_clean_description_html(public_notes_content)}</div>
-                '''}
-            </h1>
-        </div>
-    </div>
-</div>
-"""
-    return full_notes_html
-
-def _process_single_monster_file(filepath):
+def _load_npc(raw_bytes, filepath, monster_filter=None):
     """
-    Loads a single JSON file, checks if it's an 'npc' type, and converts it.
-    Returns the converted monster data or None if not an 'npc' or on error.
+    Parses a document and extracts it (see _extract_npc). The parsed document is only
+    referenced in here, so it is freed on return, before the stat block is built.
     """
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            monster_data = json.load(f)
-        
-        # Omit entry if the name is missing
-        monster_name = monster_data.get('name')
-        if not monster_name:
-            print(f"Skipping {filepath}: monster name is missing.")
-            return None
+    return _extract_npc(_load_monster_document(raw_bytes), filepath, monster_filter)
+
+def _convert_npc(npc, search_facets):
+    """Converts an extracted NPC, returning the converted monster data."""
+    converted_monster = npc.record()
+    converted_monster[SEARCH_FACETS_KEY] = search_facets
+    converted_monster["statblock"] = build_statblock(npc)
+    return converted_monster
 
-        # Check if it's an 'npc' type as specified
-        if monster_data.get('type') != 'npc':
-            # print(f"Skipping {filepath}: 'type' is not 'npc'.")
+class _PendingNpc:
+    """
+    An extracted NPC whose stat block isn't built yet. --limit-order name ranks the NPCs
+    it scans by name (see _selection_sort_key) and converts only those it keeps; the rest
+    never get a stat block. cache_entry is (source, stat_result, sha256) when the NPC came
+    from a render cache miss, for the cache to store it once it is converted.
+    """
+
+    __slots__ = ('source', 'npc', 'search_facets', 'cache_entry')
+
+    def __init__(self, source, npc, search_facets):
+        self.source = source
+        self.npc = npc
+        self.search_facets = search_facets
+        self.cache_entry = None
+
+    def convert(self, cache=None):
+        """Returns the converted monster (see _convert_npc), or None (after reporting) if that fails."""
+        try:
+            converted_monster = _convert_npc(self.npc, self.search_facets)
+        except Exception as e:
+            print(f"Warning: Failed to process file '{self.source}' due to: {e}")
             return None
+        if self.cache_entry:
+            cache.put(*self.cache_entry, converted_monster)
+        return converted_monster
 
-        # Extract PF2e specific HP
-        hp_value = monster_data['system']['attributes']['hp'].get('value', 0)
-        hp_max = monster_data['system']['attributes']['hp'].get('max', hp_value) # Use value as fallback if max is not defined
+def _selection_sort_key(candidate):
+    """monster_sort_key of a converted monster, or of the one a _PendingNpc will become."""
+    return candidate.npc.name.lower() if isinstance(candidate, _PendingNpc) else monster_sort_key(candidate)
 
-        # Get level for 'challenge' field, defaulting to 0.
-        level = monster_data['system']['details'].get('level', {}).get('value', 0)
-        
-        # Get perception mod for initiative bonus
-        initiative_bonus = monster_data['system']['perception'].get('mod', 0)
-
-        converted_monster = {
-            "name": monster_name,
-            "hp": str(hp_value),
-            "totalHp": str(hp_max),
-            "initiativeBonus": initiative_bonus,
-            "version": "pf2e", 
-            "challenge": str(level),
-            "notes": format_monster_notes(monster_data)
-        }
+def _convert_monster_document(monster_data, filepath, monster_filter=None):
+    """
+    Checks if a loaded document is an 'npc' type and converts it.
+    Returns the converted monster data or None if it's not an 'npc'
+    (or doesn't pass monster_filter, which is checked before the stat block is built).
+    """
+    extracted = _extract_npc(monster_data, filepath, monster_filter)
+    return _convert_npc(*extracted) if extracted not in (None, _FILTERED_OUT) else None
+
+def _with_rendered_notes(converted_monster):
+    """Returns a copy of a converted record with its stat block rendered to notes HTML."""
+    record = {key: value for key, value in converted_monster.items() if key != 'statblock'}
+    record["notes"] = render_statblock(converted_monster["statblock"])
+    return record
+
+def _finish_record(converted_monster, structured, compactor):
+    """Renders a converted record's notes (and compacts them) unless the export is structured."""
+    if structured:
         return converted_monster
+    converted_monster = _with_rendered_notes(converted_monster)
+    return compactor.compact(converted_monster) if compactor else converted_monster
 
-    except FileNotFoundError:
-        print(f"Error: File not found at {filepath}")
-        return None
+def _load_monster_document(raw_bytes):
+    return json.loads(raw_bytes.decode('utf-8'))
+
+def _is_other_document(head, tail):
+    """Whether the first and last bytes of a file show it to be a document other than an NPC (spell, item, feat...)."""
+    document_type = sniff_top_level_string(head, tail, 'type')
+    return document_type is not None and document_type != 'npc'
+
+def _process_monster_bytes(raw_bytes, filepath, monster_filter=None, sniffed=False, defer_statblock=False):
+    """
+    Parses and converts the raw contents of one monster file; other documents are
+    recognised from their first and last bytes and never parsed (sniffed means the
+    caller has already checked those). With defer_statblock an NPC is only extracted,
+    and comes back as a _PendingNpc.
+    Returns (converted monster data or None, status), status being 'converted' (None for
+    a document that isn't an NPC), 'filtered' (rejected by monster_filter) or 'failed'.
+    """
+    # A file that fits in the head costs about as much to parse as to sniff
+    if not sniffed and len(raw_bytes) > SNIFF_HEAD_BYTES and _is_other_document(raw_bytes[:SNIFF_HEAD_BYTES], raw_bytes[-SNIFF_TAIL_BYTES:]):
+        return None, 'converted'
+    try:
+        extracted = _load_npc(raw_bytes, filepath, monster_filter)
+        if extracted is _FILTERED_OUT:
+            return None, 'filtered'
+        if extracted is None:
+            return None, 'converted'
+        return (_PendingNpc(filepath, *extracted) if defer_statblock else _convert_npc(*extracted)), 'converted'
     except json.JSONDecodeError:
         print(f"Error: Could not decode JSON from {filepath}. Please ensure it's valid JSON.")
-        return None
+        return None, 'failed'
     except Exception as e:
         print(f"Warning: Failed to process file '{filepath}' due to: {e}")
         import traceback
         traceback.print_exc() # Print full traceback for debugging
+        return None, 'failed'
+
+def _read_monster_file(filepath, skip_other_documents=False):
+    """
+    Reads a monster file's raw bytes, or returns None (after reporting) if it can't be read.
+    With skip_other_documents, a file longer than SNIFF_HEAD_BYTES is read from both ends
+    first, and returns None without reading the rest if they show some other document.
+    """
+    try:
+        with open(filepath, 'rb') as f:
+            if not skip_other_documents:
+                return f.read()
+            head = f.read(SNIFF_HEAD_BYTES)
+            if len(head) < SNIFF_HEAD_BYTES:
+                return head # The whole file: parsing it is about as cheap as sniffing
+            f.seek(-SNIFF_TAIL_BYTES, os.SEEK_END)
+            tail = f.read()
+            if _is_other_document(head, tail):
+                return None
+            f.seek(len(head))
+            return head + f.read()
+    except FileNotFoundError:
+        print(f"Error: File not found at {filepath}")
+    except OSError as e:
+        print(f"Warning: Failed to process file '{filepath}' due to: {e}")
+    return None
+
+def _process_single_monster_file(filepath, monster_filter=None, defer_statblock=False):
+    """
+    Loads a single JSON file, checks if it's an 'npc' type, and converts it.
+    Returns the converted monster data (a _PendingNpc with defer_statblock) or None if not an 'npc' or on error.
+    """
+    raw_bytes = _read_monster_file(filepath, skip_other_documents=True)
+    if raw_bytes is None:
         return None
+    return _process_monster_bytes(raw_bytes, filepath, monster_filter, sniffed=True, defer_statblock=defer_statblock)[0]
 
-def convert_monster_data(input_directory_path, output_json_path, limit=None):
+def _process_monster_source(source, monster_filter=None, defer_statblock=False):
+    """
+    Worker entry point for a (source, raw bytes) pair from _iter_monster_sources.
+    Returns (source, converted monster or None).
+    """
+    source_name, raw_bytes = source
+    if raw_bytes is None:
+        return source_name, _process_single_monster_file(source_name, monster_filter, defer_statblock)
+    return source_name, _process_monster_bytes(raw_bytes, source_name, monster_filter, sniffed=True, defer_statblock=defer_statblock)[0]
+
+def _process_cached_monster_file(task, monster_filter=None, defer_statblock=False):
+    """
+    Worker entry point for cached runs. task is (source, stat_result, is_fresh, cached_hash, raw bytes),
+    the raw bytes being None for a loose file (which is read here) and the stat that of the file.
+    Returns (source, stat_result, status, sha256, converted monster or None), where status is
+    'fresh' (mtime/size unchanged, not read), 'unchanged' (same content hash, not re-rendered),
+    'converted', 'filtered' (parsed but rejected by monster_filter before it was converted)
+    or 'failed'.
+    """
+    source_name, stat_result, is_fresh, cached_hash, raw_bytes = task
+    if is_fresh:
+        return source_name, stat_result, 'fresh', cached_hash, None
+
+    if raw_bytes is None:
+        raw_bytes = _read_monster_file(source_name)
+    if raw_bytes is None:
+        return source_name, stat_result, 'failed', None, None
+    sha256 = content_hash(raw_bytes)
+    if sha256 == cached_hash:
+        return source_name, stat_result, 'unchanged', sha256, None
+
+    converted_monster, status = _process_monster_bytes(raw_bytes, source_name, monster_filter, defer_statblock=defer_statblock)
+    return source_name, stat_result, status, sha256, converted_monster
+
+def _prefetch_source(source):
+    """
+    Prefetch step for uncached runs: reads a loose file's bytes (dropping other documents,
+    see _read_monster_file) so the worker gets them with the source. None skips the source.
+    """
+    source_name, raw_bytes = source
+    if raw_bytes is not None:
+        return source
+    raw_bytes = _read_monster_file(source_name, skip_other_documents=True)
+    return (source_name, raw_bytes) if raw_bytes is not None else None
+
+def _prefetch_stat(monster_source):
+    """Prefetch step for cached runs: stats a loose file ahead of its cache lookup (pack documents are stat'ed per pack)."""
+    (_, raw_bytes), filepath = monster_source
+    if raw_bytes is not None:
+        return monster_source, None
+    try:
+        return monster_source, os.stat(filepath)
+    except OSError:
+        return monster_source, None
+
+def _prefetch_cached_task(task):
+    """Prefetch step for cached runs: reads the bytes of a loose file the cache can't answer for."""
+    source_name, stat_result, is_fresh, cached_hash, raw_bytes = task
+    if is_fresh or raw_bytes is not None:
+        return task
+    raw_bytes = _read_monster_file(source_name)
+    return (source_name, stat_result, is_fresh, cached_hash, raw_bytes) if raw_bytes is not None else task
+
+def _iter_cached_results(monster_sources, cache, jobs, monster_filter=None, prefetch=0, prefetch_depth=DEFAULT_PREFETCH_DEPTH,
+                         defer_statblocks=False):
+    """
+    Converts monster sources through the render cache, yielding (source, converted monster or None)
+    in walk order. Only new or changed files (or pack documents) are parsed and rendered.
+    monster_filter is checked on those before they are extracted, as without a cache, and
+    on the records served from the cache. An NPC it rejects isn't stored, so the cache
+    only ever holds complete conversions that serve runs with any filter. With
+    defer_statblocks, NPCs the cache can't answer for come back as _PendingNpcs, stored
+    in the cache only if they are converted.
+    With prefetch threads, loose files are stat'ed and (unless the cache is fresh for them)
+    read up to prefetch_depth sources ahead.
+    """
+    def cache_tasks():
+        stat_path = stat_result = None
+        for monster_source, loose_stat in prefetch_map(_prefetch_stat, monster_sources, prefetch, prefetch_depth):
+            (source_name, raw_bytes), filepath = monster_source
+            if raw_bytes is None:
+                stat_path, stat_result = filepath, loose_stat
+            elif filepath != stat_path: # Once per pack file, not per document
+                try:
+                    stat_path, stat_result = filepath, os.stat(filepath)
+                except OSError:
+                    stat_path, stat_result = filepath, None
+            if stat_result is None:
+                yield source_name, None, False, None, raw_bytes
+                continue
+            is_fresh, cached_hash = cache.lookup(source_name, stat_result)
+            yield source_name, stat_result, is_fresh, cached_hash, None if is_fresh else raw_bytes
+
+    tasks = prefetch_map(_prefetch_cached_task, cache_tasks(), prefetch, prefetch_depth) if prefetch else cache_tasks()
+    results = parallel_map(functools.partial(_process_cached_monster_file, monster_filter=monster_filter, defer_statblock=defer_statblocks),
+                           tasks, jobs, chunksize=8)
+    try:
+        for filepath, stat_result, status, sha256, converted_monster in results:
+            if status in ('fresh', 'unchanged'):
+                cache.record_hit(filepath, stat_result)
+                converted_monster = cache.get_record(filepath)
+                if converted_monster and monster_filter and not monster_filter.matches_record(converted_monster):
+                    converted_monster = None
+            elif status == 'converted' and isinstance(converted_monster, _PendingNpc):
+                cache.discard(filepath) # A miss; the new record is stored when it is converted
+                converted_monster.cache_entry = (filepath, stat_result, sha256)
+            elif status == 'converted':
+                cache.store(filepath, stat_result, sha256, converted_monster)
+            else: # 'failed' or 'filtered': any entry is for older content
+                cache.discard(filepath)
+            yield filepath, converted_monster
+    finally:
+        results.close()
+
+def _convert_sources(monster_sources, cache, jobs, monster_filter=None, prefetch=0, prefetch_depth=DEFAULT_PREFETCH_DEPTH,
+                     defer_statblocks=False):
+    """
+    Converts what _iter_monster_sources yields, through the render cache if there is one,
+    yielding (source, converted monster or None) in walk order so the progress log stays
+    in order. monster_filter is checked on each parsed document before it is extracted,
+    and on the records the cache serves. With defer_statblocks, NPCs that still need
+    converting are yielded as _PendingNpcs, to be converted (or not) by the caller.
+    """
+    if cache:
+        return _iter_cached_results(monster_sources, cache, jobs, monster_filter, prefetch, prefetch_depth, defer_statblocks)
+    sources = (source for source, _ in monster_sources)
+    if prefetch:
+        sources = (source for source in prefetch_map(_prefetch_source, sources, prefetch, prefetch_depth) if source)
+    return parallel_map(functools.partial(_process_monster_source, monster_filter=monster_filter, defer_statblock=defer_statblocks),
+                        sources, jobs, chunksize=8)
+
+def _matches_pack_globs(relative_path, pack_globs):
+    """Whether a '/'-separated path, or any directory it is inside, matches a --pack glob by name or by path."""
+    parts = relative_path.split('/')
+    candidates = parts + ['/'.join(parts[:i + 1]) for i in range(1, len(parts))]
+    return any(fnmatch.fnmatch(candidate, pattern) for pattern in pack_globs for candidate in candidates)
+
+def _in_packs(input_directory_path, directory, pack_globs):
+    """Whether a directory is, or is inside, one matching a --pack glob (by name or by path under the input directory)."""
+    return _matches_pack_globs(os.path.relpath(directory, input_directory_path).replace(os.sep, '/'), pack_globs)
+
+def _source_pack_path(source_name, input_path):
+    """
+    The '/'-separated path under input_path (a directory or zip archive) of the directory a
+    source's file is in, or of its pack file without the extension: what --pack globs match.
+    """
+    path = source_name
+    for separator in ('#', ':'):
+        pack_path = path.rpartition(separator)[0]
+        if pack_path.endswith(PACK_FILE_EXTENSIONS):
+            path = pack_path
+            break
+    relative_path = path[len(input_path):].lstrip('/' + os.sep).replace(os.sep, '/')
+    if relative_path.endswith(PACK_FILE_EXTENSIONS):
+        return posixpath.splitext(relative_path)[0]
+    return posixpath.dirname(relative_path)
+
+def _pack_preference(source_name, input_path, prefer_globs):
+    """Where a source's pack comes in the --prefer-pack globs (0 for the first), or after all of them if it matches none."""
+    pack_path = _source_pack_path(source_name, input_path)
+    return next((rank for rank, pattern in enumerate(prefer_globs) if _matches_pack_globs(pack_path, (pattern,))), len(prefer_globs))
+
+def _iter_monster_files(input_directory_path, pack_globs=(), extensions=('.json',)):
+    """
+    Yields the path of every file with one of the extensions under the input directory,
+    in os.walk order; with pack_globs, only those in matching directories (or pack files
+    whose name, without the extension, matches).
+    """
+    for root, _, files in os.walk(input_directory_path):
+        in_packs = not pack_globs or _in_packs(input_directory_path, root, pack_globs)
+        for filename in files:
+            if not filename.endswith(extensions):
+                continue
+            filepath = os.path.join(root, filename)
+            if in_packs or (filename.endswith(PACK_FILE_EXTENSIONS)
+                            and _in_packs(input_directory_path, os.path.splitext(filepath)[0], pack_globs)):
+                yield filepath
+
+def _may_be_npc(head, tail):
+    return not _is_other_document(head, tail)
+
+def _iter_pack_sources(pack, pack_name):
+    """Yields (source, raw bytes) for the live documents of a pack file, named after pack_name."""
+    for line_number, document_id, raw_bytes in iter_pack_lines(pack, _may_be_npc):
+        yield f"{pack_name}#{document_id}" if document_id is not None else f"{pack_name}:{line_number}", raw_bytes
+
+def _iter_archive_sources(archive_path, pack_globs=()):
+    """
+    Yields ((source, raw bytes), archive path) for the documents in a zip archive, like
+    _iter_monster_sources does for a directory. Members are read one after another in
+    the order they are stored, straight from the archive; nothing is extracted. Sources
+    are "<archive path>/<member name>", with "#<_id>" for pack documents.
+    """
+    import zipfile
+    with zipfile.ZipFile(archive_path) as archive:
+        for member in sorted(archive.infolist(), key=lambda info: info.header_offset):
+            member_name = member.filename
+            if member.is_dir() or not member_name.endswith(('.json',) + PACK_FILE_EXTENSIONS):
+                continue
+            is_pack = member_name.endswith(PACK_FILE_EXTENSIONS)
+            if pack_globs and not _matches_pack_globs(posixpath.dirname(member_name), pack_globs) \
+                    and not (is_pack and _matches_pack_globs(posixpath.splitext(member_name)[0], pack_globs)):
+                continue
+            source_name = f"{archive_path}/{member_name}"
+            try:
+                with archive.open(member) as f:
+                    if is_pack:
+                        for source in _iter_pack_sources(f, source_name):
+                            yield source, archive_path
+                        continue
+                    # A member has to be inflated to reach its tail, so read it whole and sniff that
+                    raw_bytes = f.read()
+            except (zipfile.BadZipFile, OSError) as e:
+                print(f"Warning: Failed to read '{source_name}' due to: {e}")
+                continue
+            if len(raw_bytes) > SNIFF_HEAD_BYTES and _is_other_document(raw_bytes[:SNIFF_HEAD_BYTES], raw_bytes[-SNIFF_TAIL_BYTES:]):
+                continue
+            yield (source_name, raw_bytes), archive_path
+
+def _is_archive(input_path):
+    if not os.path.isfile(input_path):
+        return False
+    import zipfile # Imported only for file inputs: it is slow to import and directories are the common case
+    return zipfile.is_zipfile(input_path)
+
+def _iter_monster_sources(input_path, pack_globs=()):
+    """
+    Yields ((source, raw bytes or None), file path) for every document to convert, in walk
+    order. A loose .json file is its own source, read by the worker (raw bytes None); each
+    live document of a pack file (see PACK_FILE_EXTENSIONS) is "<pack path>#<_id>" (or
+    ":<line number>" without a visible _id), streamed from the pack line by line.
+    input_path may also be a zip archive holding such a tree (see _iter_archive_sources).
+    """
+    if _is_archive(input_path):
+        yield from _iter_archive_sources(input_path, pack_globs)
+        return
+    for filepath in _iter_monster_files(input_path, pack_globs, ('.json',) + PACK_FILE_EXTENSIONS):
+        if not filepath.endswith(PACK_FILE_EXTENSIONS):
+            yield (filepath, None), filepath
+            continue
+        try:
+            for source in _iter_pack_sources(filepath, filepath):
+                yield source, filepath
+        except OSError as e:
+            print(f"Warning: Failed to read pack '{filepath}' due to: {e}")
+
+def _render_cache_signature():
+    """Hashes every source file that affects the rendered output, so code changes invalidate the cache."""
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    return source_signature(*(os.path.join(module_dir, filename) for filename in _RENDER_SOURCE_FILES))
+
+def _profiled_name(converted_monster):
+    return converted_monster.npc.name if isinstance(converted_monster, _PendingNpc) else converted_monster['name']
+
+def _describe_profiled_source(source, result):
+    converted_monster = result[1] if result else None
+    return (_profiled_name(converted_monster) if converted_monster else '(skipped)'), source[0]
+
+def _describe_profiled_cached_file(task, result):
+    converted_monster = result[4] if result else None
+    return (_profiled_name(converted_monster) if converted_monster else f"({result[2] if result else 'failed'})"), task[0]
+
+def _profile_targets():
+    """What --profile times, as (owner, {function name: stage}) pairs."""
+    return (
+        (globals(), {
+            '_process_monster_source': ('convert', _describe_profiled_source),
+            '_process_cached_monster_file': ('convert', _describe_profiled_cached_file),
+            '_iter_monster_files': 'scan',
+            '_iter_archive_sources': 'scan',
+            'iter_pack_lines': 'scan',
+            '_read_monster_file': 'read',
+            '_is_other_document': 'sniff',
+            '_load_monster_document': 'parse',
+            '_extract_npc': 'extract',
+            'build_statblock': 'statblock',
+            '_meta_line': 'header',
+            '_attribute_fields': 'attributes',
+            '_ability_modifiers': 'abilities',
+            '_tidbit_fields': 'tidbits',
+            '_block_entry': 'blocks',
+            '_spell_entry': 'spells',
+            '_cleaned_description': 'descriptions',
+            '_clean_description_html': 'clean',
+            '_with_rendered_notes': 'render',
+            '_search_facets': 'facets',
+        }),
+        (RenderCache, {'lookup': 'cache', 'get_record': 'cache', 'record_hit': 'cache', 'store': 'cache', 'put': 'cache', 'save': 'cache'}),
+        (NotesCompactor, {'compact': 'compact'}),
+        (ExternalSorter, {'add': 'sort', 'sorted': 'sort'}),
+        (JsonArrayWriter, {'write': 'write'}),
+        (NdjsonWriter, {'write': 'write'}),
+        (ExportWriter, {'close': 'write'}),
+        (ShardedExportWriter, {'write': 'write', 'close': 'write'}),
+        (IndexedExportWriter, {'write': 'index', 'close': 'index'}),
+        (DeltaExportWriter, {'write': 'delta', 'close': 'delta'}),
+        (DedupExportWriter, {'write': 'dedup', 'close': 'dedup'}),
+    )
+
+def convert_monster_data(input_directory_path, output_json_path, *, limit=None, jobs=1, cache_path=None, rebuild_cache=False,
+                         sort_run_size=DEFAULT_SORT_RUN_SIZE, compact=False, structured=False, profiler=None,
+                         memo_size=DEFAULT_MEMO_SIZE, output_format='json', compress=False, shard_by=None, search_index=False,
+                         monster_filter=None, pack_globs=(), limit_order='scan', prefetch=0, prefetch_depth=DEFAULT_PREFETCH_DEPTH, base_path=None,
+                         dedup=None, prefer_globs=()):
     """
     Walks through a directory, processes individual JSON files, and converts them.
-    Includes a limit to stop processing after a certain number of monsters.
+    Everything after output_json_path is an option, passed by keyword.
+    Compendium pack files (.db/.jsonl, one document per line) in the tree are streamed
+    document by document through the same conversion. The directory may also be a zip
+    archive (such as a system release), whose members are read in place.
+    Includes a limit to stop processing after a certain number of monsters. With limit_order
+    'scan' the scan stops at the limit, so which monsters make it depends on os.walk order;
+    with 'name' the whole tree is scanned, NPCs are only extracted, and the first by name
+    (then pack preference and relative path) are kept in a bounded heap; only those get
+    their stat block built and notes rendered (and, on a cache miss, stored in the cache).
+    With jobs > 1 the files are parsed and rendered by a process pool; results are
+    consumed in walk order, so the output is identical to the serial run.
+    With a cache_path, converted records are kept on disk between runs and only
+    new or changed files are re-rendered; rebuild_cache ignores the existing cache.
+    Converted monsters are sorted with bounded memory: at most sort_run_size of them
+    are held at once, the rest are spilled to sorted temporary runs and merged.
+    With compact, notes use the classes from statblock.css instead of inline styles.
+    With structured, records carry a "statblock" object instead of notes and the tracker
+    renders the HTML when a monster's notes are first opened. Converted records (and the
+    render cache) hold the stat block data, so one cache serves every output mode; the
+    notes are rendered from it just before sorting.
+    With a ConversionProfiler, the run is serial and timed per stage and per file.
+    With prefetch threads, loose files are read up to prefetch_depth files ahead of the
+    parsing and rendering, so waiting on slow (network) storage overlaps with the work.
+    Cleaned descriptions and spell entries are memoized by content, up to memo_size of
+    each per process; serial runs report the hit rates.
+    output_format and compress pick the export format (see converter_output.OUTPUT_FORMATS);
+    with shard_by, output_json_path is a directory that gets a sharded export.
+    With search_index, an inverted index for the tracker's search is written next to it,
+    and with a base_path (a previous export) the delta from it (see converter_delta).
+    Only files in directories matching pack_globs are read, and only NPCs passing
+    monster_filter are converted: the filter is checked on each parsed document before
+    it is extracted, and on the records the render cache serves (which stay complete for
+    other runs, as rejected NPCs are never stored).
+    With a dedup policy, identical copies of a monster (from several packs, say) are
+    dropped or linked as they are written; the first copy of each is kept, and among
+    monsters of the same name those from packs matching prefer_globs (in that order of
+    preference) are written first.
     """
-    if not os.path.isdir(input_directory_path):
-        print(f"Error: Input path '{input_directory_path}' is not a valid directory.")
+    if profiler:
+        if jobs != 1 or prefetch:
+            print("Note: --profile converts serially; --jobs and --prefetch are ignored.")
+        # Convert serially with the stage functions swapped for timed ones
+        with profiler.instrument(*_profile_targets()):
+            return convert_monster_data(input_directory_path, output_json_path, limit=limit, jobs=1, cache_path=cache_path,
+                                        rebuild_cache=rebuild_cache, sort_run_size=sort_run_size, compact=compact, structured=structured,
+                                        memo_size=memo_size, output_format=output_format, compress=compress, shard_by=shard_by,
+                                        search_index=search_index, monster_filter=monster_filter, pack_globs=pack_globs,
+                                        limit_order=limit_order, base_path=base_path, dedup=dedup, prefer_globs=prefer_globs)
+
+    if not os.path.isdir(input_directory_path) and not _is_archive(input_directory_path):
+        print(f"Error: Input path '{input_directory_path}' is not a valid directory or zip archive.")
+        return
+    # Read before anything is written, as the base is often the export about to be replaced
+    base = load_base_export(base_path) if base_path else None
+    if base_path and base is None:
         return
 
-    all_converted_monsters = []
+    # Before any worker starts, so forked workers inherit the limit
+    set_memo_size(memo_size)
+    sorter = ExternalSorter(run_size=sort_run_size)
+    if compact and structured:
+        print("Warning: --compact has no effect with --structured, which writes no notes HTML.")
+    compactor = NotesCompactor() if compact and not structured else None
+    selection = SmallestRecords(limit, key=_selection_sort_key) if limit is not None and limit_order == 'name' else None
     
     print(f"Scanning directory: {input_directory_path} for monster files...")
     
-    for root, _, files in os.walk(input_directory_path):
-        # Check limit before processing each dir
-        if limit is not None and len(all_converted_monsters) >= limit:
-            print(f"Limit of {limit} successfully converted monsters reached. Stopping scan.")
-            break # Break out of the os.walk loop
-        for filename in files:
-            # Check limit before processing each file
-            if limit is not None and len(all_converted_monsters) >= limit:
-                print(f"Limit of {limit} successfully converted monsters reached. Stopping scan.")
-                break # Break out of the current files loop
-            
-            if filename.endswith('.json'):
-                filepath = os.path.join(root, filename)                
-                converted_monster = _process_single_monster_file(filepath)
-                if converted_monster:
-                    print(f"Converted file: {filepath}")
-                    all_converted_monsters.append(converted_monster)
-
-    if not all_converted_monsters:
+    cache = RenderCache(cache_path, _render_cache_signature(), rebuild_cache) if cache_path else None
+    scan_complete = True
+
+    monster_sources = _iter_monster_sources(input_directory_path, pack_globs)
+    results = _convert_sources(monster_sources, cache, jobs, monster_filter, prefetch, prefetch_depth, defer_statblocks=selection is not None)
+    try:
+        for filepath, converted_monster in results:
+            if converted_monster:
+                print(f"Converted file: {filepath}")
+                preference = _pack_preference(filepath, input_directory_path, prefer_globs) if prefer_globs else 0
+                if selection:
+                    selection.add(converted_monster, (preference, os.path.relpath(filepath, input_directory_path).replace(os.sep, '/')))
+                    continue
+                sorter.add(_finish_record(converted_monster, structured, compactor), preference)
+                if limit is not None and sorter.count >= limit:
+                    print(f"Limit of {limit} successfully converted monsters reached. Stopping scan.")
+                    scan_complete = False
+                    break
+    finally:
+        results.close()
+
+    if selection:
+        print(f"Kept the first {len(selection.sorted())} of {selection.seen} converted monsters by name.")
+        for candidate in selection.sorted():
+            converted_monster = candidate.convert(cache) if isinstance(candidate, _PendingNpc) else candidate
+            if converted_monster:
+                sorter.add(_finish_record(converted_monster, structured, compactor))
+
+    if cache:
+        # Only prune entries for unseen files if the whole tree was scanned
+        cache.save(prune=scan_complete and not pack_globs)
+        print(cache.summary())
+
+    if not sorter.count:
         print("No 'npc' type monster files found or processed in the specified directory.")
+        sorter.cleanup()
         return
 
-    # Sort the monsters alphabetically by name before writing to file
-    all_converted_monsters.sort(key=lambda m: m.get('name', '').lower())
-
+    # Write the monsters alphabetically by name, merging the sorted runs straight into the file
     try:
-        with open(output_json_path, 'w', encoding='utf-8') as f:
-            json.dump(all_converted_monsters, f, indent=2, ensure_ascii=False)
-        print(f"Successfully converted {len(all_converted_monsters)} monsters to {output_json_path}")
+        writer = open_export_writer(output_json_path, output_format, compress, shard_by,
+                                    search_index_path(output_json_path, shard_by) if search_index else None, base, dedup)
+        try:
+            for converted_monster in sorter.sorted():
+                writer.write(converted_monster)
+        except BaseException:
+            writer.abort()
+            raise
+        writer.close()
+        print(f"Successfully converted {writer.count} monsters to {output_json_path}")
+        if compactor:
+            print(compactor.summary())
+        if jobs == 1:
+            print(memo_summary())
     except IOError as e:
+        sorter.cleanup()
         print(f"Error writing to output file {output_json_path}: {e}")
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Convert D&D monster data from a directory of JSON files to Initiative Tracker format.")
-    parser.add_argument("input_directory", type=str, help="Path to the input directory containing monster JSON files.")
+class _WatchedExport:
+    """
+    The converted monsters of a --watch session by source, with (sort key, pack
+    preference, source) entries kept sorted the way the export is. A changed loose file re-converts just itself and
+    a changed pack only its documents whose content hash changed; the order is patched
+    with bisect rather than re-sorted, and unchanged records keep their encoded JSON
+    from the previous write.
+    """
+
+    def __init__(self, input_directory_path, monster_filter, pack_globs, structured, compactor, prefer_globs=()):
+        self.input_directory_path = input_directory_path
+        self.monster_filter = monster_filter
+        self.pack_globs = pack_globs
+        self.prefer_globs = prefer_globs
+        self.structured = structured
+        self.compactor = compactor
+        self.records = {}
+        self.order = []
+        self.file_sources = {}
+        self.pack_hashes = {}
+        self.encoded = {}
+        self.encoded_format = None
+
+    def track(self, monster_sources):
+        """Passes _iter_monster_sources through, noting which file each source comes from."""
+        for (source_name, raw_bytes), filepath in monster_sources:
+            self.file_sources.setdefault(filepath, set()).add(source_name)
+            if raw_bytes is not None:
+                self.pack_hashes[source_name] = content_hash(raw_bytes)
+            yield (source_name, raw_bytes), filepath
+
+    def put(self, source_name, converted_monster):
+        self.remove(source_name)
+        if not converted_monster:
+            return
+        record = _finish_record(converted_monster, self.structured, self.compactor)
+        self.records[source_name] = record
+        bisect.insort(self.order, self._order_entry(source_name, record))
+
+    def remove(self, source_name):
+        self.encoded.pop(source_name, None)
+        record = self.records.pop(source_name, None)
+        if record is not None:
+            del self.order[bisect.bisect_left(self.order, self._order_entry(source_name, record))]
+
+    def _order_entry(self, source_name, record):
+        preference = _pack_preference(source_name, self.input_directory_path, self.prefer_globs) if self.prefer_globs else 0
+        return (monster_sort_key(record), preference, source_name)
+
+    def _wanted(self, filepath):
+        if not filepath.endswith(('.json',) + PACK_FILE_EXTENSIONS):
+            return False
+        return (not self.pack_globs or _in_packs(self.input_directory_path, os.path.dirname(filepath), self.pack_globs)
+                or (filepath.endswith(PACK_FILE_EXTENSIONS)
+                    and _in_packs(self.input_directory_path, os.path.splitext(filepath)[0], self.pack_globs)))
+
+    def update_file(self, filepath):
+        """Brings the monsters from one file (created, changed or deleted) up to date."""
+        old_sources = self.file_sources.pop(filepath, set())
+        sources = set()
+        if os.path.isfile(filepath) and self._wanted(filepath):
+            if filepath.endswith(PACK_FILE_EXTENSIONS):
+                try:
+                    for source_name, raw_bytes in _iter_pack_sources(filepath, filepath):
+                        sources.add(source_name)
+                        sha256 = content_hash(raw_bytes)
+                        if self.pack_hashes.get(source_name) != sha256:
+                            self.pack_hashes[source_name] = sha256
+                            self.put(*_process_monster_source((source_name, raw_bytes), self.monster_filter))
+                except OSError as e:
+                    print(f"Warning: Failed to read pack '{filepath}' due to: {e}")
+            else:
+                sources.add(filepath)
+                self.put(*_process_monster_source((filepath, None), self.monster_filter))
+        for source_name in old_sources - sources:
+            self.remove(source_name)
+            self.pack_hashes.pop(source_name, None)
+        if sources:
+            self.file_sources[filepath] = sources
+
+    def files_under(self, path):
+        """The known and present files at or under a changed path (a directory's files all count as changed)."""
+        prefix = path.rstrip(os.sep) + os.sep
+        files = {filepath for filepath in self.file_sources if filepath == path or filepath.startswith(prefix)}
+        if os.path.isdir(path):
+            files.update(_iter_monster_files(path, (), ('.json',) + PACK_FILE_EXTENSIONS))
+        else:
+            files.add(path)
+        return files
+
+    def write(self, output_json_path, output_format, compress, shard_by, index_path, limit=None, base=None, dedup=None):
+        if output_format != self.encoded_format:
+            self.encoded, self.encoded_format = {}, output_format
+        writer = open_export_writer(output_json_path, output_format, compress, shard_by, index_path, base, dedup)
+        try:
+            for *_, source_name in self.order[:limit]:
+                self.encoded[source_name] = writer.write(self.records[source_name], self.encoded.get(source_name))
+        except BaseException:
+            writer.abort()
+            raise
+        writer.close()
+        return writer.count
+
+def watch_monster_data(input_directory_path, output_json_path, *, limit=None, jobs=1, cache_path=None, rebuild_cache=False,
+                       compact=False, structured=False, memo_size=DEFAULT_MEMO_SIZE, output_format='json', compress=False,
+                       shard_by=None, search_index=False, monster_filter=None, pack_globs=(), prefetch=0,
+                       prefetch_depth=DEFAULT_PREFETCH_DEPTH, poll=False, poll_interval=DEFAULT_POLL_INTERVAL, debounce=DEFAULT_DEBOUNCE,
+                       base_path=None, dedup=None, prefer_globs=()):
+    """
+    Converts the directory like convert_monster_data, then keeps watching it: each time
+    files are created, changed or deleted (with inotify, or by polling), only those are
+    converted again, the in-memory sorted result is patched and the export rewritten
+    (atomically, as always). Changes are debounced so a burst of saves is one rewrite.
+    The startup scan goes through the render cache and the process pool; updates run in
+    this process. With a limit the first monsters by name are exported. With a base_path,
+    every rewrite also rewrites the delta from that (fixed) previous export. dedup and
+    prefer_globs deduplicate each rewrite as in convert_monster_data. Runs until
+    interrupted.
+    """
+    if not os.path.isdir(input_directory_path):
+        print(f"Error: --watch needs an input directory; '{input_directory_path}' is not one.")
+        return
+    base = load_base_export(base_path) if base_path else None
+    if base_path and base is None:
+        return
+    set_memo_size(memo_size)
+    if compact and structured:
+        print("Warning: --compact has no effect with --structured, which writes no notes HTML.")
+    compactor = NotesCompactor() if compact and not structured else None
+    index_path = search_index_path(output_json_path, shard_by) if search_index else None
+    export = _WatchedExport(input_directory_path, monster_filter, pack_globs, structured, compactor, prefer_globs)
+
+    # Our own output must not look like an input change
+    output_paths = {os.path.abspath(path) for path in (output_json_path, index_path, cache_path) if path}
+    if not shard_by:
+        output_paths.add(os.path.abspath(export_pointer_path(output_json_path)))
+    if base:
+        output_paths.update(os.path.abspath(path(output_json_path, shard_by)) for path in (delta_path, hash_index_path))
+    def is_output(path):
+        path = os.path.abspath(path)
+        return path in output_paths or (shard_by and path.startswith(os.path.abspath(output_json_path) + os.sep))
+
+    print(f"Scanning directory: {input_directory_path} for monster files...")
+    start = time.perf_counter()
+    watcher = open_watcher(input_directory_path, ('.json',) + PACK_FILE_EXTENSIONS, poll, poll_interval)
+    try:
+        cache = RenderCache(cache_path, _render_cache_signature(), rebuild_cache) if cache_path else None
+        monster_sources = export.track(source for source in _iter_monster_sources(input_directory_path, pack_globs)
+                                       if not is_output(source[1]))
+        results = _convert_sources(monster_sources, cache, jobs, monster_filter, prefetch, prefetch_depth)
+        try:
+            for source_name, converted_monster in results:
+                export.put(source_name, converted_monster)
+        finally:
+            results.close()
+        if cache:
+            cache.save(prune=not pack_globs)
+            print(cache.summary())
+        count = export.write(output_json_path, output_format, compress, shard_by, index_path, limit, base, dedup)
+        print(f"Converted {count} monsters to {output_json_path} in {time.perf_counter() - start:.2f}s; watching for changes (Ctrl+C to stop).")
+
+        for changed in iter_change_batches(watcher, debounce):
+            start = time.perf_counter()
+            if changed is None:
+                print("Too many changes to follow; rescanning everything.")
+                changed = set(export.file_sources) | {input_directory_path}
+            filepaths = set()
+            for path in changed:
+                filepaths.update(filepath for filepath in export.files_under(path) if not is_output(filepath))
+            if not filepaths:
+                continue
+            for filepath in sorted(filepaths):
+                export.update_file(filepath)
+            try:
+                count = export.write(output_json_path, output_format, compress, shard_by, index_path, limit, base, dedup)
+            except IOError as e:
+                print(f"Error writing to output file {output_json_path}: {e}")
+                continue
+            print(f"Updated {len(filepaths)} file(s); wrote {count} monsters in {time.perf_counter() - start:.2f}s.")
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+    finally:
+        watcher.close()
+
+def main(argv=None, prog=None):
+    """Command-line entry point; also run as `convert.py pf2e`."""
+    parser = argparse.ArgumentParser(prog=prog, description="Convert D&D monster data from a directory of JSON files to Initiative Tracker format.")
+    parser.add_argument("input_directory", type=str, help="Path to the input directory (or zip archive) containing monster JSON files and/or compendium packs (.db/.jsonl).")
     parser.add_argument("output_file", type=str, default="converted_monsters.json", help="Path for the output JSON file in Initiative Tracker format.")
     parser.add_argument("--limit", type=int, help="Limit the number of monsters to parse.")
+    parser.add_argument("--limit-order", choices=('scan', 'name'), default='scan', help="Which monsters --limit keeps: the first found "
+                                                                                       "(stops early; depends on the filesystem) or the first by name (scans everything, reproducible).")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of worker processes for parsing and rendering (0 = one per CPU).")
+    parser.add_argument("--cache-file", type=str, help="Path of the render cache (default: <output_file>.cache.sqlite).")
+    parser.add_argument("--no-cache", action="store_true", help="Don't read or write the render cache.")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore the existing render cache and re-render every file.")
+    parser.add_argument("--sort-run-size", type=int, default=DEFAULT_SORT_RUN_SIZE, help="Monsters held in memory before a sorted run is spilled to disk.")
+    parser.add_argument("--compact", action="store_true", help="Emit class-only notes markup styled by statblock.css.")
+    parser.add_argument("--structured", action="store_true", help="Emit structured stat block data instead of notes HTML; the tracker renders it on demand.")
+    parser.add_argument("--prefetch", type=int, default=0, help="Threads reading input files ahead of the conversion, for slow or network storage (0 = off).")
+    parser.add_argument("--prefetch-depth", type=int, default=DEFAULT_PREFETCH_DEPTH, help="With --prefetch, how many files may be read ahead (bounds the memory held).")
+    parser.add_argument("--memo-size", type=int, default=DEFAULT_MEMO_SIZE, help="Cleaned descriptions and spell entries memoized per process (0 = off).")
+    parser.add_argument("--min-level", type=int, help="Only convert NPCs of at least this level.")
+    parser.add_argument("--max-level", type=int, help="Only convert NPCs of at most this level.")
+    parser.add_argument("--trait", action="append", default=[], help="Only convert NPCs with this trait (repeat to require several).")
+    parser.add_argument("--rarity", action="append", default=[], choices=('common', 'uncommon', 'rare', 'unique'), help="Only convert NPCs of this rarity (repeat to allow several).")
+    parser.add_argument("--pack", action="append", default=[], help="Only read files in directories matching this glob, by name or path under input_directory (repeatable).")
+    parser.add_argument("--watch", action="store_true", help="Keep running and update the export whenever files under input_directory change.")
+    parser.add_argument("--poll", action="store_true", help="With --watch, poll for changes instead of using inotify.")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL, help="With --watch --poll (or without inotify), seconds between scans.")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE, help="With --watch, seconds without further changes before the export is rewritten.")
+    add_output_arguments(parser)
+    add_dedup_arguments(parser, packs=True)
+    add_profile_arguments(parser)
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
-    convert_monster_data(args.input_directory, args.output_file, args.limit)
+    output_format, compress = resolve_output_format(args.output_file, args.format, args.gzip)
+    if args.dedup == 'prefer' and not args.prefer_pack:
+        print("Note: --dedup prefer without --prefer-pack keeps the first copy of each monster, like --dedup first.")
+    if args.prefer_pack and not args.dedup:
+        print("Note: --prefer-pack has no effect without --dedup.")
+    prefer_globs = tuple(args.prefer_pack) if args.dedup else ()
+    monster_filter = MonsterFilter(args.min_level, args.max_level, args.trait, args.rarity)
+    cache_path = None if args.no_cache else (args.cache_file or f"{args.output_file}.cache.sqlite")
+    if args.watch:
+        if args.profile:
+            print("Note: --profile has no effect with --watch.")
+        watch_monster_data(args.input_directory, args.output_file, limit=args.limit, jobs=args.jobs, cache_path=cache_path,
+                           rebuild_cache=args.rebuild, compact=args.compact, structured=args.structured, memo_size=args.memo_size,
+                           output_format=output_format, compress=compress, shard_by=args.shard_by, search_index=args.search_index,
+                           monster_filter=monster_filter or None, pack_globs=args.pack, prefetch=args.prefetch,
+                           prefetch_depth=args.prefetch_depth, poll=args.poll, poll_interval=args.poll_interval,
+                           debounce=args.debounce, base_path=args.base, dedup=args.dedup, prefer_globs=prefer_globs)
+    else:
+        profiler = ConversionProfiler(args.profile_memory, args.profile_top) if args.profile else None
+        convert_monster_data(args.input_directory, args.output_file, limit=args.limit, jobs=args.jobs, cache_path=cache_path,
+                             rebuild_cache=args.rebuild, sort_run_size=args.sort_run_size, compact=args.compact,
+                             structured=args.structured, profiler=profiler, memo_size=args.memo_size, output_format=output_format,
+                             compress=compress, shard_by=args.shard_by, search_index=args.search_index,
+                             monster_filter=monster_filter or None, pack_globs=args.pack, limit_order=args.limit_order,
+                             prefetch=args.prefetch, prefetch_depth=args.prefetch_depth, base_path=args.base, dedup=args.dedup,
+                             prefer_globs=prefer_globs)
+        if profiler:
+            report_profile(profiler, args.profile_report or f"{args.output_file}.profile.json")
+
+if __name__ == "__main__":
+    main()
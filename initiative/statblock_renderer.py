@@ -0,0 +1,445 @@
+import argparse
+import json
+import os
+import string
+
+# Shared by almost every element of the D&D Beyond style stat block
+_BASE = "box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;"
+_TEXT_COLOR = "rgb(0, 0, 0)"
+
+def _make_theme(accent, font_size, **overrides):
+    """
+    Inline styles for one game system's stat block. accent colours the name, labels,
+    headings and rules; font_size is the body text size.
+    """
+    styles = {
+        'plain': _BASE,
+        'bold': f"{_BASE} font-weight: bold;",
+        'header': f"{_BASE} line-height: 1.1; background-color: rgb(255, 255, 255);",
+        'name': f"{_BASE} font-weight: bold; font-size: 34px; font-family: MrsEavesSmallCaps, Roboto, Helvetica, sans-serif; color: {accent};",
+        'name_link': f"{_BASE} color: {accent}; text-decoration: none;",
+        'meta': f"{_BASE} font-style: italic; margin-bottom: 15px;",
+        'body': f"{_BASE} color: {_TEXT_COLOR}; font-family: &quot;Scala Sans Offc&quot;, Roboto, Helvetica, sans-serif; font-size: {font_size}; font-variant-caps: normal; letter-spacing: normal;",
+        'line': f"{_BASE} margin: 5px 0px; color: {accent}; line-height: 1.2;",
+        'ability_block': f"{_BASE} display: flex; flex-wrap: wrap; margin: 0px; color: {accent};",
+        'ability_stat': f"{_BASE} width: 59.1667px; padding: 5px 0px; text-align: center;",
+        'ability_modifier': _BASE,
+        'tidbits': _BASE,
+        'tidbit_container': f"{_BASE} display: flex;",
+        'tidbit_spacer': f"{_BASE} width: 40px; min-width: 10px;",
+        'description_blocks': f"{_BASE} margin-top: 20px;",
+        'block_heading': f"{_BASE} border-bottom-width: 1px; border-bottom-style: solid; border-bottom-color: {accent}; color: {accent}; font-size: 24px; line-height: 1.4; margin-top: 20px; margin-bottom: 15px;",
+        'paragraph': f"{_BASE} margin-bottom: 10px;",
+        'separator_img': f"{_BASE} border-style: none; min-height: 10px;",
+    }
+    styles.update(overrides)
+    return styles
+
+# Per-system palettes: the red D&D Beyond 5e block and the black PF2e block
+THEMES = {
+    'dnd_5e': _make_theme('rgb(130, 32, 0)', '15px',
+        ability_modifier=f"{_BASE} margin-left: 2px;",
+    ),
+    'pf2e': _make_theme('rgb(0, 0, 0)', '14px',
+        tidbits=f"{_BASE} color: {_TEXT_COLOR}; font-size: 14px;",
+        stat_block=f"{_BASE} color: {_TEXT_COLOR}; font-size: 14px;",
+        description_blocks=f"{_BASE} margin-top: 20px; color: {_TEXT_COLOR}; font-size: 14px;",
+        # Spellcasting headings have always been drawn without the underline of the other sections
+        spellcasting_heading=f"{_BASE} border-bottom-width: 1px; border-bottom-color: rgb(0, 0, 0); color: rgb(0, 0, 0); font-size: 24px; line-height: 1.4; margin-top: 20px; margin-bottom: 15px;",
+        spell_paragraph=f"{_BASE} margin-bottom: 5px;",
+        title="padding: 0px; letter-spacing: 1px; color: rgb(0, 0, 0); font-size: 1.6rem; line-height: 1; break-after: avoid;",
+        rule="border: none; border-top: 1px solid rgb(0, 0, 0); margin: 10px 0;",
+        public_notes=f"{_BASE} margin-bottom: 15px; font-size: 12px; line-height: 1.5;",
+    ),
+}
+
+# Template text. {style.x} is filled from the theme when the templates are compiled,
+# {partial.x} with a snippet of the same system (itself a template without data
+# fields); the remaining fields are the data passed at render time.
+_PARTIALS = {
+    'dnd_5e': {
+        'separator': '<div class="mon-stat-block__separator" style="{style.plain}"><img class="mon-stat-block__separator-img" alt="" src="https://www.dndbeyond.com/file-attachments/0/579/stat-block-header-bar.svg" style="{style.separator_img}"></div>',
+    },
+    'pf2e': {
+        'rule': '<hr style="{style.rule}">',
+    },
+}
+
+# Fragments both systems share
+_TEMPLATES = {
+    'header': """
+<div class="mon-stat-block__header" style="{style.header}">
+    <div class="mon-stat-block__name" style="{style.name}">
+        <span class="mon-stat-block__name-link" style="{style.name_link}">{name}</span>
+    </div>
+    <div class="mon-stat-block__meta" style="{style.meta}">{meta}</div>
+</div>
+""",
+    'tidbit': """
+<div class="mon-stat-block__tidbit" style="{style.line}">
+    <span class="mon-stat-block__tidbit-label" style="{style.bold}">{label}</span>&nbsp;<span class="mon-stat-block__tidbit-data" style="{style.plain}">{data}</span>
+</div>""",
+    'description_block': """
+<div class="mon-stat-block__description-block" style="{style.plain}">
+    <div class="mon-stat-block__description-block-heading" style="{style.block_heading}">{heading}</div>
+    <div class="mon-stat-block__description-block-content" style="{style.plain}">
+        {content}
+    </div>
+</div>
+""",
+    # Ability and action paragraphs: "<strong>Name.</strong>&nbsp;description"
+    'named_paragraph': '<p style="{style.paragraph}"><strong style="{style.bold}">{name}.</strong>&nbsp;{text}</p>',
+    'named_italic_paragraph': '<p style="{style.paragraph}"><em style="{style.plain}"><strong style="{style.bold}">{name}.</strong></em>&nbsp;{text}</p>',
+    # Strike and spell lines: "<strong>Name.</strong> details"
+    'titled_paragraph': '<p style="{style.paragraph}"><strong style="{style.bold}">{name}.</strong> {text}</p>',
+}
+
+# Each system's page layout and the blocks whose fields differ between the systems
+_SYSTEM_TEMPLATES = {
+    'dnd_5e': {
+        'attributes': """
+<div class="mon-stat-block__attributes" style="{style.body}">
+    <div class="mon-stat-block__attribute" style="{style.line}">
+        <span class="mon-stat-block__attribute-label" style="{style.bold}">Armor Class</span>&nbsp;<span class="mon-stat-block__attribute-value" style="{style.plain}"><span class="mon-stat-block__attribute-data-value" style="{style.plain}">{armor_class}&nbsp;</span><span class="mon-stat-block__attribute-data-extra" style="{style.plain}"></span></span>
+    </div>
+    <div class="mon-stat-block__attribute" style="{style.line}">
+        <span class="mon-stat-block__attribute-label" style="{style.bold}">Hit Points</span>&nbsp;<span class="mon-stat-block__attribute-data" style="{style.plain}"><span class="mon-stat-block__attribute-data-value" style="{style.plain}">{hit_points}&nbsp;</span><span class="mon-stat-block__attribute-data-extra" style="{style.plain}">{hit_dice}</span></span>
+    </div>
+    <div class="mon-stat-block__attribute" style="{style.line}">
+        <span class="mon-stat-block__attribute-label" style="{style.bold}">Speed</span>&nbsp;<span class="mon-stat-block__attribute-data" style="{style.plain}">{speed}</span>
+    </div>
+</div>
+""",
+        'ability_stat': """
+<div class="ability-block__stat ability-block__stat--{key}" style="{style.ability_stat}">
+    <div class="ability-block__heading" style="{style.bold}">{heading}</div>
+    <div class="ability-block__data" style="{style.plain}"><span class="ability-block__score" style="{style.plain}">{score}</span>&nbsp;<span class="ability-block__modifier" style="{style.ability_modifier}">{modifier}</span></div>
+</div>""",
+        'challenge': """
+<div class="mon-stat-block__tidbit-container" style="{style.tidbit_container}">
+    <div class="mon-stat-block__tidbit" style="{style.line}">
+        <span class="mon-stat-block__tidbit-label" style="{style.bold}">Challenge</span>&nbsp;<span class="mon-stat-block__tidbit-data" style="{style.plain}">{challenge}</span>
+    </div>
+    <div class="mon-stat-block__tidbit-spacer" style="{style.tidbit_spacer}"></div>
+    <div class="mon-stat-block__tidbit" style="{style.line}">
+        <span class="mon-stat-block__tidbit-label" style="{style.bold}">Proficiency Bonus</span>&nbsp;<span class="mon-stat-block__tidbit-data" style="{style.plain}">{proficiency_bonus}</span>
+    </div>
+</div>
+""",
+        'layout': """
+<div class="mon-stat-block" style="{style.body}">
+    {header}
+    {partial.separator}
+    {attributes}
+    {partial.separator}
+    <div class="ability-block" style="{style.ability_block}">
+        {abilities}
+    </div>
+    {partial.separator}
+    <div class="mon-stat-block__tidbits" style="{style.tidbits}">
+        {tidbits}
+    </div>
+    {partial.separator}
+    <div class="mon-stat-block__description-blocks" style="{style.description_blocks}">
+        {traits}
+        {actions}
+        {legendary_actions}
+    </div>
+</div>
+""",
+    },
+    'pf2e': {
+        'attributes': """
+<div class="mon-stat-block__attributes" style="{style.body}">
+    <div class="mon-stat-block__attribute" style="{style.line}">
+        <span class="mon-stat-block__attribute-label" style="{style.bold}">Armor Class</span>&nbsp;<span class="mon-stat-block__attribute-value" style="{style.plain}"><span class="mon-stat-block__attribute-data-value" style="{style.plain}">{armor_class}&nbsp;</span></span>
+    </div>
+    <div class="mon-stat-block__attribute" style="{style.line}">
+        <span class="mon-stat-block__attribute-label" style="{style.bold}">Hit Points</span>&nbsp;<span class="mon-stat-block__attribute-data" style="{style.plain}"><span class="mon-stat-block__attribute-data-value" style="{style.plain}">{hit_points}</span></span>
+    </div>
+    <div class="mon-stat-block__attribute" style="{style.line}">
+        <span class="mon-stat-block__attribute-label" style="{style.bold}">Perception</span>&nbsp;<span class="mon-stat-block__attribute-data" style="{style.plain}">{perception}</span>
+    </div>
+    <div class="mon-stat-block__attribute" style="{style.line}">
+        <span class="mon-stat-block__attribute-label" style="{style.bold}">Speed</span>&nbsp;<span class="mon-stat-block__attribute-data" style="{style.plain}">{speed}</span>
+    </div>
+</div>
+""",
+        'ability_stat': """
+<div class="ability-block__stat ability-block__stat--{key}" style="{style.ability_stat}">
+    <div class="ability-block__heading" style="{style.bold}">{heading}</div>
+    <div class="ability-block__data" style="{style.plain}"><span class="ability-block__modifier" style="{style.ability_modifier}">{modifier}</span></div>
+</div>""",
+        'level': """
+<div class="mon-stat-block__tidbit-container" style="{style.tidbit_container}">
+    <div class="mon-stat-block__tidbit" style="{style.line}">
+        <span class="mon-stat-block__tidbit-label" style="{style.bold}">Level</span>&nbsp;<span class="mon-stat-block__tidbit-data" style="{style.plain}">{level}</span>
+    </div>
+</div>
+""",
+        'spellcasting_block': """
+<div class="mon-stat-block__description-block" style="{style.plain}">
+    <div class="mon-stat-block__description-block-heading" style="{style.spellcasting_heading}">{heading}</div>
+    <div class="mon-stat-block__description-block-content" style="{style.plain}">
+        {content}
+    </div>
+</div>
+""",
+        'spell_paragraph': '<p style="{style.spell_paragraph}"><strong style="{style.bold}">{name}.</strong>{text}</p>',
+        'public_notes': """
+                {partial.rule}
+                <div class="public-notes" style="{style.public_notes}">{notes}</div>
+                """,
+        'layout': """
+<div class="mon-stat-block__header" style="{style.header}">
+    <div class="mon-stat-block__name" style="{style.plain}">
+        <div class="name" style="">
+            <h1 style="{style.title}">
+                {header}
+                {partial.rule}
+                {attributes}
+                {partial.rule}
+                <div class="mon-stat-block__stat-block" style="{style.stat_block}">
+                    {partial.rule}
+                    <div class="ability-block" style="{style.ability_block}">
+                        {abilities}
+                    </div>
+                    {partial.rule}
+                </div>
+                <div class="mon-stat-block__tidbits" style="{style.tidbits}">
+                    {tidbits}
+                </div>
+                {partial.rule}
+                <div class="mon-stat-block__description-blocks" style="{style.description_blocks}">
+                    {traits}
+                    {strikes}
+                    {actions}
+                    {spellcasting}
+                    {equipment}
+                </div>
+                {public_notes}
+            </h1>
+        </div>
+    </div>
+</div>
+""",
+    },
+}
+
+_formatter = string.Formatter()
+
+def _resolve(template, styles, partials):
+    """
+    Splits a template into literal text and data fields, filling {style.x} and
+    {partial.x} from the theme. Returns (literals, fields) with one more literal than
+    fields.
+    """
+    literals = ['']
+    fields = []
+    for literal, field_name, format_spec, conversion in _formatter.parse(template):
+        literals[-1] += literal
+        if field_name is None:
+            continue
+        namespace, _, key = field_name.partition('.')
+        if namespace == 'style':
+            literals[-1] += styles[key]
+        elif namespace == 'partial':
+            literals[-1] += partials[key]
+        else:
+            if format_spec or conversion:
+                raise ValueError(f"Template field {{{field_name}}} can't take a conversion or format spec")
+            fields.append(field_name)
+            literals.append('')
+    return literals, fields
+
+def _compile(template, styles, partials):
+    """
+    Compiles a template for one theme. A template without data fields becomes a plain
+    string; otherwise the result is a function taking the fields as keyword arguments
+    that joins them with the markup between them, resolved once with the theme's
+    styles and partials (str.format would re-parse all of the markup on every call).
+    """
+    literals, fields = _resolve(template, styles, partials)
+    if not fields:
+        return literals[0]
+    first, rest = literals[0], list(zip(fields, literals[1:]))
+
+    def render(**values):
+        parts = [first]
+        for field, literal in rest:
+            parts.append(str(values[field]))
+            parts.append(literal)
+        return ''.join(parts)
+    return render
+
+class StatBlockRenderer:
+    """
+    One system's stat block templates, compiled once with its theme. Every template is
+    an attribute: a function of its data fields, e.g. renderer.tidbit(label=..., data=...).
+    Callers collect repeated fragments in a list and join it once.
+    """
+
+    def __init__(self, theme_name):
+        styles = THEMES[theme_name]
+        partials = {name: _compile(text, styles, {}) for name, text in _PARTIALS[theme_name].items()}
+        self.theme_name = theme_name
+        for name, text in {**_TEMPLATES, **_SYSTEM_TEMPLATES[theme_name]}.items():
+            setattr(self, name, _compile(text, styles, partials))
+
+# Compiled once at import
+RENDERERS = {theme_name: StatBlockRenderer(theme_name) for theme_name in THEMES}
+
+# Version of the structured stat block records written with --structured; bump it
+# whenever a field changes meaning so the tracker can tell old exports apart
+STATBLOCK_SCHEMA_VERSION = 1
+
+def _description_block(renderer, heading, paragraphs):
+    if not paragraphs:
+        return ""
+    return renderer.description_block(heading=heading, content=''.join(paragraphs))
+
+# Free-text tidbits shown as-is when present, in display order
+_DND_5E_TEXT_TIDBITS = (
+    ('senses', 'Senses'),
+    ('languages', 'Languages'),
+    ('damageVulnerabilities', 'Damage Vulnerabilities'),
+    ('damageResistances', 'Damage Resistances'),
+    ('damageImmunities', 'Damage Immunities'),
+    ('conditionImmunities', 'Condition Immunities'),
+)
+
+def _render_dnd_5e(statblock):
+    render = RENDERERS['dnd_5e']
+    tidbit = render.tidbit
+    tidbits = []
+    if statblock.get('saves'):
+        tidbits.append(tidbit(label="Saving Throws", data=', '.join(f"{ability} +{bonus}" for ability, bonus in statblock['saves'])))
+    if statblock.get('skills'):
+        tidbits.append(tidbit(label="Skills", data=', '.join(f"{skill} +{bonus}" for skill, bonus in statblock['skills'])))
+    for key, label in _DND_5E_TEXT_TIDBITS:
+        if statblock.get(key):
+            tidbits.append(tidbit(label=label, data=statblock[key]))
+    tidbits.append(render.challenge(challenge=f"{statblock['challenge']} ({statblock['xp']} XP)", proficiency_bonus=f"+{statblock['proficiencyBonus']}"))
+
+    return render.layout(
+        header=render.header(name=statblock['name'], meta=statblock['meta']),
+        attributes=render.attributes(armor_class=statblock['ac'], hit_points=statblock['hp'], hit_dice=statblock.get('hitDice', ''), speed=statblock['speed']),
+        abilities=''.join(render.ability_stat(key=ability.lower(), heading=ability, score=score, modifier=modifier)
+                          for ability, score, modifier in statblock['abilities']),
+        tidbits="\n".join(tidbits),
+        traits=_description_block(render, "Traits", [render.named_italic_paragraph(name=name, text=text) for name, text in statblock.get('traits', ())]),
+        actions=_description_block(render, "Actions", [render.named_paragraph(name=name, text=text) for name, text in statblock.get('actions', ())]),
+        legendary_actions=_description_block(render, "Legendary Actions", [render.named_paragraph(name=name, text=text) for name, text in statblock.get('legendaryActions', ())]),
+    )
+
+_PF2E_TEXT_TIDBITS = (
+    ('languages', 'Languages'),
+    ('weaknesses', 'Weaknesses'),
+    ('resistances', 'Resistances'),
+    ('immunities', 'Immunities'),
+    ('conditionImmunities', 'Condition Immunities'),
+)
+
+def _render_pf2e_entry(render, entry):
+    """One item of a PF2e block: a strike, a spell, or a named ability or piece of equipment."""
+    kind = entry.get('kind')
+    if kind == 'strike':
+        line = f"{entry['attack']}: +{entry['bonus']} to hit, "
+        if entry.get('reach'):
+            line += f"{entry['reach']}, "
+        if entry.get('range'):
+            line += f"{entry['range']}, "
+        line += "one target."
+        if entry.get('damage'):
+            line += f" Hit: {', '.join(f'{damage} {damage_type} damage' for damage, damage_type in entry['damage'])}."
+        if entry.get('text'):
+            line += f" {entry['text']}"
+        return render.titled_paragraph(name=entry['name'], text=line)
+    if kind == 'spell':
+        line = f"{entry.get('actions', '')} Cast: {entry['time']}. Range: {entry['range']}. Target: {entry['target']}."
+        if entry.get('text'):
+            line += f" {entry['text']}"
+        return render.titled_paragraph(name=f"{entry['name']} (Level {entry['level']})", text=line)
+    return render.named_paragraph(name=entry['name'], text=entry.get('text', ''))
+
+def _render_pf2e_spell(render, spell):
+    """One spell of a spellcasting entry, with whichever of cast/range/target it has."""
+    details = []
+    if spell.get('time'): details.append(f"Cast: {spell['time']}")
+    if spell.get('range'): details.append(f"Range: {spell['range']}")
+    if spell.get('target'): details.append(f"Target: {spell['target']}")
+    details_str = f" ({', '.join(details)})" if details else ''
+    return render.spell_paragraph(name=f"{spell['name']} (Level {spell['level']})", text=f"{details_str} {spell.get('text', '')}")
+
+def _render_pf2e(statblock):
+    render = RENDERERS['pf2e']
+    tidbit = render.tidbit
+    tidbits = []
+    if statblock.get('saves'):
+        tidbits.append(tidbit(label="Saving Throws", data=', '.join(f"{save} {value}" for save, value in statblock['saves'])))
+    if statblock.get('skills'):
+        tidbits.append(tidbit(label="Skills", data=', '.join(f"{skill} {value}" for skill, value in statblock['skills'])))
+    for key, label in _PF2E_TEXT_TIDBITS:
+        if statblock.get(key):
+            tidbits.append(tidbit(label=label, data=statblock[key]))
+    tidbits.append(render.level(level=statblock['level']))
+
+    def block(heading, key):
+        return _description_block(render, heading, [_render_pf2e_entry(render, entry) for entry in statblock.get(key, ())])
+
+    spellcasting = [render.spellcasting_block(heading=entry['name'], content=''.join(_render_pf2e_spell(render, spell) for spell in entry['spells']))
+                    for entry in statblock.get('spellcasting', ())]
+    return render.layout(
+        header=render.header(name=statblock['name'], meta=statblock['meta']),
+        attributes=render.attributes(armor_class=statblock['ac'], hit_points=statblock['hp'], perception=statblock['perception'], speed=statblock['speed']),
+        abilities=''.join(render.ability_stat(key=ability.lower(), heading=ability, modifier=modifier) for ability, modifier in statblock['abilities']),
+        tidbits="\n".join(tidbits),
+        traits=block("Traits", 'traits'),
+        strikes=block("Strikes", 'strikes'),
+        actions=block("Actions", 'actions'),
+        spellcasting=''.join(spellcasting),
+        equipment=block("Equipment", 'equipment'),
+        public_notes=render.public_notes(notes=statblock['publicNotes']) if 'publicNotes' in statblock else '',
+    )
+
+_SYSTEM_RENDER_FUNCTIONS = {
+    'dnd_5e': _render_dnd_5e,
+    'pf2e': _render_pf2e,
+}
+
+def render_statblock(statblock):
+    """Renders a structured stat block (as built by either converter) to the notes HTML."""
+    return _SYSTEM_RENDER_FUNCTIONS[statblock['system']](statblock)
+
+TEMPLATES_SCRIPT_FILENAME = 'statblock_templates.js'
+
+def templates_script():
+    """
+    The compiled templates of every theme as a script for the tracker, which renders
+    --structured records lazily with the same markup. Fields stay as {name} placeholders.
+    """
+    compiled = {}
+    for theme_name, styles in THEMES.items():
+        partials = {name: _compile(text, styles, {}) for name, text in _PARTIALS[theme_name].items()}
+        compiled[theme_name] = {}
+        for name, text in {**_TEMPLATES, **_SYSTEM_TEMPLATES[theme_name]}.items():
+            literals, fields = _resolve(text, styles, partials)
+            if any('{' in literal or '}' in literal for literal in literals):
+                raise ValueError(f"Template {theme_name}.{name} has literal braces, which the tracker can't tell from fields")
+            compiled[theme_name][name] = ''.join(literal + f"{{{field}}}" for literal, field in zip(literals, fields)) + literals[-1]
+    return ("// Generated by statblock_renderer.py for --structured converter output. Do not edit by hand.\n"
+            f"const STATBLOCK_SCHEMA_VERSION = {STATBLOCK_SCHEMA_VERSION};\n"
+            f"const STATBLOCK_TEMPLATES = {json.dumps(compiled, indent=2, ensure_ascii=False)};\n")
+
+def write_templates_script(output_path):
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(templates_script())
+    print(f"Wrote stat block templates to {output_path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write the stat block templates script the tracker uses to render structured records.")
+    parser.add_argument("output_file", type=str, nargs="?", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), TEMPLATES_SCRIPT_FILENAME), help="Path of the script to write.")
+
+    args = parser.parse_args()
+
+    write_templates_script(args.output_file)
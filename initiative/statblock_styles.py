@@ -0,0 +1,97 @@
+import argparse
+import hashlib
+import html
+import os
+import re
+
+from statblock_renderer import THEMES
+
+# Every inline style string the stat block themes emit. In compact mode each one is
+# replaced by a class named after a hash of the style, and statblock.css (generated from
+# this list) carries the declarations, so the tracker renders the notes exactly as before.
+# Styles missing from this list are simply left inline.
+STATBLOCK_STYLES = list(dict.fromkeys(style for theme in THEMES.values() for style in theme.values()))
+
+STYLESHEET_FILENAME = 'statblock.css'
+
+def style_class_name(style):
+    """Stable class name for an inline style string."""
+    return 'sb-' + hashlib.sha1(style.encode('utf-8')).hexdigest()[:8]
+
+_CLASS_BY_STYLE = {style: style_class_name(style) for style in STATBLOCK_STYLES}
+assert len(set(_CLASS_BY_STYLE.values())) == len(STATBLOCK_STYLES), "Stat block style class names collide"
+
+def stylesheet_css():
+    """The shared stylesheet for compact notes: one rule per known style."""
+    rules = [f".{class_name} {{ {html.unescape(style)} }}" for style, class_name in _CLASS_BY_STYLE.items()]
+    return "/* Generated by statblock_styles.py for --compact converter output. Do not edit by hand. */\n" + "\n".join(rules) + "\n"
+
+# A start tag, or a run of text between tags
+_TOKEN_RE = re.compile(r'(<[a-zA-Z][^>]*>)|([^<]+)')
+_STYLE_ATTR_RE = re.compile(r'\sstyle="([^"]*)"')
+_CLASS_ATTR_RE = re.compile(r'(\sclass=")([^"]*)(")')
+_WHITESPACE_RUN_RE = re.compile(r'[ \t\n\r\f]+')
+
+def _compact_tag(tag):
+    style_match = _STYLE_ATTR_RE.search(tag)
+    if not style_match:
+        return tag
+    style = style_match.group(1)
+    if style and style not in _CLASS_BY_STYLE:
+        return tag
+    tag = tag[:style_match.start()] + tag[style_match.end():]
+    if not style:
+        return tag # An empty style attribute does nothing
+    class_name = _CLASS_BY_STYLE[style]
+    if _CLASS_ATTR_RE.search(tag):
+        return _CLASS_ATTR_RE.sub(lambda m: f'{m.group(1)}{m.group(2)} {class_name}{m.group(3)}', tag, count=1)
+    return tag[:style_match.start()] + f' class="{class_name}"' + tag[style_match.start():]
+
+def _compact_token(match):
+    tag, text = match.groups()
+    if tag:
+        return _compact_tag(tag)
+    # Runs of whitespace render as a single space, so collapsing them doesn't change the layout
+    return _WHITESPACE_RUN_RE.sub(' ', text)
+
+def compact_notes_html(notes_html):
+    """
+    Swaps the known inline styles in a notes string for their stylesheet classes and
+    collapses whitespace runs in the text. Content with preformatted text is only restyled.
+    """
+    if '<pre' in notes_html or '<textarea' in notes_html:
+        return _TOKEN_RE.sub(lambda m: _compact_tag(m.group(1)) if m.group(1) else m.group(2), notes_html).strip()
+    return _TOKEN_RE.sub(_compact_token, notes_html).strip()
+
+class NotesCompactor:
+    """Compacts the notes of converted records and keeps before/after size totals."""
+
+    def __init__(self):
+        self.bytes_before = 0
+        self.bytes_after = 0
+
+    def compact(self, converted_monster):
+        """Returns a copy of the record with compact notes (the original record is left untouched)."""
+        notes = converted_monster.get('notes', '')
+        compact_notes = compact_notes_html(notes)
+        self.bytes_before += len(notes.encode('utf-8'))
+        self.bytes_after += len(compact_notes.encode('utf-8'))
+        return dict(converted_monster, notes=compact_notes)
+
+    def summary(self):
+        saved = 1 - self.bytes_after / self.bytes_before if self.bytes_before else 0
+        return (f"Compact notes: {self.bytes_before / 1024:.1f} KB -> {self.bytes_after / 1024:.1f} KB "
+                f"({saved:.0%} smaller); include {STYLESHEET_FILENAME} once in the tracker to style them.")
+
+def write_stylesheet(output_path):
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(stylesheet_css())
+    print(f"Wrote stat block stylesheet to {output_path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate the shared stylesheet used by --compact converter output.")
+    parser.add_argument("output_file", type=str, nargs="?", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), STYLESHEET_FILENAME), help="Where to write the stylesheet.")
+
+    args = parser.parse_args()
+
+    write_stylesheet(args.output_file)
@@ -0,0 +1,31 @@
+// Generated by statblock_renderer.py for --structured converter output. Do not edit by hand.
+const STATBLOCK_SCHEMA_VERSION = 1;
+const STATBLOCK_TEMPLATES = {
+  "dnd_5e": {
+    "header": "\n<div class=\"mon-stat-block__header\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; line-height: 1.1; background-color: rgb(255, 255, 255);\">\n    <div class=\"mon-stat-block__name\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold; font-size: 34px; font-family: MrsEavesSmallCaps, Roboto, Helvetica, sans-serif; color: rgb(130, 32, 0);\">\n        <span class=\"mon-stat-block__name-link\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; color: rgb(130, 32, 0); text-decoration: none;\">{name}</span>\n    </div>\n    <div class=\"mon-stat-block__meta\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-style: italic; margin-bottom: 15px;\">{meta}</div>\n</div>\n",
+    "tidbit": "\n<div class=\"mon-stat-block__tidbit\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(130, 32, 0); line-height: 1.2;\">\n    <span class=\"mon-stat-block__tidbit-label\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;\">{label}</span>&nbsp;<span class=\"mon-stat-block__tidbit-data\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\">{data}</span>\n</div>",
+    "description_block": "\n<div class=\"mon-stat-block__description-block\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\">\n    <div class=\"mon-stat-block__description-block-heading\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; border-bottom-width: 1px; border-bottom-style: solid; border-bottom-color: rgb(130, 32, 0); color: rgb(130, 32, 0); font-size: 24px; line-height: 1.4; margin-top: 20px; margin-bottom: 15px;\">{heading}</div>\n    <div class=\"mon-stat-block__description-block-content\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\">\n        {content}\n    </div>\n</div>\n",
+    "named_paragraph": "<p style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin-bottom: 10px;\"><strong style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;\">{name}.</strong>&nbsp;{text}</p>",
+    "named_italic_paragraph": "<p style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin-bottom: 10px;\"><em style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\"><strong style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;\">{name}.</strong></em>&nbsp;{text}</p>",
+    "titled_paragraph": "<p style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin-bottom: 10px;\"><strong style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;\">{name}.</strong> {text}</p>",
+    "attributes": "\n<div class=\"mon-stat-block__attributes\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; color: rgb(0, 0, 0); font-family: &quot;Scala Sans Offc&quot;, Roboto, Helvetica, sans-serif; font-size: 15px; font-variant-caps: normal; letter-spacing: normal;\">\n    <div class=\"mon-stat-block__attribute\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(130, 32, 0); line-height: 1.2;\">\n        <span class=\"mon-stat-block__attribute-label\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;\">Armor Class</span>&nbsp;<span class=\"mon-stat-block__attribute-value\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\"><span class=\"mon-stat-block__attribute-data-value\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\">{armor_class}&nbsp;</span><span class=\"mon-stat-block__attribute-data-extra\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\"></span></span>\n    </div>\n    <div class=\"mon-stat-block__attribute\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(130, 32, 0); line-height: 1.2;\">\n        <span class=\"mon-stat-block__attribute-label\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;\">Hit Points</span>&nbsp;<span class=\"mon-stat-block__attribute-data\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\"><span class=\"mon-stat-block__attribute-data-value\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\">{hit_points}&nbsp;</span><span class=\"mon-stat-block__attribute-data-extra\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\">{hit_dice}</span></span>\n    </div>\n    <div class=\"mon-stat-block__attribute\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(130, 32, 0); line-height: 1.2;\">\n        <span class=\"mon-stat-block__attribute-label\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;\">Speed</span>&nbsp;<span class=\"mon-stat-block__attribute-data\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\">{speed}</span>\n    </div>\n</div>\n",
+    "ability_stat": "\n<div class=\"ability-block__stat ability-block__stat--{key}\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; width: 59.1667px; padding: 5px 0px; text-align: center;\">\n    <div class=\"ability-block__heading\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;\">{heading}</div>\n    <div class=\"ability-block__data\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\"><span class=\"ability-block__score\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\">{score}</span>&nbsp;<span class=\"ability-block__modifier\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin-left: 2px;\">{modifier}</span></div>\n</div>",
+    "challenge": "\n<div class=\"mon-stat-block__tidbit-container\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; display: flex;\">\n    <div class=\"mon-stat-block__tidbit\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(130, 32, 0); line-height: 1.2;\">\n        <span class=\"mon-stat-block__tidbit-label\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;\">Challenge</span>&nbsp;<span class=\"mon-stat-block__tidbit-data\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\">{challenge}</span>\n    </div>\n    <div class=\"mon-stat-block__tidbit-spacer\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; width: 40px; min-width: 10px;\"></div>\n    <div class=\"mon-stat-block__tidbit\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(130, 32, 0); line-height: 1.2;\">\n        <span class=\"mon-stat-block__tidbit-label\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;\">Proficiency Bonus</span>&nbsp;<span class=\"mon-stat-block__tidbit-data\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\">{proficiency_bonus}</span>\n    </div>\n</div>\n",
+    "layout": "\n<div class=\"mon-stat-block\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; color: rgb(0, 0, 0); font-family: &quot;Scala Sans Offc&quot;, Roboto, Helvetica, sans-serif; font-size: 15px; font-variant-caps: normal; letter-spacing: normal;\">\n    {header}\n    <div class=\"mon-stat-block__separator\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\"><img class=\"mon-stat-block__separator-img\" alt=\"\" src=\"https://www.dndbeyond.com/file-attachments/0/579/stat-block-header-bar.svg\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; border-style: none; min-height: 10px;\"></div>\n    {attributes}\n    <div class=\"mon-stat-block__separator\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\"><img class=\"mon-stat-block__separator-img\" alt=\"\" src=\"https://www.dndbeyond.com/file-attachments/0/579/stat-block-header-bar.svg\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; border-style: none; min-height: 10px;\"></div>\n    <div class=\"ability-block\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; display: flex; flex-wrap: wrap; margin: 0px; color: rgb(130, 32, 0);\">\n        {abilities}\n    </div>\n    <div class=\"mon-stat-block__separator\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\"><img class=\"mon-stat-block__separator-img\" alt=\"\" src=\"https://www.dndbeyond.com/file-attachments/0/579/stat-block-header-bar.svg\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; border-style: none; min-height: 10px;\"></div>\n    <div class=\"mon-stat-block__tidbits\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\">\n        {tidbits}\n    </div>\n    <div class=\"mon-stat-block__separator\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\"><img class=\"mon-stat-block__separator-img\" alt=\"\" src=\"https://www.dndbeyond.com/file-attachments/0/579/stat-block-header-bar.svg\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; border-style: none; min-height: 10px;\"></div>\n    <div class=\"mon-stat-block__description-blocks\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin-top: 20px;\">\n        {traits}\n        {actions}\n        {legendary_actions}\n    </div>\n</div>\n"
+  },
+  "pf2e": {
+    "header": "\n<div class=\"mon-stat-block__header\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; line-height: 1.1; background-color: rgb(255, 255, 255);\">\n    <div class=\"mon-stat-block__name\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold; font-size: 34px; font-family: MrsEavesSmallCaps, Roboto, Helvetica, sans-serif; color: rgb(0, 0, 0);\">\n        <span class=\"mon-stat-block__name-link\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; color: rgb(0, 0, 0); text-decoration: none;\">{name}</span>\n    </div>\n    <div class=\"mon-stat-block__meta\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-style: italic; margin-bottom: 15px;\">{meta}</div>\n</div>\n",
+    "tidbit": "\n<div class=\"mon-stat-block__tidbit\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(0, 0, 0); line-height: 1.2;\">\n    <span class=\"mon-stat-block__tidbit-label\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;\">{label}</span>&nbsp;<span class=\"mon-stat-block__tidbit-data\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\">{data}</span>\n</div>",
+    "description_block": "\n<div class=\"mon-stat-block__description-block\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\">\n    <div class=\"mon-stat-block__description-block-heading\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; border-bottom-width: 1px; border-bottom-style: solid; border-bottom-color: rgb(0, 0, 0); color: rgb(0, 0, 0); font-size: 24px; line-height: 1.4; margin-top: 20px; margin-bottom: 15px;\">{heading}</div>\n    <div class=\"mon-stat-block__description-block-content\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\">\n        {content}\n    </div>\n</div>\n",
+    "named_paragraph": "<p style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin-bottom: 10px;\"><strong style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;\">{name}.</strong>&nbsp;{text}</p>",
+    "named_italic_paragraph": "<p style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin-bottom: 10px;\"><em style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\"><strong style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;\">{name}.</strong></em>&nbsp;{text}</p>",
+    "titled_paragraph": "<p style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin-bottom: 10px;\"><strong style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;\">{name}.</strong> {text}</p>",
+    "attributes": "\n<div class=\"mon-stat-block__attributes\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; color: rgb(0, 0, 0); font-family: &quot;Scala Sans Offc&quot;, Roboto, Helvetica, sans-serif; font-size: 14px; font-variant-caps: normal; letter-spacing: normal;\">\n    <div class=\"mon-stat-block__attribute\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(0, 0, 0); line-height: 1.2;\">\n        <span class=\"mon-stat-block__attribute-label\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;\">Armor Class</span>&nbsp;<span class=\"mon-stat-block__attribute-value\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\"><span class=\"mon-stat-block__attribute-data-value\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\">{armor_class}&nbsp;</span></span>\n    </div>\n    <div class=\"mon-stat-block__attribute\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(0, 0, 0); line-height: 1.2;\">\n        <span class=\"mon-stat-block__attribute-label\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;\">Hit Points</span>&nbsp;<span class=\"mon-stat-block__attribute-data\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\"><span class=\"mon-stat-block__attribute-data-value\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\">{hit_points}</span></span>\n    </div>\n    <div class=\"mon-stat-block__attribute\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(0, 0, 0); line-height: 1.2;\">\n        <span class=\"mon-stat-block__attribute-label\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;\">Perception</span>&nbsp;<span class=\"mon-stat-block__attribute-data\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\">{perception}</span>\n    </div>\n    <div class=\"mon-stat-block__attribute\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(0, 0, 0); line-height: 1.2;\">\n        <span class=\"mon-stat-block__attribute-label\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;\">Speed</span>&nbsp;<span class=\"mon-stat-block__attribute-data\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\">{speed}</span>\n    </div>\n</div>\n",
+    "ability_stat": "\n<div class=\"ability-block__stat ability-block__stat--{key}\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; width: 59.1667px; padding: 5px 0px; text-align: center;\">\n    <div class=\"ability-block__heading\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;\">{heading}</div>\n    <div class=\"ability-block__data\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\"><span class=\"ability-block__modifier\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\">{modifier}</span></div>\n</div>",
+    "level": "\n<div class=\"mon-stat-block__tidbit-container\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; display: flex;\">\n    <div class=\"mon-stat-block__tidbit\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin: 5px 0px; color: rgb(0, 0, 0); line-height: 1.2;\">\n        <span class=\"mon-stat-block__tidbit-label\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;\">Level</span>&nbsp;<span class=\"mon-stat-block__tidbit-data\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\">{level}</span>\n    </div>\n</div>\n",
+    "spellcasting_block": "\n<div class=\"mon-stat-block__description-block\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\">\n    <div class=\"mon-stat-block__description-block-heading\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; border-bottom-width: 1px; border-bottom-color: rgb(0, 0, 0); color: rgb(0, 0, 0); font-size: 24px; line-height: 1.4; margin-top: 20px; margin-bottom: 15px;\">{heading}</div>\n    <div class=\"mon-stat-block__description-block-content\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\">\n        {content}\n    </div>\n</div>\n",
+    "spell_paragraph": "<p style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin-bottom: 5px;\"><strong style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; font-weight: bold;\">{name}.</strong>{text}</p>",
+    "public_notes": "\n                <hr style=\"border: none; border-top: 1px solid rgb(0, 0, 0); margin: 10px 0;\">\n                <div class=\"public-notes\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin-bottom: 15px; font-size: 12px; line-height: 1.5;\">{notes}</div>\n                ",
+    "layout": "\n<div class=\"mon-stat-block__header\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; line-height: 1.1; background-color: rgb(255, 255, 255);\">\n    <div class=\"mon-stat-block__name\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px;\">\n        <div class=\"name\" style=\"\">\n            <h1 style=\"padding: 0px; letter-spacing: 1px; color: rgb(0, 0, 0); font-size: 1.6rem; line-height: 1; break-after: avoid;\">\n                {header}\n                <hr style=\"border: none; border-top: 1px solid rgb(0, 0, 0); margin: 10px 0;\">\n                {attributes}\n                <hr style=\"border: none; border-top: 1px solid rgb(0, 0, 0); margin: 10px 0;\">\n                <div class=\"mon-stat-block__stat-block\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; color: rgb(0, 0, 0); font-size: 14px;\">\n                    <hr style=\"border: none; border-top: 1px solid rgb(0, 0, 0); margin: 10px 0;\">\n                    <div class=\"ability-block\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; display: flex; flex-wrap: wrap; margin: 0px; color: rgb(0, 0, 0);\">\n                        {abilities}\n                    </div>\n                    <hr style=\"border: none; border-top: 1px solid rgb(0, 0, 0); margin: 10px 0;\">\n                </div>\n                <div class=\"mon-stat-block__tidbits\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; color: rgb(0, 0, 0); font-size: 14px;\">\n                    {tidbits}\n                </div>\n                <hr style=\"border: none; border-top: 1px solid rgb(0, 0, 0); margin: 10px 0;\">\n                <div class=\"mon-stat-block__description-blocks\" style=\"box-sizing: inherit; -webkit-tap-highlight-color: transparent; outline: 0px; margin-top: 20px; color: rgb(0, 0, 0); font-size: 14px;\">\n                    {traits}\n                    {strikes}\n                    {actions}\n                    {spellcasting}\n                    {equipment}\n                </div>\n                {public_notes}\n            </h1>\n        </div>\n    </div>\n</div>\n"
+  }
+};